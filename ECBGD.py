@@ -2,66 +2,12 @@ import io
 import os
 import pandas as pd
 import matplotlib.pyplot as plt
-import requests
-from datetime import datetime
+from sources import SOURCES
 
 # --- CACHE FÁJLNEVEK ---
-ECB_CACHE_FILE = "ecb_debt_gdp_cache.csv"
-KSH_CACHE_FILE = "ksh_cpi_cache.csv"
-
-# --- LETÖLTŐ URL-ek ---
-ECB_DEBT_GDP_CSV_URL = ("https://sdw-wsrest.ecb.europa.eu/service/data/"
-                        "GFS/Q.N.HU.W0.S13.S1.C.L.LE.GD.T._Z.XDC_R_B1GQ_CY._T.F.V.N._T?format=csv")
-KSH_CPI_CSV_URL = "https://www.ksh.hu/stadat_files/ara/hu/ara0040.csv"
-
-def fetch_csv(url):
-    """ECB API letöltés"""
-    headers = {'Accept': 'text/csv'}
-    r = requests.get(url, timeout=30, headers=headers)
-    r.raise_for_status()
-    return r.content.decode('utf-8')
-
-def fetch_csv_ksh(url):
-    """KSH CSV letöltés"""
-    r = requests.get(url, timeout=30)
-    r.encoding = 'latin1'
-    r.raise_for_status()
-    return r.text
-
-def get_or_download_data(cache_file, url, is_ksh=False):
-    """
-    Először a cache-ből próbálja betölteni, ha nincs vagy régi, akkor letölt
-    """
-    use_cache = False
-    # Ellenőrizzük van-e cache fájl és nem régebbi-e 1 napnál
-    if os.path.exists(cache_file):
-        file_age = datetime.now().timestamp() - os.path.getmtime(cache_file)
-        if file_age < 24 * 3600:  # 24 óra
-            use_cache = True
-            print(f"Használom a cache-t: {cache_file}")
-    
-    if use_cache:
-        try:
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                return f.read()
-        except:
-            print(f"Cache olvasási hiba: {cache_file}")
-    
-    # Letöltés
-    print(f"Letöltés: {url}")
-    try:
-        if is_ksh:
-            data = fetch_csv_ksh(url)
-        else:
-            data = fetch_csv(url)
-        # Cache mentése
-        with open(cache_file, 'w', encoding='utf-8') as f:
-            f.write(data)
-        print(f"Cache mentve: {cache_file}")
-        return data
-    except Exception as e:
-        print(f"Letöltés sikertelen: {e}")
-        return None
+# A letöltés, a cache és a KSH dekódolás (cp1250) a közös forrás adapterekben történik
+ECB_CACHE_FILE = SOURCES['ecb'].cache_file('debt', 'HU')
+KSH_CACHE_FILE = SOURCES['ksh'].cache_file('cpi', 'HU')
 
 def read_ecb_debt_gdp(csv_text):
     """ECB debt/GDP adatok beolvasása - JAVÍTOTT VERZIÓ"""
@@ -327,7 +273,7 @@ def main():
     print("=== ECB Debt/GDP és KSH CPI Letöltő ===")
     
     # 1) ECB debt/GDP adatok
-    ecb_data = get_or_download_data(ECB_CACHE_FILE, ECB_DEBT_GDP_CSV_URL, is_ksh=False)
+    ecb_data = SOURCES['ecb'].get_text('debt', 'HU')
     debt_gdp = None
     
     if ecb_data:
@@ -343,7 +289,7 @@ def main():
             print(f"✗ ECB adatok feldolgozása sikertelen: {e}")
     
     # 2) KSH CPI adatok
-    ksh_data = get_or_download_data(KSH_CACHE_FILE, KSH_CPI_CSV_URL, is_ksh=True)
+    ksh_data = SOURCES['ksh'].get_text('cpi', 'HU')
     cpi = None
     inflation = None
     
@@ -1,10 +1,16 @@
 import io
 import os
+import sys
 import pandas as pd
 import matplotlib.pyplot as plt
-import requests
-from datetime import datetime
 import matplotlib.dates as mdates
+from series_registry import build_series_url
+from crisis_analytics import (CRISIS_EVENTS, CRISIS_STATS_VERSION, build_panel, event_rolling_stats,
+                              event_window_stats)
+from plot_lod import plot_series_collection, save_figure
+from checkpoints import Checkpoints, digest, output_hash
+from parallel_parse import load_country_series
+from coicop_store import COICOP_STORE_DIR, MANIFEST_FILE, store_exists, summarize_store
 
 # --- ORSZÁGOK KONFIGURÁCIÓJA ---
 COUNTRIES = {
@@ -20,54 +26,16 @@ COUNTRIES = {
 
 def get_ecb_debt_url(country_code):
     """ECB államadósság URL generálás országkód alapján"""
-    return (f"https://sdw-wsrest.ecb.europa.eu/service/data/"
-            f"GFS/Q.N.{country_code}.W0.S13.S1.C.L.LE.GD.T._Z.XDC_R_B1GQ_CY._T.F.V.N._T?format=csv")
+    return build_series_url('debt', country_code)
 
 def get_ecb_hicp_url(country_code):
     """ECB HICP infláció URL generálás országkód alapján"""
-    return (f"https://sdw-wsrest.ecb.europa.eu/service/data/"
-            f"ICP/M.{country_code}.N.000000.4.ANR?format=csv")
+    return build_series_url('hicp', country_code)
 
 def get_cache_file(country_code, data_type):
     """Cache fájl név országkód és adattípus alapján"""
     return f"ecb_{data_type}_{country_code.lower()}_cache.csv"
 
-def fetch_csv(url):
-    """ECB API letöltés"""
-    headers = {'Accept': 'text/csv'}
-    r = requests.get(url, timeout=30, headers=headers)
-    r.raise_for_status()
-    return r.content.decode('utf-8')
-
-def get_or_download_data(cache_file, url):
-    """Először a cache-ből próbálja betölteni, ha nincs vagy régi, akkor letölt"""
-    use_cache = False
-    if os.path.exists(cache_file):
-        file_age = datetime.now().timestamp() - os.path.getmtime(cache_file)
-        if file_age < 24 * 3600:  # 24 óra
-            use_cache = True
-            print(f"Használom a cache-t: {cache_file}")
-
-    if use_cache:
-        try:
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                return f.read()
-        except:
-            print(f"Cache olvasási hiba: {cache_file}")
-
-    # Letöltés
-    print(f"Letöltés: {url}")
-    try:
-        data = fetch_csv(url)
-        # Cache mentése
-        with open(cache_file, 'w', encoding='utf-8') as f:
-            f.write(data)
-        print(f"Cache mentve: {cache_file}")
-        return data
-    except Exception as e:
-        print(f"Letöltés sikertelen ({cache_file}): {e}")
-        return None
-
 def read_ecb_debt_gdp(csv_text):
     """ECB debt/GDP adatok beolvasása"""
     try:
@@ -187,202 +155,179 @@ def read_ecb_hicp(csv_text):
         print(f"Infláció tartomány: {result['inflation_rate'].min():.1f}% - {result['inflation_rate'].max():.1f}%")
     return result
 
-def main():
+def plot_debt_comparison(country_debt_data, path='eu_debt_comparison.png', preview=False):
+    """Államadósság összehasonlító grafikon válságjelölésekkel"""
+    fig1, ax1 = plt.subplots(figsize=(16, 10))
+
+    # Egyetlen LineCollection, sűrű sorozatoknál ritkítva
+    plot_series_collection(ax1, country_debt_data, linewidth=2.5, markers=True)
+
+    # Válságok jelölése függőleges vonalakkal
+    for crisis_date, crisis_label, crisis_color in CRISIS_EVENTS:
+        ax1.axvline(pd.to_datetime(crisis_date), color=crisis_color, 
+                   linestyle='--', alpha=0.7, linewidth=2)
+        ax1.text(pd.to_datetime(crisis_date), ax1.get_ylim()[1] * 0.95, 
+                crisis_label, rotation=90, verticalalignment='top', 
+                color=crisis_color, fontweight='bold')
+
+    ax1.set_title('EU Tagállamok - Bruttó államadósság a GDP arányában\n' + 
+                 'Főbb gazdasági válságok hatásával', 
+                 fontsize=16, fontweight='bold', pad=20)
+    ax1.set_ylabel('Államadósság (% GDP)', fontsize=14)
+    ax1.set_xlabel('Év', fontsize=14)
+    ax1.grid(True, alpha=0.3)
+    ax1.legend(bbox_to_anchor=(1.05, 1), loc='upper left', borderaxespad=0)
+
+    # X tengely formázás - JAVÍTOTT RÉSZ
+    ax1.xaxis.set_major_formatter(mdates.DateFormatter('%Y'))
+    ax1.xaxis.set_major_locator(mdates.YearLocator(base=2))  # base=2, nem interval=2
+    plt.setp(ax1.xaxis.get_majorticklabels(), rotation=45)
+
+    fig1.tight_layout()
+    save_figure(fig1, path, preview)
+    print(f"✓ Mentve: {path}")
+
+def plot_inflation_comparison(country_inflation_data, path='eu_inflation_comparison.png', preview=False):
+    """HICP infláció összehasonlító grafikon"""
+    fig2, ax2 = plt.subplots(figsize=(16, 10))
+
+    plot_series_collection(ax2, country_inflation_data, linewidth=2, alpha=0.8)
+
+    # Nulla vonal
+    ax2.axhline(y=0, color='black', linestyle='-', alpha=0.3)
+
+    # Válságok jelölése
+    for crisis_date, crisis_label, crisis_color in CRISIS_EVENTS:
+        ax2.axvline(pd.to_datetime(crisis_date), color=crisis_color, 
+                   linestyle='--', alpha=0.7, linewidth=2)
+
+    ax2.set_title('EU Tagállamok - HICP Infláció (éves változás %)\n' + 
+                 'Főbb gazdasági válságok hatásával', 
+                 fontsize=16, fontweight='bold', pad=20)
+    ax2.set_ylabel('Infláció (%)', fontsize=14)
+    ax2.set_xlabel('Év', fontsize=14)
+    ax2.grid(True, alpha=0.3)
+    ax2.legend(bbox_to_anchor=(1.05, 1), loc='upper left', borderaxespad=0)
+
+    # X tengely formázás
+    ax2.xaxis.set_major_formatter(mdates.DateFormatter('%Y'))
+    ax2.xaxis.set_major_locator(mdates.YearLocator(base=2))
+    plt.setp(ax2.xaxis.get_majorticklabels(), rotation=45)
+
+    fig2.tight_layout()
+    save_figure(fig2, path, preview)
+    print(f"✓ Mentve: {path}")
+
+def plot_hungary_combined(country_debt_data, country_inflation_data,
+                          path='hungary_combined_analysis.png', preview=False):
+    """Magyarország államadósság és infláció kettős y tengelyen"""
+    fig3, ax3 = plt.subplots(figsize=(16, 8))
+    ax4 = ax3.twinx()
+
+    # Magyarország államadósság
+    hu_debt = country_debt_data['HU']['data']
+    ax3.plot(hu_debt.index, hu_debt.values, 
+            color='#d62728', linewidth=3, label='Államadósság (% GDP)')
+
+    # Magyarország infláció (havi adatokat negyedéves átlagra konvertálunk)
+    hu_inflation = country_inflation_data['HU']['data']
+    hu_inflation_quarterly = hu_inflation.resample('QE').mean()
+    ax4.plot(hu_inflation_quarterly.index, hu_inflation_quarterly.values, 
+            color='#ff7f0e', linewidth=2, label='Infláció (%)', alpha=0.8)
+
+    # Válságok jelölése
+    for crisis_date, crisis_label, crisis_color in CRISIS_EVENTS:
+        ax3.axvline(pd.to_datetime(crisis_date), color=crisis_color, 
+                   linestyle='--', alpha=0.7, linewidth=2)
+        ax3.text(pd.to_datetime(crisis_date), ax3.get_ylim()[1] * 0.95, 
+                crisis_label, rotation=90, verticalalignment='top', 
+                color=crisis_color, fontweight='bold', fontsize=10)
+
+    ax3.set_title('Magyarország - Államadósság és Infláció együtt\n' + 
+                 'Válságok hatásának elemzése', 
+                 fontsize=16, fontweight='bold', pad=20)
+    ax3.set_ylabel('Államadósság (% GDP)', fontsize=14, color='#d62728')
+    ax4.set_ylabel('Infláció (%)', fontsize=14, color='#ff7f0e')
+    ax3.set_xlabel('Év', fontsize=14)
+
+    ax3.grid(True, alpha=0.3)
+    ax3.tick_params(axis='y', labelcolor='#d62728')
+    ax4.tick_params(axis='y', labelcolor='#ff7f0e')
+
+    # Legend kombinálás
+    lines1, labels1 = ax3.get_legend_handles_labels()
+    lines2, labels2 = ax4.get_legend_handles_labels()
+    ax3.legend(lines1 + lines2, labels1 + labels2, loc='upper left')
+
+    # X tengely formázás
+    ax3.xaxis.set_major_formatter(mdates.DateFormatter('%Y'))
+    ax3.xaxis.set_major_locator(mdates.YearLocator(base=3))
+    plt.setp(ax3.xaxis.get_majorticklabels(), rotation=45)
+
+    fig3.tight_layout()
+    save_figure(fig3, path, preview)
+    print(f"✓ Mentve: {path}")
+
+def crisis_analytics_table(country_debt_data, country_inflation_data):
+    """Válságablak és gördülő (volatilitás, z-score) statisztikák egy táblában"""
+    debt_panel = build_panel(country_debt_data)
+    inflation_panel = build_panel(country_inflation_data)
+    window_stats = event_window_stats(debt_panel, inflation_panel)
+    rolling = event_rolling_stats(debt_panel, inflation_panel)
+    return window_stats.merge(rolling, on=['event', 'country'], how='left')
+
+def main(preview=False, fresh=False):
     print("=== EU Összehasonlító Államadósság és Infláció Elemző ===")
     
-    # 1) EU országok debt/GDP adatok letöltése
+    # 1) EU országok adatai: letöltés szálakban, a cache fájlok feldolgozása processz poolban;
+    # a legutóbbi futás óta változatlan cache fájlok a checkpointból töltődnek
+    checkpoints = Checkpoints(fresh=fresh)
+    loaded = load_country_series(['debt', 'hicp'], list(COUNTRIES), checkpoints=checkpoints)
+
     country_debt_data = {}
     country_inflation_data = {}
     
     for country_code, country_info in COUNTRIES.items():
         print(f"\n--- {country_info['name']} ({country_code}) ---")
-        
-        # ÁLLAMADÓSSÁG adatok
-        debt_url = get_ecb_debt_url(country_code)
-        debt_cache_file = get_cache_file(country_code, 'debt')
-        
-        debt_data = get_or_download_data(debt_cache_file, debt_url)
-        
-        if debt_data:
-            try:
-                ecb_debt = read_ecb_debt_gdp(debt_data)
-                if len(ecb_debt) > 0 and {'period', 'debt_pct_gdp'}.issubset(ecb_debt.columns):
-                    ecb_debt = ecb_debt.set_index('period').sort_index()
-                    debt_gdp = ecb_debt['debt_pct_gdp'].astype(float)
-                    country_debt_data[country_code] = {
-                        'data': debt_gdp,
-                        'name': country_info['name'],
-                        'color': country_info['color']
-                    }
-                    print(f"✓ {country_info['name']} államadósság: {len(debt_gdp)} rekord")
-                else:
-                    print(f"✗ {country_info['name']} államadósság: Üres vagy hibás DataFrame")
-            except Exception as e:
-                print(f"✗ {country_info['name']} államadósság feldolgozás sikertelen: {e}")
-        else:
-            print(f"✗ {country_info['name']} államadósság: Letöltés sikertelen")
-
-        # INFLÁCIÓ adatok
-        hicp_url = get_ecb_hicp_url(country_code)
-        hicp_cache_file = get_cache_file(country_code, 'hicp')
-        
-        hicp_data = get_or_download_data(hicp_cache_file, hicp_url)
-        
-        if hicp_data:
-            try:
-                ecb_hicp = read_ecb_hicp(hicp_data)
-                if len(ecb_hicp) > 0 and {'period', 'inflation_rate'}.issubset(ecb_hicp.columns):
-                    ecb_hicp = ecb_hicp.set_index('period').sort_index()
-                    inflation_rate = ecb_hicp['inflation_rate'].astype(float)
-                    country_inflation_data[country_code] = {
-                        'data': inflation_rate,
-                        'name': country_info['name'],
-                        'color': country_info['color']
-                    }
-                    print(f"✓ {country_info['name']} infláció: {len(inflation_rate)} rekord")
-                else:
-                    print(f"✗ {country_info['name']} infláció: Üres vagy hibás DataFrame")
-            except Exception as e:
-                print(f"✗ {country_info['name']} infláció feldolgozás sikertelen: {e}")
-        else:
-            print(f"✗ {country_info['name']} infláció: Letöltés sikertelen")
+        for series_id, label, target in (('debt', 'államadósság', country_debt_data),
+                                         ('hicp', 'infláció', country_inflation_data)):
+            series = loaded[series_id].get(country_code)
+            if series is not None:
+                target[country_code] = {
+                    'data': series,
+                    'name': country_info['name'],
+                    'color': country_info['color']
+                }
+                print(f"✓ {country_info['name']} {label}: {len(series)} rekord")
+            else:
+                print(f"✗ {country_info['name']} {label}: Letöltés vagy feldolgozás sikertelen")
 
     # --- ÖSSZEHASONLÍTÓ GRAFIKONOK KÉSZÍTÉSE ---
     plt.rcParams.update({'figure.max_open_warning': 0})
     plt.rcParams['font.size'] = 10
 
-    # ÁLLAMADÓSSÁG GRAFIKON
+    # Rajzolás: csak az a grafikon készül újra, amelynek adatai változtak vagy hiányzik
+    debt_keys = [f"debt/{cc}" for cc in country_debt_data]
+    inflation_keys = [f"hicp/{cc}" for cc in country_inflation_data]
     if len(country_debt_data) > 0:
-        fig1, ax1 = plt.subplots(figsize=(16, 10))
-        
-        for country_code, country_data in country_debt_data.items():
-            debt_series = country_data['data']
-            country_name = country_data['name']
-            color = country_data['color']
-            
-            ax1.plot(debt_series.index, debt_series.values, 
-                    marker='o', linestyle='-', linewidth=2.5, 
-                    color=color, label=country_name, markersize=4)
-        
-        # Válságok jelölése függőleges vonalakkal
-        crisis_dates = [
-            ('2008-09-15', '2008-as pénzügyi válság', 'red'),
-            ('2020-03-15', 'COVID-19 járvány', 'orange'),
-            ('2022-02-24', 'Ukrajna háború', 'purple')
-        ]
-        
-        for crisis_date, crisis_label, crisis_color in crisis_dates:
-            ax1.axvline(pd.to_datetime(crisis_date), color=crisis_color, 
-                       linestyle='--', alpha=0.7, linewidth=2)
-            ax1.text(pd.to_datetime(crisis_date), ax1.get_ylim()[1] * 0.95, 
-                    crisis_label, rotation=90, verticalalignment='top', 
-                    color=crisis_color, fontweight='bold')
-        
-        ax1.set_title('EU Tagállamok - Bruttó államadósság a GDP arányában\n' + 
-                     'Főbb gazdasági válságok hatásával', 
-                     fontsize=16, fontweight='bold', pad=20)
-        ax1.set_ylabel('Államadósság (% GDP)', fontsize=14)
-        ax1.set_xlabel('Év', fontsize=14)
-        ax1.grid(True, alpha=0.3)
-        ax1.legend(bbox_to_anchor=(1.05, 1), loc='upper left', borderaxespad=0)
-        
-        # X tengely formázás - JAVÍTOTT RÉSZ
-        ax1.xaxis.set_major_formatter(mdates.DateFormatter('%Y'))
-        ax1.xaxis.set_major_locator(mdates.YearLocator(base=2))  # base=2, nem interval=2
-        plt.setp(ax1.xaxis.get_majorticklabels(), rotation=45)
-        
-        fig1.tight_layout()
-        fig1.savefig('eu_debt_comparison.png', dpi=150, bbox_inches='tight')
-        print("✓ Mentve: eu_debt_comparison.png")
-
-    # INFLÁCIÓ GRAFIKON
+        checkpoints.run('render', 'eu_debt_comparison',
+                        digest(output_hash(checkpoints, 'parse', debt_keys), preview),
+                        lambda: plot_debt_comparison(country_debt_data, preview=preview),
+                        outputs=['eu_debt_comparison.png'])
+
     if len(country_inflation_data) > 0:
-        fig2, ax2 = plt.subplots(figsize=(16, 10))
-        
-        for country_code, country_data in country_inflation_data.items():
-            inflation_series = country_data['data']
-            country_name = country_data['name']
-            color = country_data['color']
-            
-            ax2.plot(inflation_series.index, inflation_series.values, 
-                    linestyle='-', linewidth=2, 
-                    color=color, label=country_name, alpha=0.8)
-        
-        # Nulla vonal
-        ax2.axhline(y=0, color='black', linestyle='-', alpha=0.3)
-        
-        # Válságok jelölése
-        for crisis_date, crisis_label, crisis_color in crisis_dates:
-            ax2.axvline(pd.to_datetime(crisis_date), color=crisis_color, 
-                       linestyle='--', alpha=0.7, linewidth=2)
-        
-        ax2.set_title('EU Tagállamok - HICP Infláció (éves változás %)\n' + 
-                     'Főbb gazdasági válságok hatásával', 
-                     fontsize=16, fontweight='bold', pad=20)
-        ax2.set_ylabel('Infláció (%)', fontsize=14)
-        ax2.set_xlabel('Év', fontsize=14)
-        ax2.grid(True, alpha=0.3)
-        ax2.legend(bbox_to_anchor=(1.05, 1), loc='upper left', borderaxespad=0)
-        
-        # X tengely formázás
-        ax2.xaxis.set_major_formatter(mdates.DateFormatter('%Y'))
-        ax2.xaxis.set_major_locator(mdates.YearLocator(base=2))
-        plt.setp(ax2.xaxis.get_majorticklabels(), rotation=45)
-        
-        fig2.tight_layout()
-        fig2.savefig('eu_inflation_comparison.png', dpi=150, bbox_inches='tight')
-        print("✓ Mentve: eu_inflation_comparison.png")
-
-    # KOMBINÁLT GRAFIKON (dual y-axis)
-    if len(country_debt_data) > 0 and len(country_inflation_data) > 0:
-        # Csak Magyarországra készítünk kombinált grafikont
-        if 'HU' in country_debt_data and 'HU' in country_inflation_data:
-            fig3, ax3 = plt.subplots(figsize=(16, 8))
-            ax4 = ax3.twinx()
-            
-            # Magyarország államadósság
-            hu_debt = country_debt_data['HU']['data']
-            ax3.plot(hu_debt.index, hu_debt.values, 
-                    color='#d62728', linewidth=3, label='Államadósság (% GDP)')
-            
-            # Magyarország infláció (havi adatokat negyedéves átlagra konvertálunk)
-            hu_inflation = country_inflation_data['HU']['data']
-            hu_inflation_quarterly = hu_inflation.resample('Q').mean()
-            ax4.plot(hu_inflation_quarterly.index, hu_inflation_quarterly.values, 
-                    color='#ff7f0e', linewidth=2, label='Infláció (%)', alpha=0.8)
-            
-            # Válságok jelölése
-            for crisis_date, crisis_label, crisis_color in crisis_dates:
-                ax3.axvline(pd.to_datetime(crisis_date), color=crisis_color, 
-                           linestyle='--', alpha=0.7, linewidth=2)
-                ax3.text(pd.to_datetime(crisis_date), ax3.get_ylim()[1] * 0.95, 
-                        crisis_label, rotation=90, verticalalignment='top', 
-                        color=crisis_color, fontweight='bold', fontsize=10)
-            
-            ax3.set_title('Magyarország - Államadósság és Infláció együtt\n' + 
-                         'Válságok hatásának elemzése', 
-                         fontsize=16, fontweight='bold', pad=20)
-            ax3.set_ylabel('Államadósság (% GDP)', fontsize=14, color='#d62728')
-            ax4.set_ylabel('Infláció (%)', fontsize=14, color='#ff7f0e')
-            ax3.set_xlabel('Év', fontsize=14)
-            
-            ax3.grid(True, alpha=0.3)
-            ax3.tick_params(axis='y', labelcolor='#d62728')
-            ax4.tick_params(axis='y', labelcolor='#ff7f0e')
-            
-            # Legend kombinálás
-            lines1, labels1 = ax3.get_legend_handles_labels()
-            lines2, labels2 = ax4.get_legend_handles_labels()
-            ax3.legend(lines1 + lines2, labels1 + labels2, loc='upper left')
-            
-            # X tengely formázás
-            ax3.xaxis.set_major_formatter(mdates.DateFormatter('%Y'))
-            ax3.xaxis.set_major_locator(mdates.YearLocator(base=3))
-            plt.setp(ax3.xaxis.get_majorticklabels(), rotation=45)
-            
-            fig3.tight_layout()
-            fig3.savefig('hungary_combined_analysis.png', dpi=150, bbox_inches='tight')
-            print("✓ Mentve: hungary_combined_analysis.png")
+        checkpoints.run('render', 'eu_inflation_comparison',
+                        digest(output_hash(checkpoints, 'parse', inflation_keys), preview),
+                        lambda: plot_inflation_comparison(country_inflation_data, preview=preview),
+                        outputs=['eu_inflation_comparison.png'])
+
+    # Csak Magyarországra készítünk kombinált grafikont
+    if 'HU' in country_debt_data and 'HU' in country_inflation_data:
+        checkpoints.run('render', 'hungary_combined_analysis',
+                        digest(output_hash(checkpoints, 'parse', ['debt/HU', 'hicp/HU']), preview),
+                        lambda: plot_hungary_combined(country_debt_data, country_inflation_data,
+                                                      preview=preview),
+                        outputs=['hungary_combined_analysis.png'])
 
     # Összefoglaló
     print(f"\n=== ÖSSZEFOGLALÓ ===")
@@ -407,6 +352,49 @@ def main():
             
             print(f"{country_name}: államadósság {debt_value:.1f}% ({last_date.year}-Q{quarter}){inflation_info}")
 
+    # Válságablak elemzés
+    if len(country_debt_data) > 0 and len(country_inflation_data) > 0:
+        crisis_stats = checkpoints.frame(
+            'aggregate', 'eu_crisis_analytics',
+            digest(CRISIS_STATS_VERSION, output_hash(checkpoints, 'parse', debt_keys + inflation_keys)),
+            'eu_crisis_analytics.csv',
+            lambda: crisis_analytics_table(country_debt_data, country_inflation_data))
+        print(f"\n=== VÁLSÁGABLAK ELEMZÉS ===")
+        for event_label, event_rows in crisis_stats.groupby('event', sort=False):
+            print(f"{event_label}:")
+            for _, row in event_rows.iterrows():
+                name = COUNTRIES.get(row['country'], {}).get('name', row['country'])
+                if pd.notna(row['recovery_months']):
+                    recovery = f"{row['recovery_months']:.0f} hó"
+                elif row['inflation_peak'] <= row['inflation_baseline']:
+                    recovery = "a csúcs nem haladta meg a bázisszintet"
+                else:
+                    recovery = "az ablakon belül nem"
+                print(f"  {name}: adósság {row['debt_change_pre']:+.1f}pp előtte / "
+                      f"{row['debt_change_post']:+.1f}pp utána, "
+                      f"inflációs csúcs {row['inflation_peak']:.1f}% "
+                      f"({row['months_to_peak']:.0f} hó), "
+                      f"visszarendeződés: {recovery}")
+                print(f"    volatilitás: adósság {row['debt_volatility']:.2f}pp, infláció "
+                      f"{row['inflation_volatility_pre']:.2f} -> {row['inflation_volatility_post']:.2f}pp, "
+                      f"max. z-score {row['inflation_zscore_max']:.1f}")
+        print("✓ Mentve: eu_crisis_analytics.csv")
+
+    # COICOP részletes bontás (ha a coicop_store.py már felépítette a tárat)
+    if store_exists():
+        coicop_summary = checkpoints.frame(
+            'aggregate', 'eu_coicop_summary',
+            checkpoints.file_hash(os.path.join(COICOP_STORE_DIR, MANIFEST_FILE)), 'eu_coicop_summary.csv',
+            summarize_store)
+        print(f"\n=== COICOP BONTÁS ===")
+        if 'anr_last' in coicop_summary.columns:
+            top = coicop_summary.dropna(subset=['anr_last']).sort_values('anr_last', ascending=False)
+            for country_code, rows in top.groupby('country', sort=False):
+                name = COUNTRIES.get(country_code, {}).get('name', country_code)
+                items = ', '.join(f"{r.coicop} {r.anr_last:.1f}%" for r in rows.head(3).itertuples())
+                print(f"  {name}: legmagasabb éves ráták: {items}")
+        print(f"✓ Mentve: eu_coicop_summary.csv ({len(coicop_summary)} partíció)")
+
     print(f"\nKészült grafikonok:")
     if os.path.exists('eu_debt_comparison.png'):
         print("  • eu_debt_comparison.png - Államadósság összehasonlítás")
@@ -414,7 +402,8 @@ def main():
         print("  • eu_inflation_comparison.png - Infláció összehasonlítás")
     if os.path.exists('hungary_combined_analysis.png'):
         print("  • hungary_combined_analysis.png - Magyar kombinált elemzés")
+    print(f"\nCheckpoint: {checkpoints.executed} lépés lefutott, {checkpoints.skipped} kihagyva (naprakész)")
 
 if __name__ == '__main__':
-    main()
+    main(preview='--preview' in sys.argv, fresh='--fresh' in sys.argv)
 
@@ -0,0 +1,148 @@
+import asyncio
+import sys
+import time
+
+try:
+    import httpx
+except ImportError:  # opcionális függőség: nélküle a szálas load_many fut
+    httpx = None
+
+try:
+    import h2  # noqa: F401  (httpx HTTP/2 támogatás)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+from sources import HTTP_TIMEOUT, POOL_SIZE, RETRY_POLICY, SOURCES, load_many
+from ECBGD_EU import COUNTRIES
+
+# --- ASZINKRON LETÖLTÉS ---
+# Egyetlen httpx.AsyncClient az összes kérésre: keep-alive kapcsolatok, HTTP/2
+# esetén egy kapcsolaton multiplexelve. A cache és a feldolgozás a forrás
+# adapterekével azonos (sources.py), így a get_or_download szemantika megmarad.
+# A transport csak a kapcsolódási hibákat próbálja újra; a 429/5xx válaszokat a
+# szinkron motorral azonos RETRY_POLICY szerint, visszalépéssel ismételjük.
+# A blokkoló cache olvasás/írás szálban fut, hogy ne állítsa meg az eseményhurkot.
+CONNECT_RETRIES = 2
+KEEPALIVE_EXPIRY = 30
+
+def create_async_client(max_connections=POOL_SIZE, timeout=HTTP_TIMEOUT):
+    """Megosztott aszinkron kliens kapcsolat limitekkel, keep-alive-val és HTTP/2-vel (ha van h2)"""
+    limits = httpx.Limits(max_connections=max_connections,
+                          max_keepalive_connections=max_connections,
+                          keepalive_expiry=KEEPALIVE_EXPIRY)
+    transport = httpx.AsyncHTTPTransport(http2=HTTP2_AVAILABLE, limits=limits, retries=CONNECT_RETRIES)
+    return httpx.AsyncClient(transport=transport, timeout=httpx.Timeout(timeout), follow_redirects=True)
+
+def retry_delay(response, errors):
+    """Várakozás a következő próbálkozás előtt, a RETRY_POLICY (urllib3 Retry) szabályai szerint
+
+    errors: az eddigi sikertelen válaszok száma. Retry-After fejlécet (429/503) követünk,
+    egyébként exponenciális visszalépés: 0, 2, 4, ... másodperc, backoff_max-szal korlátozva.
+    """
+    retry_after = response.headers.get('Retry-After', '').strip()
+    if (RETRY_POLICY.respect_retry_after_header and retry_after.isdigit()
+            and response.status_code in RETRY_POLICY.RETRY_AFTER_STATUS_CODES):
+        return float(retry_after)
+    if errors <= 1:
+        return 0
+    return min(RETRY_POLICY.backoff_max, RETRY_POLICY.backoff_factor * 2 ** (errors - 1))
+
+async def fetch_with_retry(client, url, headers, timeout):
+    """GET a RETRY_POLICY státusz alapú újrapróbálásával (429/5xx); a végső válasz"""
+    errors = 0
+    while True:
+        response = await asyncio.wait_for(client.get(url, headers=headers), timeout)
+        if response.status_code not in RETRY_POLICY.status_forcelist or errors >= RETRY_POLICY.total:
+            return response
+        errors += 1
+        await asyncio.sleep(retry_delay(response, errors))
+
+async def get_text_async(client, source, series_id, country_code, max_age=None, timeout=HTTP_TIMEOUT, **params):
+    """Aszinkron megfelelője a SourceAdapter.get_text-nek: cache, különben letöltés
+
+    A kérés (próbálkozásonként) `timeout` másodperc után megszakad; 429/5xx válasznál a
+    RETRY_POLICY szerint újrapróbálunk. A feladat kívülről is törölhető.
+    """
+    cache_file = source.cache_file(series_id, country_code, **params)
+    trust_daemon = max_age is None
+    max_age = source.cache_ttl(series_id) if max_age is None else max_age
+    cached = await asyncio.to_thread(source.read_cache, cache_file, max_age, trust_daemon)
+    if cached is not None:
+        return cached
+
+    issues = await asyncio.to_thread(source.validate, series_id, country_code, **params)
+    if issues:
+        print(f"✗ {source.name}:{series_id} ({country_code}): érvénytelen kulcs, nem töltjük le: "
+              f"{'; '.join(issues)}")
+        return None
+
+    url = source.build_url(series_id, country_code, **params)
+    print(f"Letöltés: {url}")
+    try:
+        response = await fetch_with_retry(client, url, source.headers, timeout)
+        response.raise_for_status()
+        text = response.content.decode(source.encoding)
+        await asyncio.to_thread(source.write_cache, cache_file, text)
+        return text
+    except asyncio.CancelledError:
+        print(f"Letöltés megszakítva ({cache_file})")
+        raise
+    except Exception as e:
+        print(f"Letöltés sikertelen ({cache_file}): {e!r}")
+        return None
+
+async def load_many_async(jobs, max_age=None, timeout=HTTP_TIMEOUT, total_timeout=None,
+                          max_connections=POOL_SIZE):
+    """Több (forrás, sorozat, ország[, paraméterek]) feladat egyidejű betöltése
+
+    Visszatérés: a feladatokkal azonos sorrendű lista (pd.Series vagy None), mint a load_many-nél.
+    total_timeout lejártakor a még futó kérések törlődnek (eredményük None).
+    httpx nélkül a szálas load_many fut egy háttérszálban.
+    """
+    if httpx is None:
+        return await asyncio.to_thread(load_many, jobs, max_age=max_age)
+
+    async with create_async_client(max_connections, timeout) as client:
+        async def run(job):
+            source = SOURCES[job[0]]
+            params = job[3] if len(job) > 3 else {}
+            text = await get_text_async(client, source, job[1], job[2],
+                                        max_age=max_age, timeout=timeout, **params)
+            return source.parse_checked(text, job[1], job[2])
+
+        tasks = [asyncio.create_task(run(job)) for job in jobs]
+        done, pending = await asyncio.wait(tasks, timeout=total_timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        return [task.result() if task in done and task.exception() is None else None
+                for task in tasks]
+
+async def load_countries_async(series_ids, country_codes=COUNTRIES, **kwargs):
+    """Egy országkör összes sorozata egyszerre: {sorozat: {országkód: pd.Series}}"""
+    jobs = [('ecb', series_id, cc) for series_id in series_ids for cc in country_codes]
+    results = await load_many_async(jobs, **kwargs)
+    panels = {series_id: {} for series_id in series_ids}
+    for (_, series_id, cc), series in zip(jobs, results):
+        if series is not None:
+            panels[series_id][cc] = series
+    return panels
+
+def main():
+    print("=== Aszinkron letöltés ===")
+    if httpx is None:
+        print("httpx nincs telepítve, a szálas letöltés fut (pip install httpx[http2])")
+    else:
+        print(f"httpx {httpx.__version__}, HTTP/2: {'igen' if HTTP2_AVAILABLE else 'nem'}")
+    max_age = 0 if '--force' in sys.argv else None
+
+    start = time.perf_counter()
+    panels = asyncio.run(load_countries_async(['debt', 'hicp'], max_age=max_age))
+    elapsed = time.perf_counter() - start
+    for series_id, panel in panels.items():
+        print(f"✓ {series_id}: {len(panel)}/{len(COUNTRIES)} ország")
+    print(f"Idő: {elapsed:.2f} s")
+
+if __name__ == '__main__':
+    main()
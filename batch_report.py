@@ -0,0 +1,207 @@
+import base64
+import html
+import io
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.dates as mdates
+import matplotlib.image as mpimg
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+import pandas as pd
+
+from sources import load_many
+from ECBGD_EU import COUNTRIES
+from crisis_analytics import CRISIS_EVENTS, event_window_stats
+from plot_lod import FULL_DPI, PREVIEW_DPI
+
+# --- RIPORT BEÁLLÍTÁSOK ---
+REPORT_PDF_FILE = "eu_country_report.pdf"
+REPORT_HTML_FILE = "eu_country_report.html"
+REPORT_WORKERS = 4
+DEBT_COLOR = '#d62728'
+INFLATION_COLOR = '#ff7f0e'
+
+def load_report_panels(countries=COUNTRIES):
+    """Államadósság és infláció panelek egyszeri betöltése minden országra (közös motorral)"""
+    jobs = [('ecb', series_id, country_code)
+            for series_id in ('debt', 'hicp') for country_code in countries]
+    loaded = [(job, series) for job, series in zip(jobs, load_many(jobs)) if series is not None]
+    debt_panel = pd.DataFrame({cc: s for (_, series_id, cc), s in loaded if series_id == 'debt'})
+    inflation_panel = pd.DataFrame({cc: s for (_, series_id, cc), s in loaded if series_id == 'hicp'})
+    return debt_panel.sort_index(), inflation_panel.sort_index()
+
+class CombinedChartTemplate:
+    """Kombinált (kettős y tengelyű) adósság + infláció grafikon sablon
+
+    A figura, a tengelyek, a válságjelölések, a formázás és a jelmagyarázat
+    egyszer jön létre; országonként csak a vonalak adatai és a cím cserélődnek.
+    """
+
+    def __init__(self):
+        self.fig = Figure(figsize=(16, 8))
+        self.fig.subplots_adjust(left=0.06, right=0.94, top=0.88, bottom=0.12)
+        self.ax_debt = self.fig.subplots()
+        self.ax_inflation = self.ax_debt.twinx()
+        self.ax_debt.xaxis_date()
+
+        self.debt_line, = self.ax_debt.plot([], [], color=DEBT_COLOR, linewidth=3,
+                                            label='Államadósság (% GDP)')
+        self.inflation_line, = self.ax_inflation.plot([], [], color=INFLATION_COLOR, linewidth=2,
+                                                      alpha=0.8, label='Infláció (%)')
+
+        # Válságok jelölése: a felirat y pozíciója tengely-arányban, így nem kell újraszámolni
+        label_transform = self.ax_debt.get_xaxis_transform()
+        for crisis_date, crisis_label, crisis_color in CRISIS_EVENTS:
+            crisis_x = mdates.date2num(pd.to_datetime(crisis_date))
+            self.ax_debt.axvline(crisis_x, color=crisis_color, linestyle='--', alpha=0.7, linewidth=2)
+            self.ax_debt.text(crisis_x, 0.95, crisis_label, transform=label_transform, rotation=90,
+                              verticalalignment='top', color=crisis_color, fontweight='bold', fontsize=10)
+
+        self.title = self.ax_debt.set_title('', fontsize=16, fontweight='bold', pad=20)
+        self.ax_debt.set_ylabel('Államadósság (% GDP)', fontsize=14, color=DEBT_COLOR)
+        self.ax_inflation.set_ylabel('Infláció (%)', fontsize=14, color=INFLATION_COLOR)
+        self.ax_debt.set_xlabel('Év', fontsize=14)
+        self.ax_debt.grid(True, alpha=0.3)
+        self.ax_debt.tick_params(axis='y', labelcolor=DEBT_COLOR)
+        self.ax_inflation.tick_params(axis='y', labelcolor=INFLATION_COLOR)
+        self.ax_debt.legend([self.debt_line, self.inflation_line],
+                            [self.debt_line.get_label(), self.inflation_line.get_label()], loc='upper left')
+        self.ax_debt.xaxis.set_major_formatter(mdates.DateFormatter('%Y'))
+        self.ax_debt.xaxis.set_major_locator(mdates.YearLocator(base=3))
+        self.ax_debt.tick_params(axis='x', labelrotation=45)
+
+    def render(self, country_name, debt, inflation, dpi=FULL_DPI):
+        """Egy ország grafikonja PNG-ként (bytes)"""
+        debt = debt.dropna()
+        # Havi inflációt negyedéves átlagra konvertálunk, mint az ECBGD_EU kombinált grafikonján
+        inflation = inflation.dropna().resample('QE').mean().dropna()
+        debt_x = mdates.date2num(debt.index.to_pydatetime())
+        inflation_x = mdates.date2num(inflation.index.to_pydatetime())
+        self.debt_line.set_data(debt_x, debt.to_numpy(dtype=float))
+        self.inflation_line.set_data(inflation_x, inflation.to_numpy(dtype=float))
+        self.title.set_text(f'{country_name} - Államadósság és Infláció együtt\n'
+                            'Válságok hatásának elemzése')
+
+        for ax in (self.ax_debt, self.ax_inflation):
+            ax.relim()
+            ax.autoscale_view()
+        xs = [x for x in (debt_x, inflation_x) if len(x) > 0]
+        if xs:
+            self.ax_debt.set_xlim(min(x[0] for x in xs), max(x[-1] for x in xs))
+
+        buffer = io.BytesIO()
+        self.fig.savefig(buffer, format='png', dpi=dpi)
+        return buffer.getvalue()
+
+_templates = threading.local()
+
+def render_country(country_code, debt, inflation, dpi=FULL_DPI):
+    """Renderelés a szál (processz poolban a worker processz) saját, újrahasznált sablonjával"""
+    if not hasattr(_templates, 'combined'):
+        _templates.combined = CombinedChartTemplate()
+    name = COUNTRIES.get(country_code, {}).get('name', country_code)
+    return _templates.combined.render(name, debt, inflation, dpi=dpi)
+
+def country_summary(debt_panel, inflation_panel):
+    """Országonkénti összefoglaló: utolsó érték és időszak, csúcsértékek"""
+    rows = []
+    for country_code in debt_panel.columns.union(inflation_panel.columns):
+        debt = debt_panel[country_code].dropna() if country_code in debt_panel else pd.Series(dtype=float)
+        inflation = (inflation_panel[country_code].dropna() if country_code in inflation_panel
+                     else pd.Series(dtype=float))
+        row = {'country': country_code, 'name': COUNTRIES.get(country_code, {}).get('name', country_code)}
+        if len(debt) > 0:
+            last_date = debt.index[-1]
+            row.update({'debt_last': debt.iloc[-1],
+                        'debt_period': f"{last_date.year}-Q{(last_date.month - 1) // 3 + 1}",
+                        'debt_max': debt.max()})
+        if len(inflation) > 0:
+            row.update({'inflation_last': inflation.iloc[-1],
+                        'inflation_period': f"{inflation.index[-1]:%Y-%m}",
+                        'inflation_max': inflation.max()})
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+def _render_task(task):
+    """Worker: (országkód, adósság, infláció, dpi) -> PNG bytes"""
+    return render_country(*task)
+
+def render_all(debt_panel, inflation_panel, dpi=FULL_DPI, max_workers=REPORT_WORKERS):
+    """Minden országra a kombinált grafikon párhuzamos renderelése: {országkód: PNG bytes}
+
+    Az Agg renderelés a GIL-t tartja, ezért processz poolban fut; minden worker
+    processz egyszer építi fel a sablont, és csak a kész PNG bájtokat adja vissza.
+    """
+    countries = [cc for cc in COUNTRIES if cc in debt_panel and cc in inflation_panel]
+    tasks = [(cc, debt_panel[cc], inflation_panel[cc], dpi) for cc in countries]
+    if max_workers == 1 or len(tasks) < 2:
+        return {cc: _render_task(task) for cc, task in zip(countries, tasks)}
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return dict(zip(countries, pool.map(_render_task, tasks)))
+
+def _text_page(title, text):
+    """Szöveges PDF oldal (összefoglaló táblák)"""
+    fig = Figure(figsize=(11.7, 8.3))
+    fig.text(0.04, 0.95, title, fontsize=16, fontweight='bold', verticalalignment='top')
+    fig.text(0.04, 0.88, text, family='monospace', fontsize=8, verticalalignment='top')
+    return fig
+
+def write_pdf(path, summary, crisis_stats, images, dpi=FULL_DPI):
+    """Többoldalas PDF: összefoglaló, válságablak tábla, majd országonként egy grafikon"""
+    with PdfPages(path) as pdf:
+        pdf.savefig(_text_page('Országos összefoglaló', summary.to_string(index=False, float_format='%.1f')))
+        if len(crisis_stats) > 0:
+            pdf.savefig(_text_page('Válságablak elemzés',
+                                   crisis_stats.to_string(index=False, float_format='%.1f')))
+        for png in images.values():
+            image = mpimg.imread(io.BytesIO(png), format='png')
+            height, width = image.shape[:2]
+            page = Figure(figsize=(width / dpi, height / dpi))
+            page.figimage(image)
+            pdf.savefig(page, dpi=dpi)
+
+def write_html(path, summary, crisis_stats, images):
+    """Önálló HTML riport beágyazott PNG grafikonokkal"""
+    parts = [
+        '<!DOCTYPE html><html lang="hu"><head><meta charset="utf-8">',
+        '<title>EU államadósság és infláció riport</title></head><body>',
+        f'<h1>EU államadósság és infláció riport</h1><p>Készült: {datetime.now():%Y-%m-%d %H:%M}</p>',
+        '<h2>Országos összefoglaló</h2>', summary.to_html(index=False, float_format='%.1f'),
+    ]
+    if len(crisis_stats) > 0:
+        parts += ['<h2>Válságablak elemzés</h2>', crisis_stats.to_html(index=False, float_format='%.1f')]
+    for country_code, png in images.items():
+        name = html.escape(COUNTRIES.get(country_code, {}).get('name', country_code))
+        encoded = base64.b64encode(png).decode('ascii')
+        parts += [f'<h2>{name} ({country_code})</h2>',
+                  f'<img src="data:image/png;base64,{encoded}" alt="{name}" style="max-width:100%">']
+    parts.append('</body></html>')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(parts))
+
+def main(output_format='pdf', preview=False):
+    print("=== Országos riport generálás ===")
+    debt_panel, inflation_panel = load_report_panels()
+    if len(debt_panel.columns) == 0 or len(inflation_panel.columns) == 0:
+        print("✗ Nincs elég adat a riporthoz")
+        return
+
+    dpi = PREVIEW_DPI if preview else FULL_DPI
+    images = render_all(debt_panel, inflation_panel, dpi=dpi)
+    summary = country_summary(debt_panel, inflation_panel)
+    crisis_stats = event_window_stats(debt_panel, inflation_panel)
+
+    if output_format == 'html':
+        write_html(REPORT_HTML_FILE, summary, crisis_stats, images)
+        print(f"✓ Mentve: {REPORT_HTML_FILE} ({len(images)} ország)")
+    else:
+        write_pdf(REPORT_PDF_FILE, summary, crisis_stats, images, dpi=dpi)
+        print(f"✓ Mentve: {REPORT_PDF_FILE} ({len(images)} ország)")
+
+if __name__ == '__main__':
+    main(output_format='html' if '--html' in sys.argv else 'pdf', preview='--preview' in sys.argv)
@@ -0,0 +1,225 @@
+import glob
+import hashlib
+import io
+import json
+import os
+import sys
+import tarfile
+from datetime import datetime
+
+import numpy as np
+
+from cache_io import BUNDLE_MANIFEST, find_cache, zstandard
+from series_registry import SERIES, get_series_cache_file
+
+# --- HORDOZHATÓ CACHE CSOMAG ---
+# Egyetlen tömörítetlen tar fájl (a tagok már eleve tömörítettek): a nyers cache
+# fájlok legfrissebb változata, opcionálisan az előre feldolgozott sorozatok
+# (parsed/<sorozat>_<ország>.npz) és egy manifest.json verzióval, eredeti
+# módosítási időkkel és SHA-256 ellenőrző összegekkel. Egy letöltő gép elkészíti,
+# a többi gép importálja vagy helyben olvassa (cache_io.use_bundle), így nem
+# kell minden gépnek külön letöltenie ugyanazokat a sorozatokat.
+BUNDLE_FORMAT = "ecb-cache-bundle"
+BUNDLE_VERSION = 1
+CACHE_PATTERNS = ('*_cache.csv', 'sdmx_structure_*.xml')
+COMPRESSED_SUFFIXES = ('.zst', '.gz')
+
+def sha256_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+def sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+def default_bundle_name():
+    return f"cache_bundle_{datetime.now():%Y%m%dT%H%M%S}.tar"
+
+def logical_name(path):
+    """Lemezes változat -> logikai cache név ('x_cache.csv.zst' -> 'x_cache.csv')"""
+    for suffix in COMPRESSED_SUFFIXES:
+        if path.endswith(suffix):
+            return path[:-len(suffix)]
+    return path
+
+def collect_caches(patterns=CACHE_PATTERNS):
+    """Logikai cache nevenként a legfrissebb lemezes változat: {logikai név: útvonal}"""
+    names = set()
+    for pattern in patterns:
+        for suffix in ('',) + COMPRESSED_SUFFIXES:
+            names.update(logical_name(path) for path in glob.glob(pattern + suffix))
+    return {name: find_cache(name) for name in sorted(names) if find_cache(name) is not None}
+
+def parsed_series_tasks(cache_names):
+    """A csomagban lévő registry sorozatok: (logikai név, sorozat, országkód)"""
+    from ECBGD_EU import COUNTRIES
+    tasks = []
+    for series_id, spec in SERIES.items():
+        if '{item}' in spec['key']:
+            continue
+        for country_code in COUNTRIES:
+            cache_file = get_series_cache_file(series_id, country_code)
+            if cache_file in cache_names:
+                tasks.append((cache_file, series_id, country_code))
+    return tasks
+
+def _add_bytes(tar, name, data, mtime):
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mtime = int(mtime)
+    tar.addfile(info, io.BytesIO(data))
+
+def create_bundle(path=None, patterns=CACHE_PATTERNS, parsed=True):
+    """Csomag készítése a helyi cache-ből; visszatérés: (útvonal, manifest)"""
+    from parallel_parse import PARSER_VERSION, parse_files
+    path = path or default_bundle_name()
+    caches = collect_caches(patterns)
+    manifest = {'format': BUNDLE_FORMAT, 'version': BUNDLE_VERSION,
+                'created': datetime.now().isoformat(timespec='seconds'), 'entries': {}}
+
+    tmp_path = path + '.tmp'
+    with tarfile.open(tmp_path, 'w', format=tarfile.PAX_FORMAT) as tar:
+        member_of = {}
+        for cache_file, cache_path in caches.items():
+            with open(cache_path, 'rb') as f:
+                data = f.read()
+            name = os.path.basename(cache_path)
+            mtime = os.path.getmtime(cache_path)
+            _add_bytes(tar, name, data, mtime)
+            member_of[cache_file] = name
+            manifest['entries'][name] = {'kind': 'cache', 'cache_file': cache_file, 'sha256': sha256_bytes(data),
+                                         'size': len(data), 'mtime': mtime}
+
+        if parsed:
+            tasks = parsed_series_tasks(caches)
+            results = parse_files([(cache_file, series_id) for cache_file, series_id, _ in tasks])
+            for (cache_file, series_id, country_code), arrays in zip(tasks, results):
+                if arrays is None:
+                    continue
+                buffer = io.BytesIO()
+                np.savez(buffer, periods=arrays[0], values=arrays[1])
+                data = buffer.getvalue()
+                name = f"parsed/{series_id}_{country_code.lower()}.npz"
+                source = manifest['entries'][member_of[cache_file]]
+                _add_bytes(tar, name, data, source['mtime'])
+                manifest['entries'][name] = {'kind': 'parsed', 'series_id': series_id, 'country': country_code,
+                                             'source': member_of[cache_file], 'sha256': sha256_bytes(data),
+                                             'size': len(data), 'parser_version': PARSER_VERSION}
+
+        _add_bytes(tar, BUNDLE_MANIFEST, json.dumps(manifest, ensure_ascii=False, indent=1).encode('utf-8'),
+                   datetime.now().timestamp())
+    os.replace(tmp_path, path)
+
+    with open(path + '.sha256', 'w', encoding='utf-8') as f:
+        f.write(f"{sha256_file(path)}  {os.path.basename(path)}\n")
+    return path, manifest
+
+def read_manifest(path):
+    """A csomag manifestje (verzió ellenőrzéssel)"""
+    with tarfile.open(path, 'r:') as tar:
+        manifest = json.load(tar.extractfile(BUNDLE_MANIFEST))
+    if manifest.get('format') != BUNDLE_FORMAT or manifest.get('version') != BUNDLE_VERSION:
+        raise ValueError(f"Nem támogatott csomag formátum: {manifest.get('format')} "
+                         f"v{manifest.get('version')} (várt: {BUNDLE_FORMAT} v{BUNDLE_VERSION})")
+    return manifest
+
+def verify_bundle(path):
+    """Teljes csomag és bejegyzésenkénti ellenőrző összegek; visszatérés: a problémák listája"""
+    issues = []
+    checksum_file = path + '.sha256'
+    if os.path.exists(checksum_file):
+        with open(checksum_file, 'r', encoding='utf-8') as f:
+            expected = f.read().split()[0]
+        if sha256_file(path) != expected:
+            return [f"A csomag ellenőrző összege eltér ({checksum_file})"]
+    try:
+        manifest = read_manifest(path)
+    except (KeyError, ValueError, tarfile.TarError) as e:
+        return [f"Manifest nem olvasható: {e}"]
+    with tarfile.open(path, 'r:') as tar:
+        names = set(tar.getnames())
+        for name, entry in manifest['entries'].items():
+            if name not in names:
+                issues.append(f"Hiányzó bejegyzés: {name}")
+            elif sha256_bytes(tar.extractfile(name).read()) != entry['sha256']:
+                issues.append(f"Sérült bejegyzés: {name}")
+            elif name.endswith('.zst') and zstandard is None:
+                issues.append(f"{name}: a zstandard csomag nélkül nem olvasható")
+    return issues
+
+def import_bundle(path, dest='.', checkpoint_dir=None, overwrite=False):
+    """Csomag kicsomagolása a cache könyvtárba
+
+    A helyi, a csomagnál frissebb cache fájlok megmaradnak (overwrite=False). Az előre
+    feldolgozott sorozatok a checkpoint tárba kerülnek, így a feldolgozás lépés is meleg.
+    Visszatérés: (importált cache fájlok, importált feldolgozott sorozatok) száma.
+    """
+    from checkpoints import CHECKPOINT_DIR, Checkpoints, read_parsed, series_digest
+    from parallel_parse import PARSER_VERSION, parse_input_hash
+    issues = verify_bundle(path)
+    if issues:
+        raise ValueError('; '.join(issues))
+    manifest = read_manifest(path)
+    checkpoints = Checkpoints(checkpoint_dir or os.path.join(dest, CHECKPOINT_DIR))
+    imported = {}
+    n_parsed = 0
+    with tarfile.open(path, 'r:') as tar:
+        for name, entry in manifest['entries'].items():
+            if entry['kind'] != 'cache':
+                continue
+            local_path = find_cache(os.path.join(dest, entry['cache_file']))
+            if not overwrite and local_path is not None and os.path.getmtime(local_path) >= entry['mtime']:
+                continue
+            target = os.path.join(dest, name)
+            with open(target + '.tmp', 'wb') as f:
+                f.write(tar.extractfile(name).read())
+            os.utime(target + '.tmp', (entry['mtime'], entry['mtime']))
+            os.replace(target + '.tmp', target)
+            imported[name] = target
+
+        for name, entry in manifest['entries'].items():
+            if entry['kind'] != 'parsed' or entry['source'] not in imported:
+                continue
+            if entry.get('parser_version') != PARSER_VERSION:
+                continue  # más feldolgozó változattal készült: helyben újra feldolgozzuk
+            parsed_path = checkpoints.parsed_file(entry['series_id'], entry['country'])
+            os.makedirs(os.path.dirname(parsed_path), exist_ok=True)
+            with open(parsed_path, 'wb') as f:
+                f.write(tar.extractfile(name).read())
+            series = read_parsed(parsed_path, SERIES[entry['series_id']]['value_name'])
+            input_hash = parse_input_hash(checkpoints.file_hash(imported[entry['source']]))
+            checkpoints.record('parse', f"{entry['series_id']}/{entry['country']}", input_hash,
+                               output=series_digest(series), outputs=[parsed_path])
+            n_parsed += 1
+    return len(imported), n_parsed
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    command = args[0] if args else None
+    if command == 'create':
+        path, manifest = create_bundle(args[1] if len(args) > 1 else None, parsed='--raw-only' not in sys.argv)
+        kinds = [entry['kind'] for entry in manifest['entries'].values()]
+        print(f"✓ Csomag: {path} ({kinds.count('cache')} cache fájl, {kinds.count('parsed')} feldolgozott "
+              f"sorozat, {os.path.getsize(path) / 1024:.0f} KB)")
+    elif command == 'verify' and len(args) > 1:
+        issues = verify_bundle(args[1])
+        for issue in issues:
+            print(f"✗ {issue}")
+        if not issues:
+            print(f"✓ {args[1]}: ellenőrző összegek rendben")
+    elif command == 'import' and len(args) > 1:
+        try:
+            n_caches, n_parsed = import_bundle(args[1], overwrite='--overwrite' in sys.argv)
+        except ValueError as e:
+            print(f"✗ Import sikertelen: {e}")
+            return
+        print(f"✓ Importálva: {n_caches} cache fájl, {n_parsed} feldolgozott sorozat")
+    else:
+        print("Használat: python3 cache_bundle.py create [csomag.tar] [--raw-only]\n"
+              "           python3 cache_bundle.py verify csomag.tar\n"
+              "           python3 cache_bundle.py import csomag.tar [--overwrite]")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+import glob
+import gzip
+import hashlib
+import io
+import json
+import os
+import sys
+import tarfile
+from datetime import datetime
+from functools import lru_cache
+
+try:
+    import zstandard
+except ImportError:  # opcionális függőség: nélküle gzip
+    zstandard = None
+
+# --- TÖMÖRÍTETT CACHE ---
+# A cache fájlok logikai neve változatlan (pl. ecb_debt_hu_cache.csv), a lemezen
+# tömörítve tároljuk (.zst, ha van zstandard, különben .gz). Olvasáskor a
+# legfrissebb létező változatot használjuk, így a régi tömörítetlen cache is működik.
+CACHE_COMPRESSION = 'zst' if zstandard is not None else 'gz'
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 10
+
+# --- CACHE CSOMAG HELYBEN OLVASÁSA ---
+# Ha be van állítva egy cache csomag (cache_bundle.py, ECB_CACHE_BUNDLE környezeti
+# változó vagy use_bundle()), a helyben hiányzó cache fájlokat kicsomagolás nélkül,
+# közvetlenül a tar fájlból olvassuk (a manifest szerinti korral és ellenőrző összeggel).
+CACHE_BUNDLE = os.environ.get('ECB_CACHE_BUNDLE') or None
+BUNDLE_MANIFEST = "manifest.json"
+
+# --- HÁTTÉRFRISSÍTŐ ÁLTAL MEGERŐSÍTETT CACHE ---
+# A refresh_daemon.py minden sikeres frissítés után az állapotfájlba írja, meddig
+# naprakész egy cache (a következő esedékes ellenőrzésig). Az alapértelmezett
+# élettartammal olvasók ezt elfogadják, így két publikálás között nem töltenek le újra.
+REFRESH_STATE_FILE = "refresh_state.json"
+
+def cache_variants(cache_file):
+    """A cache fájl lehetséges lemezes változatai (olvasható tömörítéssel)"""
+    variants = [cache_file + '.gz', cache_file]
+    if zstandard is not None:
+        variants.insert(0, cache_file + '.zst')
+    return variants
+
+def find_cache(cache_file):
+    """A legfrissebb létező cache változat elérési útja (None, ha nincs)"""
+    existing = [path for path in cache_variants(cache_file) if os.path.exists(path)]
+    if len(existing) == 0:
+        return None
+    return max(existing, key=os.path.getmtime)
+
+def use_bundle(path):
+    """Cache csomag beállítása helyben olvasáshoz (None: kikapcsolás)"""
+    global CACHE_BUNDLE
+    CACHE_BUNDLE = path
+
+@lru_cache(maxsize=4)
+def _bundle_index(path, mtime):
+    """Csomag tartalomjegyzéke: {logikai cache név: (tag név, adat offset, méret, manifest bejegyzés)}"""
+    with tarfile.open(path, 'r:') as tar:
+        members = {member.name: member for member in tar.getmembers()}
+        manifest = json.load(tar.extractfile(members[BUNDLE_MANIFEST]))
+    return {entry['cache_file']: (name, members[name].offset_data, members[name].size, entry)
+            for name, entry in manifest['entries'].items()
+            if entry['kind'] == 'cache' and name in members}
+
+def bundle_entry(cache_file):
+    """A cache fájl bejegyzése a beállított csomagban (None, ha nincs csomag vagy bejegyzés)"""
+    if CACHE_BUNDLE is None or not os.path.exists(CACHE_BUNDLE):
+        return None
+    return _bundle_index(CACHE_BUNDLE, os.path.getmtime(CACHE_BUNDLE)).get(cache_file)
+
+def decode_cache_bytes(name, data):
+    """Tömörített (név szerinti) cache tartalom szöveggé"""
+    if name.endswith('.zst'):
+        return zstandard.ZstdDecompressor().decompressobj().decompress(data).decode('utf-8')
+    if name.endswith('.gz'):
+        return gzip.decompress(data).decode('utf-8')
+    return data.decode('utf-8')
+
+def read_bundle_text(cache_file):
+    """Cache tartalom közvetlenül a csomagból, ellenőrző összeg vizsgálattal"""
+    entry = bundle_entry(cache_file)
+    if entry is None:
+        return None
+    name, offset, size, info = entry
+    with open(CACHE_BUNDLE, 'rb') as f:
+        f.seek(offset)
+        data = f.read(size)
+    if hashlib.sha256(data).hexdigest() != info['sha256']:
+        raise ValueError(f"Sérült csomag bejegyzés: {name}")
+    return decode_cache_bytes(name, data)
+
+@lru_cache(maxsize=2)
+def _confirmed_until(path, mtime):
+    """Állapotfájl -> {cache fájl: naprakész eddig (ISO időpont)}"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {entry['cache_file']: entry['fresh_until'] for entry in state.values()
+            if isinstance(entry, dict) and entry.get('cache_file') and entry.get('fresh_until')}
+
+def confirmed_fresh(cache_file, state_file=None):
+    """A háttérfrissítő szerint a cache most is naprakész-e (a következő esedékes ellenőrzésig)"""
+    state_file = state_file or REFRESH_STATE_FILE
+    if not os.path.exists(state_file):
+        return False
+    until = _confirmed_until(state_file, os.path.getmtime(state_file)).get(cache_file)
+    return until is not None and datetime.fromisoformat(until) > datetime.now()
+
+def cache_age(cache_file):
+    """A cache kora másodpercben (None, ha nincs cache)"""
+    path = find_cache(cache_file)
+    if path is None:
+        entry = bundle_entry(cache_file)
+        if entry is None:
+            return None
+        return datetime.now().timestamp() - entry[3]['mtime']
+    return datetime.now().timestamp() - os.path.getmtime(path)
+
+def open_cache(path):
+    """Szöveges olvasó a cache fájlhoz, folyamatos (streaming) kitömörítéssel"""
+    if path.endswith('.zst'):
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+        return io.TextIOWrapper(reader, encoding='utf-8')
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+def read_cache_text(cache_file):
+    """A cache teljes tartalma szövegként (None, ha nincs cache)
+
+    A tartalom egyben, a memóriába tömörítődik ki; soronkénti feldolgozáshoz az
+    open_cache() folyamatosan kitömörítő olvasóját kell használni.
+    """
+    path = find_cache(cache_file)
+    if path is None:
+        return read_bundle_text(cache_file)
+    with open_cache(path) as f:
+        return f.read()
+
+def _compress(data):
+    if CACHE_COMPRESSION == 'zst':
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+def write_cache_text(cache_file, text):
+    """Tömörített cache írása (átmeneti fájlon keresztül); visszatérés: a fájl útvonala"""
+    path = f"{cache_file}.{CACHE_COMPRESSION}"
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_compress(text.encode('utf-8')))
+    os.replace(tmp_path, path)
+    return path
+
+def compress_caches(pattern='*_cache.csv', remove_plain=False):
+    """Meglévő tömörítetlen cache fájlok átalakítása (a módosítási idő megmarad)
+
+    A tömörítetlen fájlok alapértelmezésben megmaradnak (a repóban követett cache
+    fájlok törlése piszkos munkafát hagyna); olvasáskor a frissebb változat nyer.
+    """
+    total_before = total_after = 0
+    for plain_path in sorted(glob.glob(pattern)):
+        with open(plain_path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        compressed_path = write_cache_text(plain_path, text)
+        stat = os.stat(plain_path)
+        os.utime(compressed_path, (stat.st_atime, stat.st_mtime))
+        total_before += stat.st_size
+        total_after += os.path.getsize(compressed_path)
+        if remove_plain:
+            os.remove(plain_path)
+    return total_before, total_after
+
+def main():
+    if '--compress' not in sys.argv:
+        print("Használat: python3 cache_io.py --compress [--remove-plain]")
+        return
+    before, after = compress_caches(remove_plain='--remove-plain' in sys.argv)
+    if before == 0:
+        print("Nincs tömörítetlen cache fájl")
+        return
+    print(f"✓ Cache tömörítve ({CACHE_COMPRESSION}): {before / 1024:.0f} KB -> {after / 1024:.0f} KB "
+          f"({before / max(after, 1):.1f}x)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from cache_io import bundle_entry, find_cache
+
+# --- FOLYTATHATÓ FUTÁS (CHECKPOINT) ---
+# A letöltés -> feldolgozás -> aggregálás -> rajzolás lépések minden egysége
+# (sorozat/ország, összesítő tábla, grafikon) után rögzítjük a bemenet tartalom
+# hash-ét és a kimenetet. Újrafuttatáskor az az egység fut le újra, amelynek
+# bemenete változott vagy a kimenete hiányzik; a többi a checkpointból töltődik.
+CHECKPOINT_DIR = "checkpoints"
+CHECKPOINT_FILE = "pipeline.json"
+PARSED_DIR = "parsed"
+
+def digest(*parts):
+    """Rövid tartalom hash szövegekből, bájtokból, NumPy tömbökből vagy hash-ekből"""
+    h = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            part = np.ascontiguousarray(part).tobytes()
+        elif not isinstance(part, bytes):
+            part = str(part).encode('utf-8')
+        h.update(len(part).to_bytes(8, 'little'))
+        h.update(part)
+    return h.hexdigest()[:32]
+
+def series_digest(series):
+    """Feldolgozott sorozat hash-e (időszakok és értékek)"""
+    return digest(series.index.to_numpy(dtype='datetime64[ns]').view(np.int64),
+                  series.to_numpy(dtype=float))
+
+class Checkpoints:
+    """Lépésenkénti checkpointok egy JSON fájlban (minden rögzítés után atomikusan mentve)"""
+
+    def __init__(self, path=CHECKPOINT_DIR, fresh=False):
+        self.path = path
+        self.file = os.path.join(path, CHECKPOINT_FILE)
+        self.state = {} if fresh else self._read()
+        self.skipped = 0
+        self.executed = 0
+
+    def _read(self):
+        if not os.path.exists(self.file):
+            return {}
+        try:
+            with open(self.file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except ValueError:
+            # Félbeszakadt írásból maradt sérült állapot: tiszta lappal indulunk
+            return {}
+
+    def _write(self):
+        os.makedirs(self.path, exist_ok=True)
+        tmp_path = self.file + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.file)
+
+    def file_hash(self, path):
+        """Fájl tartalom hash-e; változatlan méret és módosítási idő esetén a tárolt érték"""
+        stat = os.stat(path)
+        signature = [stat.st_size, stat.st_mtime_ns]
+        known = self.state.setdefault('files', {}).get(path)
+        if known is not None and known['signature'] == signature:
+            return known['hash']
+        with open(path, 'rb') as f:
+            value = digest(f.read())
+        self.state['files'][path] = {'signature': signature, 'hash': value}
+        return value
+
+    def cache_hash(self, cache_file):
+        """Cache tartalom hash-e és helyi fájlja: a legfrissebb helyi változat, különben a csomag
+
+        Helyi fájl nélkül a csomag bejegyzés ellenőrző összegéből számolunk (a fájl None),
+        így helyben olvasott csomagnál (ECB_CACHE_BUNDLE) is működik a checkpoint.
+        (None, None), ha nincs cache.
+        """
+        path = find_cache(cache_file)
+        if path is not None:
+            return self.file_hash(path), path
+        entry = bundle_entry(cache_file)
+        if entry is None:
+            return None, None
+        return digest(entry[3]['sha256']), None
+
+    def get(self, stage, key):
+        return self.state.get(stage, {}).get(key)
+
+    def is_current(self, stage, key, input_hash, outputs=()):
+        """A lépés egysége naprakész-e: azonos bemenet hash és minden kimenet megvan"""
+        entry = self.get(stage, key)
+        return (entry is not None and entry['input'] == input_hash
+                and all(os.path.exists(path) for path in outputs))
+
+    def record(self, stage, key, input_hash, **info):
+        self.state.setdefault(stage, {})[key] = {
+            'input': input_hash, 'time': datetime.now().isoformat(timespec='seconds'), **info}
+        self._write()
+
+    def run(self, stage, key, input_hash, func, outputs=()):
+        """func() futtatása, ha a bemenet változott vagy a kimenet hiányzik; True, ha lefutott"""
+        if self.is_current(stage, key, input_hash, outputs):
+            self.skipped += 1
+            return False
+        func()
+        self.record(stage, key, input_hash, outputs=list(outputs))
+        self.executed += 1
+        return True
+
+    def frame(self, stage, key, input_hash, path, compute):
+        """Aggregált tábla: a checkpoint CSV-ből, vagy compute() eredménye mentve"""
+        if self.is_current(stage, key, input_hash, [path]):
+            self.skipped += 1
+            return pd.read_csv(path)
+        result = compute()
+        result.to_csv(path, index=False)
+        self.record(stage, key, input_hash, outputs=[path])
+        self.executed += 1
+        return result
+
+    def parsed_file(self, series_id, country_code):
+        return os.path.join(self.path, PARSED_DIR, f"{series_id}_{country_code.lower()}.npz")
+
+def read_parsed(path, value_name):
+    """Mentett feldolgozott sorozat (.npz: időszakok int64 ns, értékek float64) -> pd.Series"""
+    with np.load(path) as arrays:
+        index = pd.DatetimeIndex(arrays['periods'].view('datetime64[ns]'), name='period')
+        return pd.Series(arrays['values'], index=index, name=value_name)
+
+def write_parsed(path, periods, values):
+    """Feldolgozott sorozat tömbjeinek atomikus mentése .npz fájlba"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, periods=periods, values=values)
+    os.replace(tmp_path, path)
+
+def output_hash(checkpoints, stage, keys):
+    """Több előző lépés kimenetének közös hash-e (a következő lépés bemenete)"""
+    return digest(*(f"{key}={(checkpoints.get(stage, key) or {}).get('output')}" for key in sorted(keys)))
@@ -0,0 +1,183 @@
+import gzip
+import json
+import os
+import shutil
+import sys
+
+import numpy as np
+import pandas as pd
+
+from series_registry import ECB_SDMX_BASE_URL, parse_periods
+from sources import HTTP_TIMEOUT, SESSION
+
+# --- COICOP RÉSZLETES HICP TÁR ---
+# A teljes ICP COICOP bontás (minden részindex, több mértékegység) nem fér
+# kényelmesen egyetlen stringbe/DataFrame-be. Országonként egy tömörített nyers
+# fájlba streamelünk, majd darabokban (chunk) partícionált tárba írjuk:
+#   coicop_store/country=HU/coicop=010000/data.csv  (period, unit, value)
+# Az aggregációk partíciónként futnak, a memóriaigény egy partíció méretével arányos.
+COICOP_STORE_DIR = "coicop_store"
+COICOP_UNITS = ('INX', 'ANR', 'MOR')   # index, éves és havi változás
+CHUNK_ROWS = 50_000
+DOWNLOAD_CHUNK_BYTES = 1 << 16
+MANIFEST_FILE = "manifest.json"
+PARTITION_COLUMNS = ['period', 'unit', 'value']
+SDMX_COLUMNS = ['REF_AREA', 'ICP_ITEM', 'ICP_SUFFIX', 'TIME_PERIOD', 'OBS_VALUE']
+
+def breakdown_url(country_code, units=COICOP_UNITS):
+    """Egy ország összes COICOP részindexe a megadott mértékegységekben (üres dimenzió = mind)"""
+    return f"{ECB_SDMX_BASE_URL}ICP/M.{country_code}.N..4.{'+'.join(units)}?format=csv"
+
+def raw_file(country_code, root=COICOP_STORE_DIR):
+    return os.path.join(root, 'raw', f"icp_{country_code.lower()}.csv.gz")
+
+def partition_dir(country_code, coicop, root=COICOP_STORE_DIR):
+    return os.path.join(root, f"country={country_code}", f"coicop={coicop}")
+
+def download_breakdown(country_code, root=COICOP_STORE_DIR, units=COICOP_UNITS):
+    """Letöltés streamelve, közvetlenül tömörített nyers fájlba (a válasz nem kerül memóriába)"""
+    path = raw_file(country_code, root)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    url = breakdown_url(country_code, units)
+    print(f"Letöltés: {url}")
+    with SESSION.get(url, headers={'Accept': 'text/csv'}, timeout=HTTP_TIMEOUT, stream=True) as r:
+        r.raise_for_status()
+        with gzip.open(path + '.tmp', 'wb') as f:
+            for block in r.iter_content(chunk_size=DOWNLOAD_CHUNK_BYTES):
+                f.write(block)
+    os.replace(path + '.tmp', path)
+    return path
+
+def read_manifest(root=COICOP_STORE_DIR):
+    path = os.path.join(root, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def write_manifest(manifest, root=COICOP_STORE_DIR):
+    os.makedirs(root, exist_ok=True)
+    tmp_path = os.path.join(root, MANIFEST_FILE + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp_path, os.path.join(root, MANIFEST_FILE))
+
+def ingest(source, root=COICOP_STORE_DIR, chunk_rows=CHUNK_ROWS):
+    """SDMX CSV (fájl vagy fájlszerű objektum) darabonkénti betöltése a partíciókba
+
+    Az érintett országok korábbi partíciói törlődnek, így az újrafuttatás idempotens.
+    Visszatérés: {'HU/010000': sorok száma, ...}.
+    """
+    counts = {}
+    cleared = set()
+    reader = pd.read_csv(source, usecols=SDMX_COLUMNS, dtype=str, chunksize=chunk_rows)
+    for chunk in reader:
+        chunk = pd.DataFrame({
+            'country': chunk['REF_AREA'].values,
+            'coicop': chunk['ICP_ITEM'].values,
+            'period': parse_periods(chunk['TIME_PERIOD'].values, 'M').values,
+            'unit': chunk['ICP_SUFFIX'].values,
+            'value': pd.to_numeric(chunk['OBS_VALUE'], errors='coerce').values,
+        }).dropna(subset=['period', 'value'])
+
+        for country_code in chunk['country'].unique():
+            if country_code not in cleared:
+                shutil.rmtree(os.path.join(root, f"country={country_code}"), ignore_errors=True)
+                cleared.add(country_code)
+
+        for (country_code, coicop), part in chunk.groupby(['country', 'coicop'], sort=False):
+            directory = partition_dir(country_code, coicop, root)
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, 'data.csv')
+            part[PARTITION_COLUMNS].to_csv(path, mode='a', header=not os.path.exists(path),
+                                           index=False, date_format='%Y-%m-%d')
+            key = f"{country_code}/{coicop}"
+            counts[key] = counts.get(key, 0) + len(part)
+
+    manifest = read_manifest(root)
+    manifest = {key: n for key, n in manifest.items() if key.split('/')[0] not in cleared}
+    manifest.update(counts)
+    write_manifest(manifest, root)
+    return counts
+
+def build_store(country_codes, root=COICOP_STORE_DIR, download=True):
+    """Letöltés (opcionális) és partícionálás országonként"""
+    for country_code in country_codes:
+        path = raw_file(country_code, root)
+        try:
+            if download or not os.path.exists(path):
+                download_breakdown(country_code, root)
+            counts = ingest(path, root)
+            print(f"✓ {country_code}: {len(counts)} COICOP partíció, {sum(counts.values())} megfigyelés")
+        except Exception as e:
+            print(f"✗ {country_code}: COICOP bontás sikertelen: {e}")
+
+def store_exists(root=COICOP_STORE_DIR):
+    return len(read_manifest(root)) > 0
+
+def partitions(root=COICOP_STORE_DIR, country=None, coicop=None):
+    """A tár partíciói (országkód, COICOP) párokként, opcionális szűréssel"""
+    keys = sorted(key.split('/') for key in read_manifest(root))
+    return [(cc, item) for cc, item in keys
+            if (country is None or cc == country) and (coicop is None or item == coicop)]
+
+def read_partition(country_code, coicop, root=COICOP_STORE_DIR):
+    """Egy partíció széles formában: időszak index, mértékegységenként egy oszlop"""
+    path = os.path.join(partition_dir(country_code, coicop, root), 'data.csv')
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    df = pd.read_csv(path, parse_dates=['period'])
+    wide = df.pivot_table(index='period', columns='unit', values='value', aggfunc='last')
+    wide.columns.name = None
+    return wide.sort_index()
+
+def iter_partitions(root=COICOP_STORE_DIR, country=None, coicop=None):
+    """Partíciók egyenkénti beolvasása (egyszerre csak egy van a memóriában)"""
+    for country_code, item in partitions(root, country, coicop):
+        yield country_code, item, read_partition(country_code, item, root)
+
+def load_items(country_code, items, unit='ANR', root=COICOP_STORE_DIR):
+    """Kiválasztott COICOP részindexek egy mértékegységben (csak a kért partíciókat olvassa)"""
+    columns = {}
+    for item in items:
+        wide = read_partition(country_code, item, root)
+        if unit in wide.columns:
+            columns[item] = wide[unit]
+    return pd.DataFrame(columns)
+
+def summarize_partition(wide):
+    """Egy partíció összesítése: időszak tartomány, utolsó és csúcs éves ráta, index változás"""
+    summary = {'n': len(wide)}
+    if len(wide) == 0:
+        return summary
+    summary.update({'first_period': wide.index[0], 'last_period': wide.index[-1]})
+    if 'ANR' in wide.columns:
+        anr = wide['ANR'].dropna()
+        if len(anr) > 0:
+            summary.update({'anr_last': anr.iloc[-1], 'anr_mean': anr.mean(),
+                            'anr_max': anr.max(), 'anr_max_period': anr.idxmax()})
+    if 'INX' in wide.columns:
+        inx = wide['INX'].dropna().to_numpy()
+        if len(inx) > 12:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                summary['inx_change_5y'] = (inx[-1] / inx[max(len(inx) - 61, 0)] - 1) * 100
+    return summary
+
+def summarize_store(root=COICOP_STORE_DIR, country=None):
+    """Partíciónkénti összesítés (országkód, COICOP) soronként, korlátos memóriával"""
+    rows = [{'country': cc, 'coicop': item, **summarize_partition(wide)}
+            for cc, item, wide in iter_partitions(root, country)]
+    return pd.DataFrame(rows)
+
+def main():
+    from ECBGD_EU import COUNTRIES
+    print("=== HICP COICOP bontás (out-of-core) ===")
+    country_codes = [a.upper() for a in sys.argv[1:] if not a.startswith('--')] or list(COUNTRIES)
+    build_store(country_codes, download='--offline' not in sys.argv)
+    if store_exists():
+        summary = summarize_store()
+        summary.to_csv('eu_coicop_summary.csv', index=False)
+        print(f"✓ Mentve: eu_coicop_summary.csv ({len(summary)} partíció)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+
+# --- VÁLSÁGOK (dátum, megnevezés, szín) ---
+CRISIS_EVENTS = [
+    ('2008-09-15', '2008-as pénzügyi válság', 'red'),
+    ('2020-03-15', 'COVID-19 járvány', 'orange'),
+    ('2022-02-24', 'Ukrajna háború', 'purple')
+]
+# A számítás változásakor növelendő: a checkpointolt válságtábla ennek hatására újraszámolódik
+CRISIS_STATS_VERSION = 3
+# Gördülő ablakok hossza periódusban: adósság negyedéves, infláció havi
+DEBT_ROLLING_WINDOW = 8
+INFLATION_ROLLING_WINDOW = 12
+
+def build_panel(country_data):
+    """Országonkénti sorozatok ({'HU': {'data': pd.Series, ...}}) egy közös indexű DataFrame-be"""
+    panel = pd.DataFrame({cc: info['data'] for cc, info in country_data.items()})
+    return panel.sort_index()
+
+def _rows_at_or_before(index, dates):
+    """Minden dátumhoz az utolsó index pozíció, ami nem későbbi nála (-1, ha nincs ilyen)"""
+    return np.searchsorted(index.values, pd.to_datetime(dates).values, side='right') - 1
+
+def _take_rows(values, rows):
+    """Sorok kiválasztása; az érvénytelen (tartományon kívüli) pozíciók NaN-t adnak"""
+    valid = (rows >= 0) & (rows < len(values))
+    taken = values[np.clip(rows, 0, len(values) - 1)]
+    taken[~valid] = np.nan
+    return taken
+
+def debt_window_changes(debt_panel, event_dates, pre=4, post=8):
+    """Adósságráta változása az esemény előtti `pre` és utáni `post` negyedévben
+
+    Visszatérés: (pre_change, post_change), mindkettő események × országok mátrix.
+    """
+    values = debt_panel.ffill().to_numpy(dtype=float)
+    at_event = _rows_at_or_before(debt_panel.index, event_dates)
+    level = _take_rows(values, at_event)
+    pre_change = level - _take_rows(values, at_event - pre)
+    post_change = _take_rows(values, at_event + post) - level
+    return pre_change, post_change
+
+def inflation_window_peaks(inflation_panel, event_dates, baseline=12, horizon=36):
+    """Inflációs csúcs, csúcsig eltelt idő és visszarendeződés hossza az esemény után
+
+    A csúcsot az eseményt követő `horizon` hónapban keressük, a visszarendeződés
+    a csúcs utáni első hónap, amikor az infláció az esemény előtti `baseline`
+    hónap átlagára vagy az alá esik; ha a csúcs nem haladja meg a bázisszintet,
+    nincs mihez visszarendeződni (NaN). Minden kimenet események × országok mátrix.
+    """
+    values = inflation_panel.to_numpy(dtype=float)
+    n_rows = len(values)
+    at_event = _rows_at_or_before(inflation_panel.index, event_dates)
+
+    # (események, horizont, országok) ablakok egyetlen indexeléssel
+    offsets = np.arange(1, horizon + 1)
+    window_rows = at_event[:, None] + offsets[None, :]
+    windows = values[np.clip(window_rows, 0, n_rows - 1)]
+    windows[(window_rows >= n_rows) | (window_rows < 0)] = np.nan
+
+    baseline_rows = at_event[:, None] - np.arange(baseline)[None, :]
+    baseline_vals = values[np.clip(baseline_rows, 0, n_rows - 1)]
+    baseline_vals[baseline_rows < 0] = np.nan
+
+    has_data = ~np.all(np.isnan(windows), axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        base_level = np.nansum(baseline_vals, axis=1) / (~np.isnan(baseline_vals)).sum(axis=1)
+    filled = np.where(np.isnan(windows), -np.inf, windows)
+    peak_pos = filled.argmax(axis=1)
+    peak = np.take_along_axis(windows, peak_pos[:, None, :], axis=1)[:, 0, :]
+    peak[~has_data] = np.nan
+
+    # Visszarendeződés: a csúcs utáni első pozíció, ahol érték <= bázisszint
+    after_peak = offsets[None, :, None] > (peak_pos + 1)[:, None, :]
+    recovered = after_peak & (windows <= base_level[:, None, :])
+    recovery_pos = recovered.argmax(axis=1)
+    with np.errstate(invalid='ignore'):
+        above_base = peak > base_level
+    recovery = np.where(recovered.any(axis=1) & above_base, recovery_pos - peak_pos, np.nan)
+
+    time_to_peak = np.where(has_data, peak_pos + 1, np.nan)
+    return peak, time_to_peak, recovery, base_level
+
+def event_window_stats(debt_panel, inflation_panel, events=CRISIS_EVENTS,
+                       pre=4, post=8, baseline=12, horizon=36):
+    """Válságablak statisztikák minden országra és eseményre, hosszú formátumú táblában"""
+    events = list(events)
+    event_dates = [date for date, _, _ in events]
+    countries = debt_panel.columns.union(inflation_panel.columns)
+    debt_panel = debt_panel.reindex(columns=countries)
+    inflation_panel = inflation_panel.reindex(columns=countries)
+
+    pre_change, post_change = debt_window_changes(debt_panel, event_dates, pre, post)
+    peak, time_to_peak, recovery, base_level = inflation_window_peaks(
+        inflation_panel, event_dates, baseline, horizon)
+
+    result = pd.DataFrame({
+        'event': np.repeat([label for _, label, _ in events], len(countries)),
+        'event_date': np.repeat(pd.to_datetime(event_dates), len(countries)),
+        'country': np.tile(countries, len(events)),
+        'debt_change_pre': pre_change.ravel(),
+        'debt_change_post': post_change.ravel(),
+        'inflation_baseline': base_level.ravel(),
+        'inflation_peak': peak.ravel(),
+        'months_to_peak': time_to_peak.ravel(),
+        'recovery_months': recovery.ravel(),
+    })
+    return result
+
+def rolling_stats(panel, window):
+    """Gördülő átlag, volatilitás (változások szórása) és z-score a teljes panelre egyszerre"""
+    rolling = panel.rolling(window, min_periods=window)
+    mean = rolling.mean()
+    std = rolling.std()
+    volatility = panel.diff().rolling(window, min_periods=window).std()
+    zscore = (panel - mean) / std.where(std > 0)
+    return {'mean': mean, 'volatility': volatility, 'zscore': zscore}
+
+def event_rolling_stats(debt_panel, inflation_panel, events=CRISIS_EVENTS, horizon=36,
+                        debt_window=DEBT_ROLLING_WINDOW, inflation_window=INFLATION_ROLLING_WINDOW):
+    """Gördülő volatilitás és z-score az események körül, az event_window_stats soraival egyező táblában
+
+    Az esemény előtti érték az esemény időpontjában (vagy előtte utolsó) záruló ablak,
+    az utáni a `horizon` hónappal későbbi; a z-score maximum az eseményt követő
+    `horizon` hónap legnagyobb gördülő inflációs z-score-ja (mennyire szokatlan a kilengés).
+    """
+    events = list(events)
+    event_dates = [date for date, _, _ in events]
+    countries = debt_panel.columns.union(inflation_panel.columns)
+    debt = rolling_stats(debt_panel.reindex(columns=countries), debt_window)
+    inflation = rolling_stats(inflation_panel.reindex(columns=countries), inflation_window)
+
+    debt_at = _rows_at_or_before(debt_panel.index, event_dates)
+    inflation_at = _rows_at_or_before(inflation_panel.index, event_dates)
+    inflation_volatility = inflation['volatility'].to_numpy(dtype=float)
+    zscores = inflation['zscore'].to_numpy(dtype=float)
+
+    window_rows = inflation_at[:, None] + np.arange(1, horizon + 1)[None, :]
+    windows = zscores[np.clip(window_rows, 0, len(zscores) - 1)]
+    windows[(window_rows >= len(zscores)) | (window_rows < 0)] = np.nan
+    with np.errstate(invalid='ignore'):
+        has_data = ~np.all(np.isnan(windows), axis=1)
+        zscore_max = np.where(has_data, np.nanmax(np.where(np.isnan(windows), -np.inf, windows), axis=1),
+                              np.nan)
+
+    return pd.DataFrame({
+        'event': np.repeat([label for _, label, _ in events], len(countries)),
+        'country': np.tile(countries, len(events)),
+        'debt_volatility': _take_rows(debt['volatility'].to_numpy(dtype=float), debt_at).ravel(),
+        'inflation_volatility_pre': _take_rows(inflation_volatility, inflation_at).ravel(),
+        'inflation_volatility_post': _take_rows(inflation_volatility, inflation_at + horizon).ravel(),
+        'inflation_zscore_max': zscore_max.ravel(),
+    })
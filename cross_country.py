@@ -0,0 +1,311 @@
+import hashlib
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
+from matplotlib.figure import Figure
+
+try:
+    from scipy.cluster.hierarchy import linkage as scipy_linkage
+    from scipy.spatial.distance import squareform
+except ImportError:  # opcionális függőség: nélküle saját átlagos láncolás
+    scipy_linkage = None
+
+from ECBGD_EU import COUNTRIES
+from parallel_parse import load_country_panels
+from plot_lod import save_figure
+from revisions import PERIOD_FREQ
+from series_registry import SERIES
+
+# --- ORSZÁGOK KÖZÖTTI KORRELÁCIÓ ---
+# A páronkénti (és késleltetett) korrelációt elégséges statisztikákból számoljuk:
+# minden (késleltetés, ország i, ország j) párra n, Σx, Σy, Σx², Σy², Σxy a közös
+# (mindkét országban meglévő) megfigyelésekre, mátrixszorzással. Ezek csak a két
+# ország sorozatától függenek, így egy ország frissülésekor csak az ő sora és
+# oszlopa számolódik újra (O(T·N) az O(T·N²) helyett).
+CROSS_CACHE_DIR = "cross_country"
+MIN_OVERLAP = 24          # ennél kevesebb közös megfigyelésnél nincs korreláció
+N_CLUSTERS = 4
+# Sorozatonként: transzformáció és maximális késleltetés (periódusban).
+# Az adósságráta szintje trendes (hamis korreláció), ezért a változásait vetjük össze.
+CROSS_SERIES = {
+    'hicp': {'transform': None, 'max_lag': 12, 'label': 'HICP infláció'},
+    'debt': {'transform': 'diff', 'max_lag': 4, 'label': 'Államadósság változás'},
+}
+STAT_NAMES = ('n', 'sx', 'sy', 'sxx', 'syy', 'sxy')
+
+def prepare_panel(panel, freq, transform=None):
+    """Szabályos időrácsra igazított, transzformált panel (a sor eltolás = periódus eltolás)"""
+    panel = panel.sort_index()
+    grid = pd.date_range(panel.index[0], panel.index[-1], freq=PERIOD_FREQ[freq])
+    panel = panel.reindex(grid)
+    if transform == 'diff':
+        panel = panel.diff()
+    return panel.dropna(axis=1, how='all')
+
+def column_hash(periods, values):
+    """Egy ország oszlopának tartalom hash-e (a meglévő megfigyelések időszakai és értékei)"""
+    valid = ~np.isnan(values)
+    digest = hashlib.sha1(periods[valid].tobytes())
+    digest.update(values[valid].tobytes())
+    return digest.hexdigest()
+
+def pair_stats(x, y):
+    """Elégséges statisztikák minden (x oszlop, y oszlop) párra: (6, Nx, Ny) tömb
+
+    Csak azok a sorok számítanak, ahol mindkét érték megvan (páronként teljes megfigyelések).
+    """
+    mx, my = ~np.isnan(x), ~np.isnan(y)
+    zx, zy = np.where(mx, x, 0.0), np.where(my, y, 0.0)
+    mx, my = mx.astype(float), my.astype(float)
+    return np.stack([mx.T @ my, zx.T @ my, mx.T @ zy,
+                     (zx * zx).T @ my, mx.T @ (zy * zy), zx.T @ zy])
+
+def lag_slices(n_rows, lag):
+    """Sorok x(t) és y(t + lag) párosításához (negatív késleltetés is)"""
+    if lag >= 0:
+        return slice(0, n_rows - lag), slice(lag, n_rows)
+    return slice(-lag, n_rows), slice(0, n_rows + lag)
+
+def stats_to_corr(stats, min_overlap=MIN_OVERLAP):
+    """Korreláció az elégséges statisztikákból (..., 6, N, N) -> (..., N, N)"""
+    n, sx, sy, sxx, syy, sxy = np.moveaxis(stats, -3, 0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = n * sxy - sx * sy
+        var_x = n * sxx - sx * sx
+        var_y = n * syy - sy * sy
+        corr = cov / np.sqrt(var_x * var_y)
+    corr[(n < min_overlap) | (var_x <= 0) | (var_y <= 0)] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+def _average_linkage(dist):
+    """Átlagos láncolású hierarchikus klaszterezés (scipy linkage formátumú mátrix)"""
+    n = len(dist)
+    dist = dist.astype(float).copy()
+    np.fill_diagonal(dist, np.inf)
+    sizes = np.ones(n)
+    labels = np.arange(n)
+    active = np.ones(n, dtype=bool)
+    merges = []
+    for step in range(n - 1):
+        masked = np.where(active[:, None] & active[None, :], dist, np.inf)
+        a, b = np.unravel_index(np.argmin(masked), masked.shape)
+        a, b = min(a, b), max(a, b)
+        merges.append([min(labels[a], labels[b]), max(labels[a], labels[b]),
+                       masked[a, b], sizes[a] + sizes[b]])
+        # Az összevont klaszter távolsága a többitől: méretekkel súlyozott átlag
+        merged = (dist[a] * sizes[a] + dist[b] * sizes[b]) / (sizes[a] + sizes[b])
+        dist[a], dist[:, a] = merged, merged
+        dist[a, a] = np.inf
+        sizes[a] += sizes[b]
+        labels[a] = n + step
+        active[b] = False
+    return np.array(merges)
+
+def linkage_matrix(corr):
+    """Hierarchikus klaszterezés 1 - korreláció távolsággal (hiányzó korreláció = 1)"""
+    dist = 1.0 - np.nan_to_num(corr, nan=0.0)
+    dist = (dist + dist.T) / 2
+    np.fill_diagonal(dist, 0.0)
+    if scipy_linkage is not None:
+        return scipy_linkage(squareform(dist, checks=False), method='average')
+    return _average_linkage(dist)
+
+def cut_clusters(linkage, n_leaves, n_clusters=N_CLUSTERS):
+    """Klasztercímkék (1..k) a dendrogram k klaszterre vágásával"""
+    parent = list(range(2 * n_leaves - 1))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for step, (a, b, _, _) in enumerate(linkage[:max(n_leaves - n_clusters, 0)]):
+        parent[find(int(a))] = n_leaves + step
+        parent[find(int(b))] = n_leaves + step
+    roots = [find(i) for i in range(n_leaves)]
+    order = {root: k + 1 for k, root in enumerate(dict.fromkeys(roots))}
+    return np.array([order[root] for root in roots])
+
+def leaf_order(linkage, n_leaves):
+    """Levelek sorrendje a dendrogram szerint (hőtérképhez)"""
+    children = {n_leaves + step: (int(a), int(b)) for step, (a, b, _, _) in enumerate(linkage)}
+    stack, order = [2 * n_leaves - 2] if n_leaves > 1 else [0], []
+    while stack:
+        node = stack.pop()
+        if node < n_leaves:
+            order.append(node)
+        else:
+            stack.extend(reversed(children[node]))
+    return order
+
+class CrossCorrelation:
+    """Országok közötti (késleltetett) korreláció, inkrementálisan frissített cache-sel"""
+
+    def __init__(self, series_id, max_lag=0, path=CROSS_CACHE_DIR):
+        self.series_id = series_id
+        self.max_lag = max_lag
+        self.lags = np.arange(-max_lag, max_lag + 1)
+        self.file = os.path.join(path, f"{series_id}.npz")
+        self.countries = []
+        self.hashes = []
+        self.stats = np.zeros((len(self.lags), len(STAT_NAMES), 0, 0))
+        self._load()
+
+    # --- Cache ---
+    def _load(self):
+        if not os.path.exists(self.file):
+            return
+        with np.load(self.file) as cached:
+            if not np.array_equal(cached['lags'], self.lags):
+                return
+            self.countries = list(cached['countries'])
+            self.hashes = list(cached['hashes'])
+            self.stats = cached['stats']
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.file), exist_ok=True)
+        tmp_path = self.file + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, lags=self.lags, countries=np.array(self.countries, dtype=str),
+                     hashes=np.array(self.hashes, dtype=str), stats=self.stats)
+        os.replace(tmp_path, self.file)
+
+    # --- Frissítés ---
+    def update(self, panel):
+        """Statisztikák frissítése egy (szabályos rácsú) panelből; csak a változott országokra
+
+        Visszatérés: az újraszámolt országok listája.
+        """
+        values = panel.to_numpy(dtype=float)
+        # Oszloponként a saját átlagával centrálunk: a korrelációt nem változtatja,
+        # a nyers momentumok kioltásos pontatlanságát viszont elkerüli
+        with np.errstate(invalid='ignore'):
+            values = values - np.nanmean(values, axis=0)
+        countries = list(panel.columns)
+        periods = panel.index.to_numpy(dtype='datetime64[ns]').view(np.int64)
+        hashes = [column_hash(periods, values[:, i]) for i in range(len(countries))]
+
+        old = {cc: (i, h) for i, (cc, h) in enumerate(zip(self.countries, self.hashes))}
+        changed = [i for i, (cc, h) in enumerate(zip(countries, hashes))
+                   if cc not in old or old[cc][1] != h]
+        n = len(countries)
+        stats = np.zeros((len(self.lags), len(STAT_NAMES), n, n))
+
+        # Változatlan párok átvétele a cache-ből
+        kept = [i for i in range(n) if i not in set(changed)]
+        if kept:
+            src = np.array([old[countries[i]][0] for i in kept])
+            stats[np.ix_(range(len(self.lags)), range(len(STAT_NAMES)), kept, kept)] = \
+                self.stats[np.ix_(range(len(self.lags)), range(len(STAT_NAMES)), src, src)]
+
+        # A változott országok sora és oszlopa minden késleltetésre
+        if changed:
+            for k, lag in enumerate(self.lags):
+                x_rows, y_rows = lag_slices(len(values), lag)
+                x, y = values[x_rows], values[y_rows]
+                stats[k][:, changed, :] = pair_stats(x[:, changed], y)
+                stats[k][:, :, changed] = pair_stats(x, y[:, changed])
+
+        self.countries, self.hashes, self.stats = countries, hashes, stats
+        return [countries[i] for i in changed]
+
+    # --- Eredmények ---
+    def correlation(self, lag=0, min_overlap=MIN_OVERLAP):
+        """Korrelációs mátrix adott késleltetésre: corr(x_i(t), x_j(t + lag))"""
+        k = int(np.flatnonzero(self.lags == lag)[0])
+        return pd.DataFrame(stats_to_corr(self.stats[k], min_overlap),
+                            index=self.countries, columns=self.countries)
+
+    def lagged(self, min_overlap=MIN_OVERLAP):
+        """Országpáronként a legerősebb (abszolút) korrelációjú késleltetés, hosszú táblában"""
+        corr = stats_to_corr(self.stats, min_overlap)                   # (késleltetés, N, N)
+        filled = np.where(np.isnan(corr), -np.inf, np.abs(corr))
+        best = filled.argmax(axis=0)
+        best_corr = np.take_along_axis(corr, best[None], axis=0)[0]
+        i, j = np.triu_indices(len(self.countries), k=1)
+        return pd.DataFrame({
+            'country': np.array(self.countries)[i],
+            'other': np.array(self.countries)[j],
+            'corr_lag0': corr[self.max_lag][i, j],
+            'best_lag': self.lags[best[i, j]],
+            'best_corr': best_corr[i, j],
+        })
+
+    def clusters(self, n_clusters=N_CLUSTERS, min_overlap=MIN_OVERLAP):
+        """Hierarchikus klaszterek az egyidejű korreláció alapján: (címkék, sorrend)"""
+        corr = self.correlation(0, min_overlap).to_numpy()
+        if len(corr) < 2:
+            return pd.Series(1, index=self.countries, name='cluster'), list(self.countries)
+        linkage = linkage_matrix(corr)
+        labels = cut_clusters(linkage, len(corr), n_clusters)
+        order = [self.countries[i] for i in leaf_order(linkage, len(corr))]
+        return pd.Series(labels, index=self.countries, name='cluster'), order
+
+def cross_correlation(series_id, panel, path=CROSS_CACHE_DIR):
+    """Egy sorozat korrelációs statisztikáinak betöltése és frissítése (a cache mentésével)"""
+    config = CROSS_SERIES[series_id]
+    prepared = prepare_panel(panel, SERIES[series_id]['freq'], config['transform'])
+    cross = CrossCorrelation(series_id, config['max_lag'], path)
+    previous = list(cross.countries)
+    changed = cross.update(prepared)
+    if changed or cross.countries != previous:
+        cross.save()
+    return cross, changed
+
+def update_from_store(store, series_ids=tuple(CROSS_SERIES)):
+    """Frissítés az idősor tárból (a háttérfrissítő hívja, ha egy ország sorozata változott)"""
+    for series_id in series_ids:
+        by_country = store.read_panel(series_id)
+        if not by_country:
+            continue
+        _, changed = cross_correlation(series_id, pd.DataFrame(by_country))
+        if changed:
+            print(f"✓ {series_id} korreláció frissítve: {', '.join(changed)}")
+
+def plot_heatmap(corr, order, title, path, preview=False):
+    """Korrelációs hőtérkép a klaszter sorrendben"""
+    corr = corr.loc[order, order]
+    fig = Figure(figsize=(11, 9.5))
+    ax = fig.subplots()
+    image = ax.imshow(corr.to_numpy(), cmap='RdBu_r', vmin=-1, vmax=1)
+    ax.set_xticks(range(len(order)), order, rotation=90, fontsize=8)
+    ax.set_yticks(range(len(order)), order, fontsize=8)
+    ax.set_title(title, fontsize=14, fontweight='bold')
+    fig.colorbar(image, ax=ax, shrink=0.8, label='Korreláció')
+    fig.tight_layout()
+    save_figure(fig, path, preview)
+
+def main(preview=False):
+    print("=== Országok közötti korreláció és klaszterezés ===")
+    panels = load_country_panels(list(CROSS_SERIES), list(COUNTRIES))
+    for series_id, config in CROSS_SERIES.items():
+        panel = panels[series_id]
+        if panel.shape[1] < 2:
+            print(f"✗ {series_id}: kevés ország")
+            continue
+        start = time.perf_counter()
+        cross, changed = cross_correlation(series_id, panel)
+        elapsed = time.perf_counter() - start
+        print(f"✓ {config['label']}: {len(cross.countries)} ország, {len(changed)} újraszámolva "
+              f"({len(cross.lags)} késleltetés, {elapsed * 1000:.0f} ms)")
+
+        corr = cross.correlation(0)
+        labels, order = cross.clusters()
+        for cluster, members in labels.groupby(labels):
+            print(f"  {cluster}. klaszter: {', '.join(members.index)}")
+
+        corr.to_csv(f"eu_correlation_{series_id}.csv")
+        cross.lagged().to_csv(f"eu_lagged_correlation_{series_id}.csv", index=False)
+        labels.to_csv(f"eu_clusters_{series_id}.csv")
+        plot_heatmap(corr, order, f"{config['label']}: országok közötti korreláció",
+                     f"eu_correlation_{series_id}.png", preview)
+        print(f"✓ Mentve: eu_correlation_{series_id}.csv/.png, eu_lagged_correlation_{series_id}.csv")
+
+if __name__ == '__main__':
+    main(preview='--preview' in sys.argv)
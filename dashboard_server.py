@@ -0,0 +1,253 @@
+import io
+import json
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.dates as mdates
+from matplotlib.figure import Figure
+import pandas as pd
+
+from series_registry import SERIES, load_series_panel
+from ECBGD_EU import COUNTRIES
+from crisis_analytics import CRISIS_EVENTS
+
+# --- SZERVER BEÁLLÍTÁSOK ---
+DASHBOARD_HOST = "127.0.0.1"
+DASHBOARD_PORT = 8050
+DASHBOARD_SERIES = ['debt', 'hicp']
+REFRESH_INTERVAL = 3600  # háttérfrissítés gyakorisága másodpercben
+LRU_SIZE = 128
+
+class LRUCache:
+    """Szálbiztos, méretkorlátos LRU cache"""
+
+    def __init__(self, maxsize=LRU_SIZE):
+        self.maxsize = maxsize
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.items:
+                return None
+            self.items.move_to_end(key)
+            return self.items[key]
+
+    def put(self, key, value):
+        with self.lock:
+            self.items[key] = value
+            self.items.move_to_end(key)
+            while len(self.items) > self.maxsize:
+                self.items.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+
+class DashboardData:
+    """Memóriában tartott panelek, háttérfrissítéssel
+
+    A kérések mindig a legutóbb betöltött paneleket látják; a letöltés csak
+    a háttérszálban fut, így egy kérés sem vár az ECB-re.
+    """
+
+    def __init__(self, series_ids=DASHBOARD_SERIES, countries=COUNTRIES):
+        self.series_ids = list(series_ids)
+        self.countries = list(countries)
+        self.panels = {series_id: {} for series_id in self.series_ids}
+        self.version = 0
+        self.loaded_at = None
+        self.query_cache = LRUCache()
+        self.image_cache = LRUCache()
+        self.lock = threading.Lock()
+
+    def refresh(self):
+        """Panelek újratöltése (cache vagy letöltés) és a válasz cache-ek ürítése"""
+        panels = {series_id: load_series_panel(series_id, self.countries)
+                  for series_id in self.series_ids}
+        with self.lock:
+            self.panels = panels
+            self.version += 1
+            self.loaded_at = time.time()
+        self.query_cache.clear()
+        self.image_cache.clear()
+        print(f"✓ Dashboard adatok frissítve (verzió: {self.version})")
+
+    def start_refresher(self, interval=REFRESH_INTERVAL):
+        """Háttérszál, ami induláskor és utána `interval` másodpercenként frissít"""
+        def loop():
+            while True:
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"✗ Háttérfrissítés sikertelen: {e}")
+                time.sleep(interval)
+
+        thread = threading.Thread(target=loop, name='dashboard-refresher', daemon=True)
+        thread.start()
+        return thread
+
+    def select(self, series_id, countries, start=None, end=None):
+        """Kiválasztott országok sorozatai dátumtartományra szűrve"""
+        with self.lock:
+            panel = self.panels.get(series_id, {})
+        selected = {}
+        for country_code in countries:
+            series = panel.get(country_code)
+            if series is None:
+                continue
+            selected[country_code] = series.loc[start:end]
+        return selected
+
+def parse_date(value, name):
+    """Dátum paraméter pd.Timestamp-ként; hibás értéknél ValueError (400-as válasz)
+
+    Időzónás értéket (pl. 2020-06-01T00:00:00+02:00) UTC-re váltva, időzóna nélkül adunk
+    vissza, mert a panelek indexe időzóna nélküli.
+    """
+    if not value:
+        return None
+    try:
+        ts = pd.Timestamp(value)
+    except (ValueError, TypeError, OverflowError):
+        ts = pd.NaT
+    if pd.isna(ts):
+        raise ValueError(f"Érvénytelen dátum ({name}): {value}")
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert(None)
+    return ts
+
+def parse_query(query_string, series_ids=DASHBOARD_SERIES):
+    """Lekérdezési paraméterek: series, countries, start, end, preview
+
+    A sorozatnak a betöltöttek (series_ids) között kell lennie; a regiszter többi
+    (pl. paraméteres) sorozata üres adat helyett 400-as választ ad.
+    """
+    params = parse_qs(query_string)
+    series_id = params.get('series', ['debt'])[0]
+    if series_id not in series_ids:
+        raise ValueError(f"Ismeretlen vagy nem betöltött sorozat: {series_id}")
+    countries = params.get('countries', [''])[0]
+    countries = [cc.strip().upper() for cc in countries.split(',') if cc.strip()] or list(COUNTRIES)
+    start = parse_date(params.get('start', [None])[0], 'start')
+    end = parse_date(params.get('end', [None])[0], 'end')
+    preview = params.get('preview', ['0'])[0] in ('1', 'true')
+    return series_id, tuple(sorted(countries)), start, end, preview
+
+def series_json(data, series_id, countries, start, end):
+    """JSON válasz a kiválasztott sorozatokról (LRU cache-elve)"""
+    key = (data.version, series_id, countries, start, end)
+    cached = data.query_cache.get(key)
+    if cached is not None:
+        return cached
+
+    selected = data.select(series_id, countries, start, end)
+    payload = {
+        'series': series_id,
+        'label': SERIES[series_id]['label'],
+        'version': data.version,
+        'data': {
+            cc: {
+                'name': COUNTRIES.get(cc, {}).get('name', cc),
+                'periods': [d.strftime('%Y-%m-%d') for d in series.index],
+                'values': [round(float(v), 3) for v in series.values],
+            }
+            for cc, series in selected.items()
+        },
+    }
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    data.query_cache.put(key, body)
+    return body
+
+def render_chart(data, series_id, countries, start, end, preview=False):
+    """PNG grafikon a kiválasztott országokra (LRU cache-elve)"""
+    key = (data.version, series_id, countries, start, end, preview)
+    cached = data.image_cache.get(key)
+    if cached is not None:
+        return cached
+
+    selected = data.select(series_id, countries, start, end)
+    # pyplot helyett közvetlen Figure: a kérések párhuzamos szálakban renderelnek
+    fig = Figure(figsize=(12, 6))
+    ax = fig.subplots()
+    for country_code, series in selected.items():
+        info = COUNTRIES.get(country_code, {})
+        ax.plot(series.index, series.values, linewidth=2,
+                color=info.get('color'), label=info.get('name', country_code))
+
+    for crisis_date, crisis_label, crisis_color in CRISIS_EVENTS:
+        crisis_ts = pd.to_datetime(crisis_date)
+        if (start is None or crisis_ts >= pd.to_datetime(start)) and \
+                (end is None or crisis_ts <= pd.to_datetime(end)):
+            ax.axvline(crisis_ts, color=crisis_color, linestyle='--', alpha=0.7)
+
+    ax.set_title(SERIES[series_id]['label'], fontsize=14, fontweight='bold')
+    ax.grid(True, alpha=0.3)
+    if selected:
+        ax.legend(loc='upper left')
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y'))
+    fig.tight_layout()
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=60 if preview else 100)
+    image = buffer.getvalue()
+    data.image_cache.put(key, image)
+    return image
+
+def make_handler(data):
+    """HTTP kezelő osztály a megosztott adatokhoz kötve"""
+
+    class DashboardHandler(BaseHTTPRequestHandler):
+        def _send(self, status, content_type, body):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            try:
+                if url.path == '/api/series':
+                    series_id, countries, start, end, _ = parse_query(url.query, data.series_ids)
+                    self._send(200, 'application/json; charset=utf-8',
+                               series_json(data, series_id, countries, start, end))
+                elif url.path == '/chart.png':
+                    series_id, countries, start, end, preview = parse_query(url.query, data.series_ids)
+                    self._send(200, 'image/png',
+                               render_chart(data, series_id, countries, start, end, preview))
+                elif url.path == '/api/status':
+                    status = {'version': data.version, 'loaded_at': data.loaded_at,
+                              'series': {s: sorted(p) for s, p in data.panels.items()}}
+                    self._send(200, 'application/json; charset=utf-8',
+                               json.dumps(status).encode('utf-8'))
+                else:
+                    self._send(404, 'text/plain; charset=utf-8', 'Nem található'.encode('utf-8'))
+            except ValueError as e:
+                self._send(400, 'text/plain; charset=utf-8', str(e).encode('utf-8'))
+
+        def log_message(self, format, *args):
+            pass
+
+    return DashboardHandler
+
+def main():
+    print("=== EU Államadósság és Infláció Dashboard ===")
+    data = DashboardData()
+    data.start_refresher()
+    server = ThreadingHTTPServer((DASHBOARD_HOST, DASHBOARD_PORT), make_handler(data))
+    print(f"Dashboard: http://{DASHBOARD_HOST}:{DASHBOARD_PORT}/chart.png?series=debt&countries=HU,DE")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nLeállítás...")
+    finally:
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
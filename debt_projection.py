@@ -0,0 +1,154 @@
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
+from matplotlib.figure import Figure
+
+from ECBGD_EU import COUNTRIES
+from parallel_parse import load_country_panels
+from plot_lod import save_figure
+
+# --- ADÓSSÁGDINAMIKA ---
+# d[t+1] = d[t] * (1 + i) / ((1 + g) * (1 + π)) - pb[t]
+# d: adósság/GDP (%), i: effektív nominális kamat, g: reál növekedés,
+# π: infláció (a GDP deflátort HICP-vel közelítjük), pb: elsődleges egyenleg (% GDP).
+# A pályák tömbje (ország x forgatókönyv x év); az időbeli rekurzió
+# kumulált szorzattal/összeggel zárt alakban számolódik, ciklus nélkül.
+HORIZON_YEARS = 10
+N_SCENARIOS = 10_000
+QUANTILES = (0.05, 0.10, 0.25, 0.50, 0.75, 0.90, 0.95)
+DEBT_THRESHOLD = 90.0
+PROJECTION_CSV = "debt_projection_quantiles.csv"
+PROJECTION_PNG = "debt_projection_fan.png"
+
+# Feltevések (átlag, szórás) százalékban, ha nincs országspecifikus adat
+DEFAULT_ASSUMPTIONS = {
+    'interest': (3.0, 0.75),
+    'real_growth': (1.5, 2.0),
+    'inflation': (2.0, 1.5),
+    'primary_balance': (0.0, 1.0),
+}
+# Sokkok korrelációja: reál növekedés, infláció, kamat
+SHOCK_CORRELATION = np.array([
+    [1.0, 0.2, 0.1],
+    [0.2, 1.0, 0.4],
+    [0.1, 0.4, 1.0],
+])
+SHOCK_PERSISTENCE = 0.5   # AR(1) együttható az éves sokkokra
+
+def calibrate(debt_panel, inflation_panel, assumptions=DEFAULT_ASSUMPTIONS):
+    """Országonkénti kiinduló adósság és inflációs paraméterek a panelekből
+
+    Visszatérés: DataFrame országkód indexszel (debt0, inflation_mean, inflation_std, ...).
+    """
+    countries = [cc for cc in debt_panel.columns if debt_panel[cc].notna().any()]
+    rows = {}
+    for cc in countries:
+        row = {'debt0': debt_panel[cc].dropna().iloc[-1]}
+        for name, (mean, std) in assumptions.items():
+            row[f'{name}_mean'] = mean
+            row[f'{name}_std'] = std
+        if cc in inflation_panel:
+            inflation = inflation_panel[cc].dropna()
+            annual = inflation.groupby(inflation.index.year).mean()
+            if len(annual) >= 5:
+                row['inflation_mean'] = inflation.iloc[-60:].mean()
+                row['inflation_std'] = annual.iloc[-20:].std()
+        rows[cc] = row
+    return pd.DataFrame.from_dict(rows, orient='index')
+
+def _correlated_shocks(rng, shape, persistence=SHOCK_PERSISTENCE):
+    """Korrelált, AR(1) perzisztens standard sokkok: shape + (3,)"""
+    chol = np.linalg.cholesky(SHOCK_CORRELATION)
+    z = rng.standard_normal(shape + (3,)) @ chol.T
+    # AR(1) szűrés az idő tengely mentén (a horizont rövid, a többi dimenzió vektorizált)
+    scale = np.sqrt(1 - persistence ** 2)
+    for t in range(1, shape[-1]):
+        z[..., t, :] = persistence * z[..., t - 1, :] + scale * z[..., t, :]
+    return z
+
+def simulate(params, horizon=HORIZON_YEARS, n_scenarios=N_SCENARIOS, seed=None):
+    """Monte Carlo adósságpályák: tömb (ország x forgatókönyv x év), az első év a kiinduló érték után"""
+    rng = np.random.default_rng(seed)
+    n_countries = len(params)
+    shape = (n_countries, n_scenarios, horizon)
+
+    def column(name):
+        return params[name].to_numpy(dtype=float)[:, None, None]
+
+    shocks = _correlated_shocks(rng, shape)
+    growth = (column('real_growth_mean') + column('real_growth_std') * shocks[..., 0]) / 100
+    inflation = (column('inflation_mean') + column('inflation_std') * shocks[..., 1]) / 100
+    interest = (column('interest_mean') + column('interest_std') * shocks[..., 2]) / 100
+    primary = column('primary_balance_mean') + column('primary_balance_std') * rng.standard_normal(shape)
+
+    # d[t] = A[t] * (d0 - Σ_{k<=t} pb[k] / A[k]),  A[t] = Π_{j<=t} (1+i)/((1+g)(1+π))
+    factor = (1 + interest) / ((1 + growth) * (1 + inflation))
+    cumulative = np.cumprod(factor, axis=-1)
+    return cumulative * (column('debt0') - np.cumsum(primary / cumulative, axis=-1))
+
+def projection_quantiles(paths, countries, start_year, quantiles=QUANTILES):
+    """Kvantilisek évenként és országonként, hosszú formátumban (a fan chart ebből rajzol)"""
+    q = np.quantile(paths, quantiles, axis=1)            # (kvantilis, ország, év)
+    years = np.arange(start_year + 1, start_year + 1 + paths.shape[-1])
+    index = pd.MultiIndex.from_product([countries, years], names=['country', 'year'])
+    frame = pd.DataFrame(q.reshape(len(quantiles), -1).T, index=index,
+                         columns=[f'q{int(round(p * 100)):02d}' for p in quantiles])
+    frame['prob_above_threshold'] = (paths > DEBT_THRESHOLD).mean(axis=1).ravel()
+    return frame.reset_index()
+
+def plot_fan_charts(quantiles, params, path=PROJECTION_PNG, preview=False):
+    """Fan chart országonként az előre kiszámolt kvantilisekből"""
+    countries = list(params.index)
+    n_cols = 4
+    n_rows = -(-len(countries) // n_cols)
+    fig = Figure(figsize=(4.5 * n_cols, 3.2 * n_rows))
+    axes = fig.subplots(n_rows, n_cols, squeeze=False).ravel()
+    for ax, cc in zip(axes, countries):
+        q = quantiles[quantiles['country'] == cc]
+        color = COUNTRIES.get(cc, {}).get('color', '#1f77b4')
+        for low, high, alpha in (('q05', 'q95', 0.15), ('q10', 'q90', 0.25), ('q25', 'q75', 0.4)):
+            ax.fill_between(q['year'], q[low], q[high], color=color, alpha=alpha, linewidth=0)
+        ax.plot(q['year'], q['q50'], color=color, linewidth=2)
+        ax.axhline(DEBT_THRESHOLD, color='gray', linestyle='--', linewidth=1)
+        ax.scatter([q['year'].iloc[0] - 1], [params.loc[cc, 'debt0']], color='black', s=12, zorder=3)
+        ax.set_title(COUNTRIES.get(cc, {}).get('name', cc), fontsize=11, fontweight='bold')
+        ax.grid(True, alpha=0.3)
+    for ax in axes[len(countries):]:
+        ax.set_visible(False)
+    fig.suptitle('Államadósság előrejelzés (% GDP), 5-95% sávok', fontsize=14, fontweight='bold')
+    fig.tight_layout()
+    save_figure(fig, path, preview)
+
+def main(preview=False):
+    print("=== Adósságdinamika Monte Carlo ===")
+    panels = load_country_panels(['debt', 'hicp'], list(COUNTRIES))
+    params = calibrate(panels['debt'], panels['hicp'])
+    if len(params) == 0:
+        print("✗ Nincs adósság adat")
+        return
+
+    start = time.perf_counter()
+    paths = simulate(params, seed=0)
+    elapsed = time.perf_counter() - start
+    print(f"✓ {paths.shape[0]} ország x {paths.shape[1]} forgatókönyv x {paths.shape[2]} év: "
+          f"{elapsed * 1000:.0f} ms")
+
+    start_year = int(panels['debt'].dropna(how='all').index[-1].year)
+    quantiles = projection_quantiles(paths, list(params.index), start_year)
+    quantiles.to_csv(PROJECTION_CSV, index=False)
+    final = quantiles[quantiles['year'] == quantiles['year'].max()]
+    for row in final.itertuples():
+        name = COUNTRIES.get(row.country, {}).get('name', row.country)
+        print(f"  {name}: {params.loc[row.country, 'debt0']:.1f}% -> medián {row.q50:.1f}% "
+              f"({row.q05:.1f}-{row.q95:.1f}%), P(>{DEBT_THRESHOLD:.0f}%) = {row.prob_above_threshold:.0%}")
+    print(f"✓ Mentve: {PROJECTION_CSV}")
+
+    plot_fan_charts(quantiles, params, preview=preview)
+    print(f"✓ Mentve: {PROJECTION_PNG}")
+
+if __name__ == '__main__':
+    main(preview='--preview' in sys.argv)
@@ -0,0 +1,246 @@
+import time
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+try:
+    from scipy.linalg import solveh_banded
+except ImportError:  # opcionális függőség: nélküle saját sávos Cholesky
+    solveh_banded = None
+
+from ECBGD_EU import COUNTRIES
+from indicators import ksh_levels
+from parallel_parse import load_country_panels
+from series_registry import SERIES
+from sources import SOURCES
+from ts_store import open_store
+
+# --- TREND/CIKLUS FELBONTÁS ---
+# Hodrick-Prescott: (I + λ DᵀD) τ = y, ahol D a második differencia operátor; a mátrix
+# ötátlós (sávos, szimmetrikus pozitív definit), így O(T) idejű sávos megoldással, a
+# panel minden azonos lefedettségű oszlopára egyszerre (több jobb oldal) számolunk.
+# Centrált mozgóátlag: 2×12 (havi) / 2×4 (negyedéves). Szezonális kiigazítás (STL-jellegű):
+# logaritmusban trend (mozgóátlag) és hónaponkénti, évek mentén simított szezonális tényező
+# váltakozó becslése, minden KSH főcsoportra egyszerre.
+HP_LAMBDA = {'M': 129600, 'Q': 1600, 'A': 6.25}   # Ravn-Uhlig konvenció
+MA_WINDOW = {'M': 12, 'Q': 4, 'A': 1}
+SA_ITERATIONS = 3
+SEASONAL_WEIGHTS = np.array([1, 2, 3, 2, 1]) / 9    # 3×3 simítás az évek mentén
+DECOMPOSITION_SERIES = ['debt', 'hicp']
+KSH_SA_DATASET = 'ksh_cpi'
+
+def hp_bands(n, lamb):
+    """I + λ DᵀD felső sávos tárolásban (solveh_banded formátum): (3, n) tömb"""
+    ab = np.zeros((3, n))
+    main = np.full(n, 6.0)
+    main[[0, -1]] = 1.0
+    main[[1, -2]] = 5.0
+    off1 = np.full(n - 1, -4.0)
+    off1[[0, -1]] = -2.0
+    ab[2] = 1.0 + lamb * main
+    ab[1, 1:] = lamb * off1
+    ab[0, 2:] = lamb
+    return ab
+
+@lru_cache(maxsize=32)
+def _banded_cholesky(n, lamb):
+    """Ötátlós mátrix Cholesky tényezője: L főátló, első és második alátló"""
+    ab = hp_bands(n, lamb)
+    d0, d1, d2 = np.zeros(n), np.zeros(n), np.zeros(n)
+    for i in range(n):
+        if i >= 2:
+            d2[i] = ab[0, i] / d0[i - 2]
+        if i >= 1:
+            d1[i] = (ab[1, i] - (d2[i] * d1[i - 1] if i >= 2 else 0.0)) / d0[i - 1]
+        d0[i] = np.sqrt(ab[2, i] - d1[i] ** 2 - d2[i] ** 2)
+    return d0, d1, d2
+
+def _solve_banded(n, lamb, rhs):
+    """(I + λ DᵀD) X = rhs megoldása; rhs (n, K), a K oszlop egyszerre"""
+    if solveh_banded is not None:
+        return solveh_banded(hp_bands(n, lamb), rhs)
+    d0, d1, d2 = _banded_cholesky(n, lamb)
+    z = np.empty_like(rhs)
+    for i in range(n):
+        row = rhs[i].copy()
+        if i >= 1:
+            row -= d1[i] * z[i - 1]
+        if i >= 2:
+            row -= d2[i] * z[i - 2]
+        z[i] = row / d0[i]
+    x = np.empty_like(rhs)
+    for i in range(n - 1, -1, -1):
+        row = z[i].copy()
+        if i + 1 < n:
+            row -= d1[i + 1] * x[i + 1]
+        if i + 2 < n:
+            row -= d2[i + 2] * x[i + 2]
+        x[i] = row / d0[i]
+    return x
+
+def _spans(values):
+    """Oszloponként az első és utolsó érvényes sor; csoportosítva: {(első, utolsó): [oszlopok]}"""
+    valid = ~np.isnan(values)
+    groups = {}
+    for k in np.flatnonzero(valid.any(axis=0)):
+        rows = np.flatnonzero(valid[:, k])
+        groups.setdefault((rows[0], rows[-1]), []).append(k)
+    return groups
+
+def _interpolate_gaps(block):
+    """Belső hiányok lineáris kitöltése (a sávos megoldáshoz teljes sorozat kell)"""
+    if not np.isnan(block).any():
+        return block
+    return pd.DataFrame(block).interpolate(limit_area='inside').to_numpy()
+
+def hp_filter(panel, freq='M', lamb=None):
+    """Hodrick-Prescott trend a teljes panelre (oszloponként a saját lefedettségén)
+
+    Visszatérés: (trend, ciklus) DataFrame-ek a panel alakjában.
+    """
+    lamb = HP_LAMBDA[freq] if lamb is None else lamb
+    values = panel.to_numpy(dtype=float)
+    trend = np.full(values.shape, np.nan)
+    for (first, last), columns in _spans(values).items():
+        n = last - first + 1
+        block = _interpolate_gaps(values[first:last + 1, columns])
+        trend[first:last + 1, columns] = _solve_banded(n, float(lamb), block) if n > 2 else block
+    trend = pd.DataFrame(trend, index=panel.index, columns=panel.columns)
+    return trend, panel - trend
+
+def centered_ma(panel, window):
+    """Centrált mozgóátlag (páros ablaknál 2×window súlyozással), a széleken NaN"""
+    if window <= 1:
+        return panel.copy()
+    if window % 2 == 0:
+        weights = np.r_[0.5, np.ones(window - 1), 0.5] / window
+    else:
+        weights = np.ones(window) / window
+    values = panel.to_numpy(dtype=float)
+    half = len(weights) // 2
+    result = np.full(values.shape, np.nan)
+    if len(values) >= len(weights):
+        windows = np.lib.stride_tricks.sliding_window_view(values, len(weights), axis=0)
+        result[half:len(values) - half] = windows @ weights
+    return pd.DataFrame(result, index=panel.index, columns=panel.columns)
+
+def _trend_estimate(values, freq):
+    """Trend: centrált mozgóátlag, a széleken (ahol az nem számolható) HP trenddel"""
+    ma = centered_ma(values, MA_WINDOW[freq])
+    hp, _ = hp_filter(values, freq)
+    return ma.fillna(hp)
+
+def _smooth_seasonal(detrended, period):
+    """Hónaponkénti (al)sorozatok simítása az évek mentén, NaN-tűrő súlyozással
+
+    Visszatérés: szezonális komponens, évente nulla átlagra normálva.
+    """
+    values = detrended.to_numpy(dtype=float)
+    n, k = values.shape
+    offset = detrended.index[0].month - 1 if period == 12 else 0
+    n_years = -(-(n + offset) // period)
+    grid = np.full((n_years * period, k), np.nan)
+    grid[offset:offset + n] = values
+    grid = grid.reshape(n_years, period, k)                      # (év, hónap, oszlop)
+
+    mask = ~np.isnan(grid)
+    filled = np.where(mask, grid, 0.0)
+    half = len(SEASONAL_WEIGHTS) // 2
+    pad = ((half, half), (0, 0), (0, 0))
+    num = np.lib.stride_tricks.sliding_window_view(np.pad(filled, pad), len(SEASONAL_WEIGHTS), axis=0)
+    den = np.lib.stride_tricks.sliding_window_view(np.pad(mask.astype(float), pad), len(SEASONAL_WEIGHTS), axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        seasonal = (num @ SEASONAL_WEIGHTS) / (den @ SEASONAL_WEIGHTS)
+        # Normálás: a 12 havi tényező átlaga nulla (a szint a trendben marad)
+        seasonal -= np.nanmean(seasonal, axis=1, keepdims=True)
+    seasonal = seasonal.reshape(n_years * period, k)[offset:offset + n]
+    return pd.DataFrame(seasonal, index=detrended.index, columns=detrended.columns)
+
+def seasonal_adjust(levels, freq='M', iterations=SA_ITERATIONS, multiplicative=True):
+    """STL-jellegű szezonális kiigazítás a panel minden oszlopára egyszerre
+
+    Visszatérés: {'trend', 'seasonal', 'adjusted', 'irregular'} DataFrame-ek; multiplikatív
+    esetben a szezonális és irreguláris komponens szorzótényező (1 = nincs hatás).
+    """
+    period = {'M': 12, 'Q': 4}[freq]
+    y = np.log(levels) if multiplicative else levels
+    trend = _trend_estimate(y, freq)
+    for _ in range(iterations):
+        seasonal = _smooth_seasonal(y - trend, period)
+        adjusted = y - seasonal
+        trend = _trend_estimate(adjusted, freq)
+    irregular = adjusted - trend
+    if multiplicative:
+        return {'trend': np.exp(trend), 'seasonal': np.exp(seasonal),
+                'adjusted': np.exp(adjusted), 'irregular': np.exp(irregular)}
+    return {'trend': trend, 'seasonal': seasonal, 'adjusted': adjusted, 'irregular': irregular}
+
+def decompose_panels(panels):
+    """HP trend/ciklus és mozgóátlag trend minden sorozat panelre: {(sorozat, módszer): DataFrame}"""
+    results = {}
+    for series_id, panel in panels.items():
+        freq = SERIES[series_id]['freq']
+        trend, cycle = hp_filter(panel, freq)
+        results[(series_id, 'hp_trend')] = trend
+        results[(series_id, 'hp_cycle')] = cycle
+        results[(series_id, 'ma_trend')] = centered_ma(panel, MA_WINDOW[freq])
+    return results
+
+def store_results(results, freqs, store=None):
+    """Eredmények az idősor tárba a feldolgozott sorozatok mellé ('hicp_hp_trend/HU' stb.)
+
+    Csak a változott megfigyelések íródnak; visszatérés: az írt megfigyelések száma.
+    """
+    store = store or open_store(mode='r+')
+    written = 0
+    for (series_id, method), frame in results.items():
+        for column in frame.columns:
+            written += store.write_series(f"{series_id}_{method}", column, frame[column],
+                                          freq=freqs[series_id])
+    return written
+
+def read_component(series_id, method, country_code, store=None):
+    """Tárolt komponens olvasása (pl. read_component('hicp', 'hp_trend', 'HU'))"""
+    store = store or open_store()
+    return store.read_series(f"{series_id}_{method}", country_code)
+
+def main():
+    print("=== Trend/ciklus felbontás ===")
+    panels = load_country_panels(DECOMPOSITION_SERIES, list(COUNTRIES))
+    panels = {sid: panel for sid, panel in panels.items() if len(panel.columns) > 0}
+
+    start = time.perf_counter()
+    results = decompose_panels(panels)
+    elapsed = time.perf_counter() - start
+    print(f"✓ HP és mozgóátlag trend: {sum(p.shape[1] for p in panels.values())} sorozat, "
+          f"{elapsed * 1000:.0f} ms ({'scipy' if solveh_banded is not None else 'NumPy'} sávos megoldó)")
+    for series_id in panels:
+        trend = results[(series_id, 'hp_trend')].ffill().iloc[-1]
+        cycle = results[(series_id, 'hp_cycle')].ffill().iloc[-1]
+        label = SERIES[series_id]['label']
+        print(f"  {label}: " + ', '.join(f"{cc} {trend[cc]:.1f} ({cycle[cc]:+.1f})" for cc in trend.index))
+    freqs = {sid: SERIES[sid]['freq'] for sid in panels}
+
+    csv_text = SOURCES['ksh'].get_text('cpi', 'HU')
+    if csv_text:
+        levels = ksh_levels(csv_text)
+        start = time.perf_counter()
+        sa = seasonal_adjust(levels)
+        elapsed = time.perf_counter() - start
+        print(f"✓ KSH CPI szezonális kiigazítás: {levels.shape[1]} főcsoport, {elapsed * 1000:.0f} ms")
+        adjusted = sa['adjusted']
+        ann3m = ((adjusted / adjusted.shift(3)) ** 4 - 1) * 100
+        print(f"  Szezonálisan kiigazított, évesített 3 havi változás, {levels.index[-1]:%Y-%m} (%):")
+        print(ann3m.iloc[-1].round(1).to_string())
+        for component in ('adjusted', 'seasonal', 'trend'):
+            results[(KSH_SA_DATASET, f"sa_{component}")] = sa[component]
+        freqs[KSH_SA_DATASET] = 'M'
+    else:
+        print("✗ KSH adatok nem elérhetők")
+
+    written = store_results(results, freqs)
+    print(f"✓ Idősor tár frissítve: {written} új vagy módosított megfigyelés")
+
+if __name__ == '__main__':
+    main()
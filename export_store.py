@@ -0,0 +1,128 @@
+import os
+import sqlite3
+import pandas as pd
+
+from series_registry import load_series_panel
+from ECBGD_EU import COUNTRIES
+from indicators import ksh_levels
+from sources import KSH_SERIES, SOURCES
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+# --- EXPORT FÁJLNEVEK ---
+EXPORT_PARQUET_FILE = "ecb_export.parquet"
+EXPORT_ARROW_FILE = "ecb_export.arrow"
+EXPORT_SQLITE_FILE = "ecb_export.sqlite"
+
+EXPORT_COLUMNS = ['series', 'country', 'period', 'value']
+
+def series_to_frame(series_name, country_code, series):
+    """Egy pd.Series hosszú formátumra alakítása (series, country, period, value)"""
+    series = series.dropna()
+    if series.index.has_duplicates:
+        raise ValueError(f"{series_name} ({country_code}): ismétlődő időszakok")
+    return pd.DataFrame({
+        'series': series_name,
+        'country': country_code,
+        'period': pd.to_datetime(series.index),
+        'value': series.values.astype(float),
+    }, columns=EXPORT_COLUMNS)
+
+def ksh_export_series(csv_text):
+    """KSH 'Összesen': láncolt szintindex (előző hónap = 100 blokkból) és éves infláció %
+
+    Az éves infláció az 'előző év azonos időszaka = 100' blokk (a KSH tábla
+    több bázisú blokkot tartalmaz, ezeket nem szabad összekeverni).
+    """
+    if not csv_text:
+        return None, None
+    column = KSH_SERIES['cpi']['column']
+    levels = ksh_levels(csv_text)
+    cpi = levels[column].dropna() if column in levels.columns else None
+    yoy_index = SOURCES['ksh'].parse(csv_text, 'cpi')
+    # A KSH egy tizedesre közöl; a kerekítés a kivonás lebegőpontos zaját tünteti el
+    yoy = (yoy_index - 100).round(1) if yoy_index is not None else None
+    return cpi, yoy
+
+def build_export_frame(panels, ksh_cpi=None, ksh_yoy=None):
+    """Panelek ({sorozat: {országkód: pd.Series}}) és KSH sorozatok egy hosszú táblába"""
+    frames = []
+    for series_name, country_series in panels.items():
+        for country_code, series in country_series.items():
+            if isinstance(series, dict):
+                series = series['data']
+            frames.append(series_to_frame(series_name, country_code, series))
+
+    if ksh_cpi is not None and len(ksh_cpi) > 0:
+        frames.append(series_to_frame('ksh_cpi_index', 'HU', ksh_cpi))
+    if ksh_yoy is not None and len(ksh_yoy.dropna()) > 0:
+        frames.append(series_to_frame('ksh_inflation_yoy', 'HU', ksh_yoy))
+
+    if len(frames) == 0:
+        return pd.DataFrame(columns=EXPORT_COLUMNS)
+    frame = pd.concat(frames, ignore_index=True)
+    return frame.sort_values(EXPORT_COLUMNS[:3], ignore_index=True)
+
+def export_arrow(frame, parquet_file=EXPORT_PARQUET_FILE, arrow_file=EXPORT_ARROW_FILE):
+    """Parquet és tömörítetlen Arrow IPC (memory-map kompatibilis) export"""
+    if pa is None:
+        print("✗ Parquet/Arrow export kihagyva: a pyarrow csomag nincs telepítve")
+        return False
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    pq.write_table(table, parquet_file)
+    print(f"✓ Mentve: {parquet_file}")
+    feather.write_feather(table, arrow_file, compression='uncompressed')
+    print(f"✓ Mentve: {arrow_file}")
+    return True
+
+def export_sqlite(frame, sqlite_file=EXPORT_SQLITE_FILE):
+    """SQLite export (series, country, period) indexszel; a meglévő sorozatokat felülírja"""
+    rows = list(zip(frame['series'], frame['country'],
+                    frame['period'].dt.strftime('%Y-%m-%d'), frame['value'].astype(float)))
+    keys = frame[['series', 'country']].drop_duplicates().itertuples(index=False, name=None)
+
+    with sqlite3.connect(sqlite_file) as conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS observations (
+                series TEXT NOT NULL,
+                country TEXT NOT NULL,
+                period TEXT NOT NULL,
+                value REAL
+            )""")
+        conn.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_observations_series_country_period
+            ON observations (series, country, period)""")
+        conn.executemany("DELETE FROM observations WHERE series = ? AND country = ?", list(keys))
+        conn.executemany("INSERT INTO observations VALUES (?, ?, ?, ?)", rows)
+    print(f"✓ Mentve: {sqlite_file} ({len(rows)} sor)")
+
+def export_all(frame):
+    """Minden export formátum írása"""
+    export_arrow(frame)
+    export_sqlite(frame)
+
+def main():
+    print("=== ECB/KSH adatok exportálása ===")
+    panels = {
+        'debt': load_series_panel('debt', COUNTRIES),
+        'hicp': load_series_panel('hicp', COUNTRIES),
+    }
+
+    ksh_cpi, ksh_yoy = ksh_export_series(SOURCES['ksh'].get_text('cpi', 'HU'))
+
+    frame = build_export_frame(panels, ksh_cpi, ksh_yoy)
+    print(f"Exportálandó megfigyelések: {len(frame)}")
+    if len(frame) > 0:
+        export_all(frame)
+
+    for path in (EXPORT_PARQUET_FILE, EXPORT_ARROW_FILE, EXPORT_SQLITE_FILE):
+        if os.path.exists(path):
+            print(f"  {path} - {os.path.getsize(path)} bytes")
+
+if __name__ == '__main__':
+    main()
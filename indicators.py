@@ -0,0 +1,181 @@
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from sources import SOURCES, load_many
+from ksh_vs_ecb import KSH_COICOP_MAP, read_ksh_cpi_categories
+from ECBGD_EU import COUNTRIES
+
+# --- SZÁRMAZTATOTT MUTATÓK ---
+# Minden mutató egy (időszak x sorozat) szintindex mátrixon fut egyetlen
+# vektorizált NumPy művelettel; új mutató = új függvény az INDICATORS-ban.
+KSH_HEADLINE = 'Összesen'
+KSH_COMPONENTS = [c for c in KSH_COICOP_MAP if c != KSH_HEADLINE]
+DERIVED_OUTPUT_FILE = "ksh_derived_indicators.csv"
+PANEL_CACHE_SIZE = 16
+
+def _lag_ratio(values, lag):
+    """values[t] / values[t - lag] oszloponként (az első `lag` sor NaN)"""
+    ratio = np.full(values.shape, np.nan)
+    if lag < len(values):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio[lag:] = values[lag:] / values[:-lag]
+    return ratio
+
+def rebase(values):
+    """Index átskálázása: minden oszlop első érvényes értéke = 100"""
+    valid = ~np.isnan(values)
+    first = np.where(valid.any(axis=0), valid.argmax(axis=0), 0)
+    base = values[first, np.arange(values.shape[1])]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return values / base * 100
+
+def chain_link(rates, base=100.0):
+    """Időszakról időszakra vett indexekből (előző időszak = 100) láncolt szintindex
+
+    A hiányzó értékek láncszeme 1 (a szint változatlan marad), de az eredményben NaN.
+    """
+    factors = np.where(np.isnan(rates), 1.0, rates / 100)
+    levels = base * np.cumprod(factors, axis=0)
+    return np.where(np.isnan(rates), np.nan, levels)
+
+INDICATORS = {
+    'mom': lambda levels, ppy: (_lag_ratio(levels, 1) - 1) * 100,
+    'yoy': lambda levels, ppy: (_lag_ratio(levels, ppy) - 1) * 100,
+    # 3 havi (negyedéves sorozatnál 1 negyedéves) változás évesítve
+    'ann3m': lambda levels, ppy: (_lag_ratio(levels, max(ppy // 4, 1)) ** 4 - 1) * 100,
+    'index': lambda levels, ppy: rebase(levels),
+}
+
+def estimate_weights(component_rates, headline_rates):
+    """Implicit súlyok becslése legkisebb négyzetekkel: headline ≈ Σ súly_i * komponens_i"""
+    rows = ~np.isnan(component_rates).any(axis=1) & ~np.isnan(headline_rates)
+    if rows.sum() < component_rates.shape[1]:
+        return np.full(component_rates.shape[1], np.nan)
+    weights, *_ = np.linalg.lstsq(component_rates[rows], headline_rates[rows], rcond=None)
+    return weights
+
+class DerivedIndicators:
+    """Származtatott mutatók egy szintindex panelre, lusta számítással és cache-eléssel
+
+    levels: dátum indexű DataFrame, oszloponként egy sorozat szintindexe.
+    """
+
+    def __init__(self, levels, periods_per_year=12):
+        self.levels = levels.sort_index()
+        self.periods_per_year = periods_per_year
+        self._values = self.levels.to_numpy(dtype=float)
+        self._cache = {}
+
+    def values(self, name):
+        """Mutató mátrix (NumPy), első kéréskor számolva"""
+        if name not in self._cache:
+            self._cache[name] = INDICATORS[name](self._values, self.periods_per_year)
+        return self._cache[name]
+
+    def __getitem__(self, name):
+        return pd.DataFrame(self.values(name), index=self.levels.index, columns=self.levels.columns)
+
+    def all(self, names=None):
+        """Minden (vagy a megadott) mutató hosszú formátumban: period, series, indicator, value"""
+        frames = []
+        for name in names or INDICATORS:
+            long = self[name].stack(future_stack=True).rename('value').reset_index()
+            long.columns = ['period', 'series', 'value']
+            long.insert(2, 'indicator', name)
+            frames.append(long)
+        return pd.concat(frames, ignore_index=True).dropna(subset=['value'])
+
+    def contributions(self, headline, components, indicator='yoy', weights=None):
+        """Hozzájárulás a főindex változásához: súly_i * komponens ráta_i
+
+        Ha nincs megadva súly, a MoM rátákból becsüljük (implicit súlyok).
+        A 'residual' oszlop a főindex és a hozzájárulások összegének eltérése.
+        """
+        key = ('contributions', headline, tuple(components), indicator,
+               None if weights is None else tuple(weights))
+        if key not in self._cache:
+            columns = [self.levels.columns.get_loc(c) for c in components]
+            head = self.levels.columns.get_loc(headline)
+            if weights is None:
+                mom = self.values('mom')
+                weights = estimate_weights(mom[:, columns], mom[:, head])
+            rates = self.values(indicator)
+            contrib = rates[:, columns] * np.asarray(weights, dtype=float)
+            residual = rates[:, head] - contrib.sum(axis=1)
+            self._cache[key] = (np.column_stack([contrib, residual]), np.asarray(weights, dtype=float))
+
+        contrib, weights = self._cache[key]
+        frame = pd.DataFrame(contrib, index=self.levels.index, columns=list(components) + ['residual'])
+        frame.attrs['weights'] = dict(zip(components, weights))
+        return frame
+
+_panel_cache = OrderedDict()
+
+def indicators_for(levels, periods_per_year=12):
+    """DerivedIndicators a panel tartalma alapján cache-elve (azonos adatra ugyanaz a példány)"""
+    digest = hashlib.sha1()
+    digest.update(levels.index.asi8.tobytes())
+    digest.update('\x00'.join(map(str, levels.columns)).encode('utf-8'))
+    digest.update(np.ascontiguousarray(levels.to_numpy(dtype=float)).tobytes())
+    key = (digest.hexdigest(), periods_per_year)
+    if key in _panel_cache:
+        _panel_cache.move_to_end(key)
+        return _panel_cache[key]
+    result = DerivedIndicators(levels, periods_per_year)
+    _panel_cache[key] = result
+    if len(_panel_cache) > PANEL_CACHE_SIZE:
+        _panel_cache.popitem(last=False)
+    return result
+
+def ksh_levels(csv_text):
+    """KSH főcsoportok láncolt szintindexe az 'Előző hónap = 100' blokkból"""
+    mom = read_ksh_cpi_categories(csv_text, block='Előző hónap')
+    if len(mom) == 0:
+        return mom
+    return pd.DataFrame(chain_link(mom.to_numpy(dtype=float)), index=mom.index, columns=mom.columns)
+
+def ecb_hicp_levels(countries=COUNTRIES, items=('000000',)):
+    """ECB HICP szintindexek (országkód/COICOP oszlopokkal)"""
+    jobs = [('ecb', 'hicp_index', cc, {'item': item}) for cc in countries for item in items]
+    columns = {f"{cc}/{params['item']}": series
+               for (_, _, cc, params), series in zip(jobs, load_many(jobs)) if series is not None}
+    return pd.DataFrame(columns).sort_index()
+
+def main():
+    print("=== Származtatott inflációs mutatók ===")
+    csv_text = SOURCES['ksh'].get_text('cpi', 'HU')
+    if not csv_text:
+        print("✗ KSH adatok nem elérhetők")
+        return
+    levels = ksh_levels(csv_text)
+    indicators = indicators_for(levels)
+
+    latest = pd.DataFrame({name: indicators[name].iloc[-1] for name in ('mom', 'yoy', 'ann3m')})
+    print(f"\nKSH főcsoportok, {levels.index[-1]:%Y-%m} (%):")
+    print(latest.round(1).to_string())
+
+    contributions = indicators.contributions(KSH_HEADLINE, KSH_COMPONENTS)
+    print("\nImplicit súlyok (MoM alapján):")
+    for category, weight in contributions.attrs['weights'].items():
+        print(f"  {category}: {weight:.3f}")
+    print(f"\nHozzájárulás az éves inflációhoz, {levels.index[-1]:%Y-%m} (pp):")
+    print(contributions.iloc[-1].round(2).to_string())
+
+    outputs = [indicators.all().assign(source='ksh')]
+    hicp_levels = ecb_hicp_levels(items=list(KSH_COICOP_MAP.values()))
+    if len(hicp_levels.columns) > 0:
+        hicp_indicators = indicators_for(hicp_levels)
+        print(f"\nECB HICP sorozatok: {len(hicp_levels.columns)}, utolsó éves ráták (%):")
+        print(hicp_indicators['yoy'].ffill().iloc[-1].round(1).to_string())
+        outputs.append(hicp_indicators.all().assign(source='ecb'))
+    else:
+        print("✗ ECB HICP indexek nem elérhetők")
+
+    pd.concat(outputs, ignore_index=True).to_csv(DERIVED_OUTPUT_FILE, index=False)
+    print(f"✓ Mentve: {DERIVED_OUTPUT_FILE}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,374 @@
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import sys
+import time
+import traceback
+import zlib
+
+import pandas as pd
+
+from ECBGD_EU import COUNTRIES
+from series_registry import SERIES, get_series_cache_file
+from sources import SOURCES
+
+# --- ELOSZTOTT FELDOLGOZÁS (HELYI FELADATSOR) ---
+# A feladatok (sorozat letöltés + feldolgozás, grafikon változatok) egy SQLite
+# adatbázisban várnak; tetszőleges számú worker processz (akár több gépen, közös
+# fájlrendszeren) vesz ki belőlük egyet-egyet. A kivétel atomikus (BEGIN IMMEDIATE)
+# és bérleti idővel (lease) jár: ha egy worker meghal, a feladat a bérlet lejárta
+# után újra kiadható. Az eredmények idempotensen kerülnek a közös tárba (INSERT OR
+# REPLACE, atomikus fájlcsere), így az újrapróbálás nem okoz duplikációt.
+JOB_DB_FILE = "job_queue.sqlite"
+JOB_OUTPUT_DIR = "job_output"
+JOB_SERIES = ['debt', 'hicp']
+LEASE_SECONDS = 300
+MAX_ATTEMPTS = 3
+RETRY_BACKOFF = 30            # másodperc, próbálkozásonként duplázva
+POLL_SECONDS = 2
+BUSY_TIMEOUT = 30             # SQLite zárolásra várás (másodperc)
+
+def connect(path=JOB_DB_FILE):
+    """Kapcsolat megnyitása, séma létrehozása szükség esetén"""
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            shard INTEGER NOT NULL,
+            priority INTEGER NOT NULL DEFAULT 0,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL,
+            worker TEXT,
+            lease_until REAL,
+            retry_at REAL NOT NULL DEFAULT 0,
+            result TEXT,
+            error TEXT,
+            updated REAL
+        )""")
+    conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, priority, id)")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS job_deps (
+            job_id TEXT NOT NULL,
+            dep_id TEXT NOT NULL,
+            PRIMARY KEY (job_id, dep_id)
+        ) WITHOUT ROWID""")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS observations (
+            series_id TEXT NOT NULL,
+            country TEXT NOT NULL,
+            period TEXT NOT NULL,
+            value REAL,
+            PRIMARY KEY (series_id, country, period)
+        ) WITHOUT ROWID""")
+    return conn
+
+def shard_of(key):
+    """Stabil shard szám (minden gépen és futáskor azonos)"""
+    return zlib.crc32(key.encode('utf-8'))
+
+def parse_shard(text):
+    """'1/4' -> (1, 4); None -> (0, 1)"""
+    if not text:
+        return 0, 1
+    index, count = (int(part) for part in text.split('/'))
+    return index, count
+
+# --- Feladatok összeállítása ---
+def build_jobs(series_ids=JOB_SERIES, countries=COUNTRIES):
+    """A teljes feladathalmaz: (azonosító, fajta, payload, shard kulcs, prioritás, függőségek)"""
+    jobs = []
+    for series_id in series_ids:
+        for country_code in countries:
+            jobs.append((f"fetch/{series_id}/{country_code}", 'fetch',
+                         {'series_id': series_id, 'country': country_code}, country_code, 0, []))
+    if 'debt' in series_ids and 'hicp' in series_ids:
+        for country_code in countries:
+            jobs.append((f"chart/combined/{country_code}", 'chart_combined', {'country': country_code},
+                         country_code, 1, [f"fetch/debt/{country_code}", f"fetch/hicp/{country_code}"]))
+    for series_id in series_ids:
+        jobs.append((f"chart/comparison/{series_id}", 'chart_comparison', {'series_id': series_id},
+                     series_id, 1, [f"fetch/{series_id}/{cc}" for cc in countries]))
+    return jobs
+
+def enqueue(jobs, path=JOB_DB_FILE, max_attempts=MAX_ATTEMPTS):
+    """Feladatok felvétele; a már létezők érintetlenek maradnak (idempotens)
+
+    Visszatérés: az újonnan felvett feladatok száma.
+    """
+    conn = connect(path)
+    now = time.time()
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        before = conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+        conn.executemany(
+            "INSERT OR IGNORE INTO jobs (id, kind, payload, shard, priority, max_attempts, updated) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(job_id, kind, json.dumps(payload), shard_of(key), priority, max_attempts, now)
+             for job_id, kind, payload, key, priority, _ in jobs])
+        conn.executemany("INSERT OR IGNORE INTO job_deps VALUES (?, ?)",
+                         [(job_id, dep) for job_id, _, _, _, _, deps in jobs for dep in deps])
+        added = conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0] - before
+    conn.close()
+    return added
+
+# --- Kivétel, lezárás ---
+def claim(conn, worker, shard=(0, 1), lease=LEASE_SECONDS):
+    """A következő futtatható feladat atomikus kivétele (None, ha nincs)
+
+    Futtatható: függőben lévő (és a visszalépési idő letelt), vagy lejárt bérletű
+    futó feladat, amelynek minden függősége lezárult (kész vagy végleg sikertelen).
+    """
+    now = time.time()
+    index, count = shard
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Lejárt bérletű, elfogyott próbálkozású feladatok végleges lezárása
+        conn.execute("UPDATE jobs SET status = 'failed', error = 'Bérlet lejárt', updated = ? "
+                     "WHERE status = 'running' AND lease_until < ? AND attempts >= max_attempts", (now, now))
+        row = conn.execute("""
+            SELECT id, kind, payload, attempts FROM jobs j
+            WHERE ((j.status = 'pending' AND j.retry_at <= :now)
+                   OR (j.status = 'running' AND j.lease_until < :now))
+              AND j.shard % :count = :index
+              AND NOT EXISTS (
+                  SELECT 1 FROM job_deps d JOIN jobs p ON p.id = d.dep_id
+                  WHERE d.job_id = j.id AND p.status NOT IN ('done', 'failed'))
+            ORDER BY j.priority, j.id
+            LIMIT 1""", {'now': now, 'count': count, 'index': index}).fetchone()
+        if row is None:
+            conn.execute("COMMIT")
+            return None
+        conn.execute("UPDATE jobs SET status = 'running', worker = ?, lease_until = ?, "
+                     "attempts = attempts + 1, updated = ? WHERE id = ?", (worker, now + lease, now, row[0]))
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    job_id, kind, payload, attempts = row
+    return {'id': job_id, 'kind': kind, 'payload': json.loads(payload), 'attempt': attempts + 1}
+
+def complete(conn, job, worker, result):
+    """Sikeres lezárás (csak a bérlet tulajdonosa zárhatja le)"""
+    conn.execute("UPDATE jobs SET status = 'done', result = ?, error = NULL, lease_until = NULL, updated = ? "
+                 "WHERE id = ? AND worker = ? AND status = 'running'",
+                 (json.dumps(result), time.time(), job['id'], worker))
+
+def fail(conn, job, worker, error):
+    """Sikertelen próbálkozás: visszalépéssel újra sorba, vagy végleg sikertelen"""
+    now = time.time()
+    conn.execute("""
+        UPDATE jobs SET
+            status = CASE WHEN attempts < max_attempts THEN 'pending' ELSE 'failed' END,
+            retry_at = ? + ? * (1 << (attempts - 1)),
+            error = ?, lease_until = NULL, updated = ?
+        WHERE id = ? AND worker = ? AND status = 'running'""",
+                 (now, RETRY_BACKOFF, error, now, job['id'], worker))
+
+def next_retry(conn, shard=(0, 1)):
+    """A legkorábbi jövőbeli újrapróbálási időpont a shardban (None, ha nincs ilyen feladat)"""
+    index, count = shard
+    row = conn.execute("SELECT MIN(retry_at) FROM jobs WHERE status = 'pending' AND retry_at > ? "
+                       "AND shard % ? = ?", (time.time(), count, index)).fetchone()
+    return row[0]
+
+def retry_failed(path=JOB_DB_FILE, shard=(0, 1)):
+    """Végleg sikertelen feladatok újraindítása (pl. egy kiesett shard után)"""
+    index, count = shard
+    conn = connect(path)
+    with conn:
+        n = conn.execute("UPDATE jobs SET status = 'pending', attempts = 0, retry_at = 0, error = NULL, "
+                         "updated = ? WHERE status = 'failed' AND shard % ? = ?",
+                         (time.time(), count, index)).rowcount
+    conn.close()
+    return n
+
+# --- Eredmények a közös tárban ---
+def write_observations(conn, series_id, country_code, series):
+    """Egy sorozat megfigyeléseinek idempotens írása (a korábbi változat cseréje)"""
+    rows = [(series_id, country_code, period.strftime('%Y-%m-%d'), float(value))
+            for period, value in series.dropna().items()]
+    conn.execute("BEGIN IMMEDIATE")
+    conn.execute("DELETE FROM observations WHERE series_id = ? AND country = ?", (series_id, country_code))
+    conn.executemany("INSERT OR REPLACE INTO observations VALUES (?, ?, ?, ?)", rows)
+    conn.execute("COMMIT")
+    return len(rows)
+
+def read_observations(conn, series_id, country_code):
+    rows = conn.execute("SELECT period, value FROM observations WHERE series_id = ? AND country = ? "
+                        "ORDER BY period", (series_id, country_code)).fetchall()
+    if len(rows) == 0:
+        return pd.Series(dtype=float, index=pd.DatetimeIndex([]), name=SERIES[series_id]['value_name'])
+    periods, values = zip(*rows)
+    return pd.Series(values, index=pd.to_datetime(periods), name=SERIES[series_id]['value_name'], dtype=float)
+
+def _write_output(data, name, output_dir=JOB_OUTPUT_DIR):
+    """Kimeneti fájl atomikus írása (újrapróbáláskor egyszerűen felülíródik)"""
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, name)
+    with open(path + '.tmp', 'wb') as f:
+        f.write(data)
+    os.replace(path + '.tmp', path)
+    return path
+
+# --- Feladat fajták ---
+def run_fetch(conn, payload):
+    """Sorozat letöltése (vagy a cache használata), feldolgozása és írása a közös tárba"""
+    from parallel_parse import parse_cache_file
+    series_id, country_code = payload['series_id'], payload['country']
+    cache_file = get_series_cache_file(series_id, country_code)
+    text = SOURCES['ecb'].get_text(series_id, country_code)
+    if text is None:
+        raise RuntimeError(f"Letöltés sikertelen: {cache_file}")
+    arrays = parse_cache_file((cache_file, series_id))
+    if arrays is None:
+        raise RuntimeError(f"Feldolgozás sikertelen: {cache_file}")
+    series = pd.Series(arrays[1], index=pd.DatetimeIndex(arrays[0].view('datetime64[ns]')))
+    return {'observations': write_observations(conn, series_id, country_code, series)}
+
+def run_chart_combined(conn, payload):
+    """Egy ország kombinált (adósság + infláció) grafikonja"""
+    from batch_report import render_country
+    country_code = payload['country']
+    debt = read_observations(conn, 'debt', country_code)
+    inflation = read_observations(conn, 'hicp', country_code)
+    if len(debt) == 0 and len(inflation) == 0:
+        raise RuntimeError(f"Nincs adat: {country_code}")
+    png = render_country(country_code, debt, inflation)
+    return {'path': _write_output(png, f"combined_{country_code.lower()}.png")}
+
+def run_chart_comparison(conn, payload):
+    """Egy sorozat összes országát tartalmazó összehasonlító grafikon"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from ECBGD_EU import plot_debt_comparison, plot_inflation_comparison
+    series_id = payload['series_id']
+    country_data = {}
+    for country_code, info in COUNTRIES.items():
+        series = read_observations(conn, series_id, country_code)
+        if len(series) > 0:
+            country_data[country_code] = {'data': series, 'name': info['name'], 'color': info['color']}
+    if len(country_data) == 0:
+        raise RuntimeError(f"Nincs adat: {series_id}")
+    os.makedirs(JOB_OUTPUT_DIR, exist_ok=True)
+    path = os.path.join(JOB_OUTPUT_DIR, f"eu_{series_id}_comparison.png")
+    plot = plot_debt_comparison if series_id == 'debt' else plot_inflation_comparison
+    plot(country_data, path=path)   # save_figure atomikusan cseréli a fájlt
+    plt.close('all')
+    return {'path': path, 'countries': len(country_data)}
+
+JOB_KINDS = {
+    'fetch': run_fetch,
+    'chart_combined': run_chart_combined,
+    'chart_comparison': run_chart_comparison,
+}
+
+# --- Worker ---
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def run_worker(path=JOB_DB_FILE, shard=(0, 1), once=False, max_idle=None):
+    """Feladatok kivétele és futtatása, amíg van (once) vagy folyamatosan
+
+    once módban a visszalépésre váró (újrapróbálandó) feladatokat is kivárja, így egy
+    átmenetileg sikertelen letöltés és a tőle függő grafikon sem marad függőben.
+    max_idle: ennyi másodperc tétlenség után kilép (None: soha, ha nem once).
+    Visszatérés: (sikeres, sikertelen) feladatok száma.
+    """
+    conn = connect(path)
+    worker = worker_name()
+    done = failed = 0
+    idle_since = time.time()
+    while True:
+        job = claim(conn, worker, shard)
+        if job is None:
+            retry_at = next_retry(conn, shard) if once else None
+            if retry_at is not None:
+                time.sleep(min(max(retry_at - time.time(), 0), POLL_SECONDS))
+                continue
+            if once or (max_idle is not None and time.time() - idle_since > max_idle):
+                break
+            time.sleep(POLL_SECONDS)
+            continue
+        try:
+            result = JOB_KINDS[job['kind']](conn, job['payload'])
+            complete(conn, job, worker, result)
+            done += 1
+            print(f"✓ [{worker}] {job['id']} ({job['attempt']}. próbálkozás)")
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            fail(conn, job, worker, f"{e}\n{traceback.format_exc(limit=3)}")
+            failed += 1
+            print(f"✗ [{worker}] {job['id']}: {e}")
+        idle_since = time.time()
+    conn.close()
+    return done, failed
+
+def run_workers(n_workers, path=JOB_DB_FILE, shard=(0, 1), once=True):
+    """Több worker processz indítása ezen a gépen"""
+    processes = [multiprocessing.Process(target=run_worker, args=(path, shard, once)) for _ in range(n_workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+def status(path=JOB_DB_FILE):
+    """Feladatok száma fajta és állapot szerint"""
+    conn = connect(path)
+    df = pd.read_sql_query("SELECT kind, status, COUNT(*) AS n FROM jobs GROUP BY kind, status", conn)
+    conn.close()
+    return df.pivot_table(index='kind', columns='status', values='n', fill_value=0).astype(int)
+
+def merge_results(path=JOB_DB_FILE):
+    """A közös tár megfigyeléseinek átvezetése az idősor tárba (egyetlen író)"""
+    from ts_store import open_store
+    conn = connect(path)
+    pairs = conn.execute("SELECT DISTINCT series_id, country FROM observations").fetchall()
+    store = open_store(mode='r+')
+    written = 0
+    for series_id, country_code in pairs:
+        written += store.write_series(series_id, country_code, read_observations(conn, series_id, country_code))
+    conn.close()
+    return len(pairs), written
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    options = dict(a[2:].split('=', 1) for a in sys.argv[1:] if a.startswith('--') and '=' in a)
+    command = args[0] if args else None
+    shard = parse_shard(options.get('shard'))
+    path = options.get('db', JOB_DB_FILE)
+
+    if command == 'enqueue':
+        series_ids = options['series'].split(',') if 'series' in options else JOB_SERIES
+        added = enqueue(build_jobs(series_ids), path)
+        print(f"✓ {added} új feladat a sorban ({path})")
+    elif command == 'worker':
+        n_workers = int(options.get('workers', 1))
+        once = '--forever' not in sys.argv
+        if n_workers == 1:
+            done, failed = run_worker(path, shard, once)
+            print(f"Worker vége: {done} sikeres, {failed} sikertelen")
+        else:
+            run_workers(n_workers, path, shard, once)
+    elif command == 'retry':
+        print(f"✓ {retry_failed(path, shard)} sikertelen feladat újra sorban")
+    elif command == 'merge':
+        n_series, written = merge_results(path)
+        print(f"✓ {n_series} sorozat átvezetve az idősor tárba ({written} új vagy módosított megfigyelés)")
+    elif command == 'status':
+        print(status(path).to_string())
+    else:
+        print("Használat: python3 job_queue.py enqueue [--series=debt,hicp]\n"
+              "           python3 job_queue.py worker [--workers=4] [--shard=0/2] [--forever]\n"
+              "           python3 job_queue.py retry [--shard=0/2]\n"
+              "           python3 job_queue.py merge | status   (mindegyik: [--db=job_queue.sqlite])")
+
+if __name__ == '__main__':
+    main()
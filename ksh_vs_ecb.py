@@ -1,59 +1,9 @@
 import io
-import os
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-import requests
-from datetime import datetime
-import matplotlib.dates as mdates
-
-def fetch_csv(url):
-    """ECB API letöltés"""
-    headers = {'Accept': 'text/csv'}
-    r = requests.get(url, timeout=30, headers=headers)
-    r.raise_for_status()
-    return r.content.decode('utf-8')
-
-def fetch_csv_ksh(url):
-    """KSH CSV letöltés"""
-    r = requests.get(url, timeout=30)
-    r.encoding = 'latin1'
-    r.raise_for_status()
-    return r.text
-
-def get_or_download_data(cache_file, url, is_ksh=False):
-    """
-    Először a cache-ből próbálja betölteni, ha nincs vagy régi, akkor letölt
-    """
-    use_cache = False
-    if os.path.exists(cache_file):
-        file_age = datetime.now().timestamp() - os.path.getmtime(cache_file)
-        if file_age < 24 * 3600:  # 24 óra
-            use_cache = True
-            print(f"Használom a cache-t: {cache_file}")
-    
-    if use_cache:
-        try:
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                return f.read()
-        except:
-            print(f"Cache olvasási hiba: {cache_file}")
-    
-    # Letöltés
-    print(f"Letöltés: {url}")
-    try:
-        if is_ksh:
-            data = fetch_csv_ksh(url)
-        else:
-            data = fetch_csv(url)
-        
-        # Cache mentése
-        with open(cache_file, 'w', encoding='utf-8') as f:
-            f.write(data)
-        print(f"Cache mentve: {cache_file}")
-        return data
-    except Exception as e:
-        print(f"Letöltés sikertelen: {e}")
-        return None
+from sources import SOURCES, load_many
+from coicop_store import load_items, partitions
 
 def read_ecb_debt_gdp(csv_text):
     """ECB debt/GDP adatok beolvasása"""
@@ -270,40 +220,178 @@ def compute_yoy_inflation(cpi):
     yoy = cpi['CPI_index'].pct_change(12) * 100
     return yoy.rename('inflation_yoy')
 
+# --- KSH FŐCSOPORTOK ÉS ECB COICOP RÉSZINDEXEK MEGFELELTETÉSE ---
+# A KSH főcsoportok nem pontosan COICOP bontásúak, ezért a tartós és az egyéb
+# cikkeknél az ECB speciális aggregátumaival közelítünk.
+KSH_COICOP_MAP = {
+    'Élelmiszerek': '010000',
+    'Szeszes italok, dohányáruk': '020000',
+    'Ruházkodási cikkek': '030000',
+    'Tartós fogyasztási cikkek': 'IGD_NNRG_D',
+    'Háztartási energia, fűtés': '045000',
+    'Egyéb cikkek, üzemanyagok': 'IGD_NNRG_ND',
+    'Szolgáltatások': 'SERV',
+    'Összesen': '000000',
+}
+
+# A KSH tábla éves bázisú (előző év azonos időszaka = 100) blokkja; ezt olvassuk alapértelmezésben
+KSH_YOY_BLOCK = 'Az előző év azonos időszaka'
+
+def normalize_ksh_text(text):
+    """latin1 dekódolásból maradt hibás ékezetek javítása (õ -> ő, û -> ű)"""
+    return text.replace('õ', 'ő').replace('Õ', 'Ő').replace('û', 'ű').replace('Û', 'Ű')
+
+def read_ksh_cpi_categories(csv_text, block=KSH_YOY_BLOCK):
+    """KSH CPI összes főcsoportjának beolvasása egy adott bázisú blokkból
+
+    A KSH tábla több blokkot tartalmaz (előző év azonos időszaka, előző hónap,
+    előző év december = 100); csak a kért blokk sorait olvassuk be.
+    Visszatérés: dátum indexű DataFrame, oszloponként egy főcsoport indexe.
+    """
+    lines = normalize_ksh_text(csv_text).strip().split('\n')
+
+    header_idx = None
+    for i, line in enumerate(lines):
+        if 'Év' in line and 'Időszak' in line:
+            header_idx = i
+            break
+
+    if header_idx is None:
+        return pd.DataFrame()
+
+    headers = [h.strip() for h in lines[header_idx].split(';')][2:]
+
+    data_rows = []
+    current_year = None
+    in_block = False
+    for line in lines[header_idx + 1:]:
+        parts = [p.strip() for p in line.strip().split(';')]
+        # Blokk fejléc: "... = 100,0%" és üres értékek
+        if '= 100' in parts[0]:
+            in_block = parts[0].startswith(block)
+            continue
+        if not in_block or len(parts) < 2:
+            continue
+
+        year_candidate = parts[0].replace('.', '')
+        if year_candidate.isdigit() and len(year_candidate) == 4:
+            current_year = year_candidate
+
+        month_num = month_to_number(parts[1])
+        if current_year and (month_num != '01' or parts[1] == 'január'):
+            data_rows.append([f"{current_year}-{month_num}-01"] + parts[2:2 + len(headers)])
+
+    if len(data_rows) == 0:
+        return pd.DataFrame()
+
+    df = pd.DataFrame(data_rows, columns=['date'] + headers)
+    df['date'] = pd.to_datetime(df['date'])
+    df = df.set_index('date').sort_index()
+    df = df.apply(lambda col: pd.to_numeric(col.str.replace(',', '.').str.replace(' ', ''), errors='coerce'))
+    return df.dropna(how='all')
+
+def fetch_ksh_categories():
+    """KSH főcsoportos éves inflációs ráták (előző év azonos időszaka = 100 -> %)"""
+    cpi_data = SOURCES['ksh'].get_text('cpi', 'HU')
+    if not cpi_data:
+        return pd.DataFrame()
+    return read_ksh_cpi_categories(cpi_data) - 100
+
+def fetch_ecb_components(country_code='HU', categories=None):
+    """ECB HICP részindexek éves rátái a KSH főcsoportokhoz rendelve"""
+    categories = categories or list(KSH_COICOP_MAP)
+    if partitions(country=country_code):
+        # Ha van helyi COICOP tár, csak a szükséges partíciókat olvassuk
+        items = load_items(country_code, [KSH_COICOP_MAP[c] for c in categories])
+        return pd.DataFrame({c: items[KSH_COICOP_MAP[c]] for c in categories
+                             if KSH_COICOP_MAP[c] in items.columns})
+    jobs = [('ecb', 'hicp_item', country_code, {'item': KSH_COICOP_MAP[category]})
+            for category in categories]
+    components = {category: series for category, series in zip(categories, load_many(jobs))
+                  if series is not None}
+    return pd.DataFrame(components)
+
+def _columnwise_stats(ksh, ecb):
+    """Oszloponkénti eltérés- és korrelációs statisztikák egyetlen mátrixművelettel"""
+    a = ksh.to_numpy(dtype=float)
+    b = ecb.to_numpy(dtype=float)
+    mask = ~(np.isnan(a) | np.isnan(b))
+    n = mask.sum(axis=0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        diff = np.where(mask, a - b, 0.0)
+        bias = diff.sum(axis=0) / n
+        centered = np.where(mask, diff - bias, 0.0)
+        std = np.sqrt((centered ** 2).sum(axis=0) / (n - 1))
+        mae = np.abs(diff).sum(axis=0) / n
+        rmse = np.sqrt((diff ** 2).sum(axis=0) / n)
+        max_abs = np.where(n > 0, np.abs(diff).max(axis=0), np.nan)
+
+        a_mean = np.where(mask, a, 0.0).sum(axis=0) / n
+        b_mean = np.where(mask, b, 0.0).sum(axis=0) / n
+        a_c = np.where(mask, a - a_mean, 0.0)
+        b_c = np.where(mask, b - b_mean, 0.0)
+        corr = (a_c * b_c).sum(axis=0) / np.sqrt((a_c ** 2).sum(axis=0) * (b_c ** 2).sum(axis=0))
+
+    return pd.DataFrame({
+        'n': n, 'bias': bias, 'std': std, 'mae': mae,
+        'rmse': rmse, 'max_abs': max_abs, 'corr': corr,
+    }, index=ksh.columns)
+
+def compare_components(ksh_rates, ecb_rates, window=12):
+    """KSH főcsoportok és ECB COICOP részindexek összehasonlítása
+
+    Havi és negyedéves bontásban számolja a különbségeket, a gördülő korrelációt
+    és a torzítási statisztikákat minden főcsoportra egyszerre.
+    Visszatérés: (összesítő tábla, hosszú formátumú idősor tábla)
+    """
+    categories = [c for c in ksh_rates.columns if c in ecb_rates.columns]
+    summaries = []
+    details = []
+
+    for freq, rolling_window in (('M', window), ('Q', max(window // 3, 2))):
+        ksh = ksh_rates[categories]
+        ecb = ecb_rates[categories]
+        if freq == 'Q':
+            ksh = ksh.resample('QE').mean()
+            ecb = ecb.resample('QE').mean()
+
+        common = ksh.index.intersection(ecb.index)
+        ksh = ksh.loc[common]
+        ecb = ecb.loc[common]
+
+        stats = _columnwise_stats(ksh, ecb)
+        rolling_corr = ksh.rolling(rolling_window, min_periods=rolling_window).corr(ecb)
+        stats['rolling_corr_last'] = rolling_corr.ffill().iloc[-1] if len(rolling_corr) > 0 else np.nan
+        stats.insert(0, 'freq', freq)
+        summaries.append(stats)
+
+        detail = pd.concat({
+            'ksh': ksh.stack(future_stack=True),
+            'ecb': ecb.stack(future_stack=True),
+            'difference': (ksh - ecb).stack(future_stack=True),
+            'rolling_corr': rolling_corr.stack(future_stack=True),
+        }, axis=1)
+        detail.index.names = ['period', 'category']
+        detail.insert(0, 'freq', freq)
+        details.append(detail.reset_index())
+
+    summary = pd.concat(summaries).rename_axis('category').reset_index()
+    summary.insert(1, 'coicop', summary['category'].map(KSH_COICOP_MAP))
+    return summary, pd.concat(details, ignore_index=True)
+
 def fetch_ecb_data():
-    """ECB adatok letöltése Magyarországra"""
-    # Államadósság
-    debt_url = "https://sdw-wsrest.ecb.europa.eu/service/data/GFS/Q.N.HU.W0.S13.S1.C.L.LE.GD.T._Z.XDC_R_B1GQ_CY._T.F.V.N._T?format=csv"
-    # Infláció
-    hicp_url = "https://sdw-wsrest.ecb.europa.eu/service/data/ICP/M.HU.N.000000.4.ANR?format=csv"
-    
+    """ECB adatok letöltése Magyarországra (államadósság és infláció párhuzamosan)"""
     print("ECB adatok letöltése...")
-    
-    # Államadósság
-    debt_data = get_or_download_data("ecb_debt_cache.csv", debt_url, is_ksh=False)
-    debt_df = pd.DataFrame()
-    if debt_data:
-        debt_df = read_ecb_debt_gdp(debt_data)
-        if len(debt_df) > 0:
-            debt_df = debt_df.set_index('period')['debt_pct_gdp']
-    
-    # Infláció
-    hicp_data = get_or_download_data("ecb_hicp_cache.csv", hicp_url, is_ksh=False)
-    hicp_df = pd.DataFrame()
-    if hicp_data:
-        hicp_df = read_ecb_hicp(hicp_data)
-        if len(hicp_df) > 0:
-            hicp_df = hicp_df.set_index('period')['inflation_rate']
-    
-    return debt_df, hicp_df
+    debt_df, hicp_df = load_many([('ecb', 'debt', 'HU'), ('ecb', 'hicp', 'HU')])
+    return (debt_df if debt_df is not None else pd.DataFrame(),
+            hicp_df if hicp_df is not None else pd.DataFrame())
 
 def fetch_ksh_data():
     """KSH adatok letöltése"""
-    ksh_cpi_url = "https://www.ksh.hu/stadat_files/ara/hu/ara0040.csv"
-    
     print("KSH adatok letöltése...")
     
-    cpi_data = get_or_download_data("ksh_cpi_cache.csv", ksh_cpi_url, is_ksh=True)
+    cpi_data = SOURCES['ksh'].get_text('cpi', 'HU')
     cpi_df = pd.DataFrame()
     if cpi_data:
         cpi_df = read_ksh_cpi(cpi_data)
@@ -336,13 +424,13 @@ def compare_ksh_vs_ecb():
     common_dates = []
     if not ecb_hicp.empty and not ksh_cpi.empty:
         # ECB HICP
-        hicp_quarterly = ecb_hicp.resample('Q').mean()
+        hicp_quarterly = ecb_hicp.resample('QE').mean()
         ax2.plot(hicp_quarterly.index, hicp_quarterly.values,
                 color='blue', linewidth=2, label='Eurostat HICP')
         
         # KSH CPI
         ksh_inflation = compute_yoy_inflation(ksh_cpi)
-        ksh_quarterly = ksh_inflation.resample('Q').mean()
+        ksh_quarterly = ksh_inflation.resample('QE').mean()
         ax2.plot(ksh_quarterly.index, ksh_quarterly.values,
                 color='red', linewidth=2, label='KSH CPI')
         
@@ -422,6 +510,17 @@ def compare_ksh_vs_ecb():
     else:
         print("Nincs elegendő adat az összehasonlításhoz.")
 
+    # FŐCSOPORTONKÉNTI ÖSSZEHASONLÍTÁS
+    ksh_rates = fetch_ksh_categories()
+    if not ksh_rates.empty:
+        ecb_rates = fetch_ecb_components('HU', [c for c in ksh_rates.columns if c in KSH_COICOP_MAP])
+        if not ecb_rates.empty:
+            summary, detail = compare_components(ksh_rates, ecb_rates)
+            detail.to_csv('ksh_vs_eurostat_components.csv', index=False)
+            print(f"\n=== FŐCSOPORTONKÉNTI ÖSSZEHASONLÍTÁS (KSH - Eurostat) ===")
+            print(summary.to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+            print("✓ Mentve: ksh_vs_eurostat_components.csv")
+
 if __name__ == '__main__':
     compare_ksh_vs_ecb()
 
@@ -0,0 +1,141 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from cache_io import cache_age, confirmed_fresh, read_cache_text
+from checkpoints import digest, read_parsed, series_digest, write_parsed
+from series_registry import SERIES, get_series_cache_file, read_sdmx_csv
+from sources import SOURCES
+
+# --- PÁRHUZAMOS FELDOLGOZÁS ---
+# A cache fájlok feldolgozása processz poolban fut; a workerek csak két tömör
+# NumPy tömböt adnak vissza (időszak int64 ns, érték float64), nem DataFrame-et.
+DOWNLOAD_WORKERS = 4
+PARALLEL_MIN_FILES = 8   # ennél kevesebb fájlnál nem éri meg processzeket indítani
+# A feldolgozás (parse_cache_file / read_sdmx_csv) változata: a checkpointolt
+# feldolgozás bemenet hash-ébe kerül, így a feldolgozó módosításakor a mentett
+# sorozatok újra készülnek. Növelni kell, ha a feldolgozás eredménye megváltozik.
+PARSER_VERSION = 1
+
+def parse_cache_file(task):
+    """Worker: egy cache fájl feldolgozása -> (időszakok int64 ns, értékek float64)"""
+    cache_file, series_id = task
+    text = read_cache_text(cache_file)
+    if not text:
+        return None
+    spec = SERIES[series_id]
+    try:
+        df = read_sdmx_csv(text, spec['value_name'], spec['freq'])
+    except Exception:
+        return None
+    if len(df) == 0:
+        return None
+    df = df.sort_values('period')
+    periods = df['period'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+    return periods, df[spec['value_name']].to_numpy(dtype=float)
+
+def refresh_caches(tasks, max_age=None, max_workers=DOWNLOAD_WORKERS):
+    """Hiányzó vagy elavult cache fájlok letöltése szálakban (I/O), a többi érintetlen
+
+    A letöltés az ECB forrás adapterén át megy (közös session, újrapróbálás, kulcs
+    ellenőrzés, tömörített cache); a friss (vagy a háttérfrissítő által naprakésznek
+    jelölt) cache-t itt be sem olvassuk.
+    """
+    def refresh(task):
+        cache_file, series_id, country_code = task
+        ttl = SERIES[series_id]['cache_ttl'] if max_age is None else max_age
+        age = cache_age(cache_file)
+        if age is not None and (age < ttl or (max_age is None and confirmed_fresh(cache_file))):
+            return True
+        return SOURCES['ecb'].get_text(series_id, country_code, max_age=ttl) is not None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(refresh, tasks))
+
+def parse_files(tasks, max_workers=None):
+    """(cache fájl, sorozat) feladatok feldolgozása; kevés fájlnál a fő processzben"""
+    if len(tasks) < PARALLEL_MIN_FILES or max_workers == 1:
+        return [parse_cache_file(task) for task in tasks]
+    max_workers = max_workers or os.cpu_count()
+    chunksize = max(1, len(tasks) // (4 * max_workers))
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(parse_cache_file, tasks, chunksize=chunksize))
+
+def parse_input_hash(file_hash):
+    """A checkpointolt feldolgozás bemenet hash-e: cache tartalom + feldolgozó változat"""
+    return digest(file_hash, PARSER_VERSION)
+
+def load_country_series(series_ids, country_codes, max_age=None, max_workers=None, download=True,
+                        checkpoints=None):
+    """Sorozatok betöltése minden országra: letöltés szálakban, feldolgozás processz poolban
+
+    checkpoints (checkpoints.Checkpoints) megadásakor a letöltés és a feldolgozás lépés
+    checkpointolt: csak a legutóbbi checkpoint óta változott cache fájlok kerülnek
+    feldolgozásra, a többi sorozat a mentett NumPy tömbökből töltődik.
+    Visszatérés: {sorozat: {országkód: pd.Series}}; a sikerteleneknél nincs bejegyzés.
+    """
+    tasks = [(get_series_cache_file(series_id, cc), series_id, cc)
+             for series_id in series_ids for cc in country_codes]
+    if download:
+        refresh_caches(tasks, max_age=max_age)
+
+    result = {series_id: {} for series_id in series_ids}
+    pending = []
+    for cache_file, series_id, cc in tasks:
+        if checkpoints is None:
+            pending.append((cache_file, series_id, cc, None))
+            continue
+        file_hash, path = checkpoints.cache_hash(cache_file)
+        if file_hash is None:
+            continue
+        key = f"{series_id}/{cc}"
+        if not checkpoints.is_current('fetch', key, file_hash):
+            checkpoints.record('fetch', key, file_hash, output=file_hash, outputs=[path] if path else [])
+        input_hash = parse_input_hash(file_hash)
+        parsed_path = checkpoints.parsed_file(series_id, cc)
+        if checkpoints.is_current('parse', key, input_hash, [parsed_path]):
+            result[series_id][cc] = read_parsed(parsed_path, SERIES[series_id]['value_name'])
+            checkpoints.skipped += 1
+        else:
+            pending.append((cache_file, series_id, cc, input_hash))
+
+    parsed = parse_files([(cache_file, series_id) for cache_file, series_id, _, _ in pending], max_workers)
+    for (_, series_id, cc, input_hash), arrays in zip(pending, parsed):
+        if arrays is None:
+            continue
+        periods, values = arrays
+        value_name = SERIES[series_id]['value_name']
+        if checkpoints is None:
+            index = pd.DatetimeIndex(periods.view('datetime64[ns]'), name='period')
+            result[series_id][cc] = pd.Series(values, index=index, name=value_name)
+            continue
+        parsed_path = checkpoints.parsed_file(series_id, cc)
+        write_parsed(parsed_path, periods, values)
+        series = read_parsed(parsed_path, value_name)
+        checkpoints.record('parse', f"{series_id}/{cc}", input_hash,
+                           output=series_digest(series), outputs=[parsed_path])
+        checkpoints.executed += 1
+        result[series_id][cc] = series
+    return result
+
+def load_country_panels(series_ids, country_codes, **kwargs):
+    """Mint a load_country_series, de sorozatonként egy (időszak x ország) DataFrame-mel"""
+    series = load_country_series(series_ids, country_codes, **kwargs)
+    return {series_id: pd.DataFrame(by_country).sort_index() for series_id, by_country in series.items()}
+
+def main():
+    from ECBGD_EU import COUNTRIES
+    print("=== Párhuzamos cache feldolgozás ===")
+    for workers in (1, None):
+        start = time.perf_counter()
+        panels = load_country_panels(['debt', 'hicp'], list(COUNTRIES), max_workers=workers, download=False)
+        elapsed = time.perf_counter() - start
+        label = 'soros' if workers == 1 else f'{os.cpu_count()} processz'
+        shapes = ', '.join(f"{sid}: {panel.shape}" for sid, panel in panels.items())
+        print(f"{label}: {elapsed * 1000:.0f} ms ({shapes})")
+
+if __name__ == '__main__':
+    main()
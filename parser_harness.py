@@ -0,0 +1,339 @@
+import contextlib
+import csv
+import io
+import re
+import sys
+import time
+import tracemalloc
+import zlib
+
+import numpy as np
+import pandas as pd
+
+import ECBGD
+import ECBGD_EU
+import ksh_vs_ecb
+from cache_bundle import collect_caches
+from cache_io import read_cache_text
+from series_registry import SERIES, read_sdmx_csv
+from sources import KSH_SERIES, SOURCES
+
+# --- PARSER EGYENÉRTÉKŰSÉG ÉS TELJESÍTMÉNY KORLÁT ---
+# Minden cache fájlon és annak torzított változatain lefut az összes régi és új
+# parser; az (időszak, érték) kimenetnek bitre azonosnak kell lennie. Az új
+# (gyorsított) parsereknek fájlonként időkorlátot és memóriakorlátot is tartaniuk
+# kell, így egy teljesítmény átírás nem változtathatja meg csendben az eredményt.
+TIME_BUDGET_MS = 250             # új parser, fájlonként (a legjobb a TIMING_REPEATS futásból)
+TIMING_REPEATS = 3
+MEMORY_BUDGET_RATIO = 20         # tracemalloc csúcs / szöveg méret
+MEMORY_BUDGET_MIN_MB = 8         # kis fájloknál ennyi mindenképp megengedett
+FUZZ_SEED = 20240601
+FUZZ_MISSING_SHARE = 0.1         # a torzított változatban kiürített értékek aránya
+FUZZ_TITLE_LINE = "Forrás: letöltött adatsor (tesztváltozat)"
+
+CACHE_NAME_PATTERN = re.compile(r'^ecb_([a-z_]+?)(?:_([a-z]{2}))?_cache\.csv$')
+LEGACY_CACHE_ALIASES = {'debt_gdp': 'debt'}   # az ECBGD.py régi cache neve
+
+def ksh_yoy_only(text):
+    """KSH szöveg csak az éves bázisú blokkal (cím, fejléc és a blokk sorai)
+
+    A régi read_ksh_cpi a bázis blokkokat nem választja szét, minden blokk sorát
+    beolvassa; a helyes kimenet az éves (YoY) blokk, így a régi parsert a többi
+    blokk nélküli szövegen futtatjuk referenciaként.
+    """
+    kept, keep = [], True
+    for line in text.split('\n'):
+        first = line.split(';')[0]
+        if '= 100' in first:
+            keep = ksh_vs_ecb.normalize_ksh_text(first).strip().startswith(ksh_vs_ecb.KSH_YOY_BLOCK)
+        if keep:
+            kept.append(line)
+    return '\n'.join(kept)
+
+def _ksh_yoy_legacy(func):
+    return lambda text: func(ksh_yoy_only(text))
+
+def _sdmx_parser(series_id):
+    spec = SERIES[series_id]
+    return lambda text: read_sdmx_csv(text, spec['value_name'], spec['freq'])
+
+def _source_parser(source_name, series_id):
+    return lambda text: SOURCES[source_name].parse(text, series_id)
+
+# Régi parserek: név -> (függvény, változatok, amelyeken nem várható egyezés).
+# A régi KSH parserek az éves bázisú blokkra szűkített szövegen futnak (ksh_yoy_only).
+# Az ECBGD.py heurisztikája az idő oszlop utáni első numerikus oszlopot veszi értéknek,
+# így átrendezett oszlopoknál eltér; ez ismert, dokumentált különbség.
+LEGACY_PARSERS = {
+    'debt': {
+        'ECBGD.read_ecb_debt_gdp': (ECBGD.read_ecb_debt_gdp, {'oszlopsorrend'}),
+        'ECBGD_EU.read_ecb_debt_gdp': (ECBGD_EU.read_ecb_debt_gdp, set()),
+        'ksh_vs_ecb.read_ecb_debt_gdp': (ksh_vs_ecb.read_ecb_debt_gdp, set()),
+    },
+    'hicp': {
+        'ECBGD_EU.read_ecb_hicp': (ECBGD_EU.read_ecb_hicp, set()),
+        'ksh_vs_ecb.read_ecb_hicp': (ksh_vs_ecb.read_ecb_hicp, set()),
+    },
+    'ksh_cpi': {
+        'ECBGD.read_ksh_cpi (éves blokk)': (_ksh_yoy_legacy(ECBGD.read_ksh_cpi), set()),
+        'ksh_vs_ecb.read_ksh_cpi (éves blokk)': (_ksh_yoy_legacy(ksh_vs_ecb.read_ksh_cpi), set()),
+    },
+}
+
+# Új parserek: ezeknek kell egyezniük a régiekkel és tartaniuk a korlátokat.
+# Egy gyorsabb átírás ide kerül fel, a régi mellé.
+NEW_PARSERS = {
+    **{series_id: {'series_registry.read_sdmx_csv': _sdmx_parser(series_id),
+                   'EcbSdmxSource.parse': _source_parser('ecb', series_id)}
+       for series_id, spec in SERIES.items() if '{item}' not in spec['key']},
+    'ksh_cpi': {'KshStadatSource.parse': _source_parser('ksh', 'cpi')},
+}
+
+def classify_cache(cache_file):
+    """Cache fájl -> parser csoport ('debt', 'hicp', 'ksh_cpi', ...) vagy None"""
+    for series_id, spec in KSH_SERIES.items():
+        if cache_file == spec['cache_file']:
+            return f"ksh_{series_id}"
+    match = CACHE_NAME_PATTERN.match(cache_file)
+    if match is None:
+        return None
+    series_id = LEGACY_CACHE_ALIASES.get(match.group(1), match.group(1))
+    return series_id if series_id in NEW_PARSERS else None
+
+def to_arrays(result):
+    """Parser kimenet -> (időszakok int64 ns, értékek float64), időszak és érték szerint rendezve
+
+    Elfogadja a régi DataFrame-et ('period' oszloppal vagy dátum indexszel) és az új
+    pd.Series kimenetet; az egyező dátumú sorok (KSH blokkok) sorrendje így nem számít.
+    """
+    if result is None or len(result) == 0:
+        return np.array([], dtype=np.int64), np.array([], dtype=float)
+    if isinstance(result, pd.DataFrame):
+        if 'period' in result.columns:
+            periods, values = result['period'], result.drop(columns='period').iloc[:, 0]
+        else:
+            periods, values = result.index, result.iloc[:, 0]
+    else:
+        periods, values = result.index, result
+    periods = pd.DatetimeIndex(periods).to_numpy(dtype='datetime64[ns]').view(np.int64)
+    values = np.asarray(values, dtype=float)
+    order = np.lexsort((values, periods))
+    return periods[order], values[order]
+
+def describe_difference(expected, actual):
+    """Az első eltérés olvasható leírása"""
+    (p0, v0), (p1, v1) = expected, actual
+    if len(p0) != len(p1):
+        return f"{len(p0)} vs {len(p1)} megfigyelés"
+    i = int(np.flatnonzero((p0 != p1) | (v0 != v1))[0])
+    return (f"{i}. sor: {pd.Timestamp(p0[i]):%Y-%m-%d}={float(v0[i])!r} vs "
+            f"{pd.Timestamp(p1[i]):%Y-%m-%d}={float(v1[i])!r}")
+
+def same_output(expected, actual):
+    return (len(expected[0]) == len(actual[0]) and np.array_equal(expected[0], actual[0])
+            and np.array_equal(expected[1], actual[1]))
+
+def run_parser(func, text):
+    """Parser futtatása a régi parserek diagnosztikai kiírásai nélkül"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(text)
+
+def measure(func, text, repeats=TIMING_REPEATS):
+    """(legjobb futásidő ms, tracemalloc csúcs bájt); a memória külön futásban mérve"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run_parser(func, text)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        run_parser(func, text)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best * 1000, peak
+
+def memory_budget(text):
+    return max(MEMORY_BUDGET_MIN_MB * 1024 ** 2, MEMORY_BUDGET_RATIO * len(text.encode('utf-8')))
+
+# --- TORZÍTOTT VÁLTOZATOK ---
+
+def _read_rows(text):
+    return list(csv.reader(io.StringIO(text)))
+
+def _write_rows(rows):
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator='\n').writerows(rows)
+    return buffer.getvalue()
+
+def _sdmx_columns(rows):
+    header = rows[0]
+    return header.index('TIME_PERIOD'), header.index('OBS_VALUE')
+
+def sdmx_variants(text, rng):
+    """SDMX CSV változatok: {név: szöveg}"""
+    rows = _read_rows(text)
+    if len(rows) < 2 or 'TIME_PERIOD' not in rows[0] or 'OBS_VALUE' not in rows[0]:
+        return {}
+    time_col, value_col = _sdmx_columns(rows)
+    body = rows[1:]
+
+    order = rng.permutation(len(rows[0]))
+    reordered = [[row[i] if i < len(row) else '' for i in order] for row in rows]
+
+    missing = [list(row) for row in body]
+    for i in np.flatnonzero(rng.random(len(missing)) < FUZZ_MISSING_SHARE):
+        missing[i][value_col] = rng.choice(['', 'NaN', 'NA', '-'])
+    for i in rng.choice(len(missing), size=min(2, len(missing)), replace=False):
+        missing[i][time_col] = ''
+
+    shuffled = [body[i] for i in rng.permutation(len(body))]
+    blank_lines = ['']
+    for i, line in enumerate(text.split('\n')):
+        blank_lines += [line, ''] if i % 7 == 3 else [line]
+    return {
+        'oszlopsorrend': _write_rows(reordered),
+        'hiányzó_értékek': _write_rows([rows[0]] + missing),
+        # Cím sor a fejléc előtt: a régi parserek ilyenkor üres eredményt adnak, az újnak is azt kell
+        'fejléc_sor': FUZZ_TITLE_LINE + '\n' + text,
+        'üres_sorok': '\n'.join(blank_lines),
+        'sorrend': _write_rows([rows[0]] + shuffled),
+        'crlf': text.replace('\r\n', '\n').replace('\n', '\r\n'),
+    }
+
+def ksh_variants(text, rng):
+    """KSH STADAT változatok (pontosvesszős, magyar ékezetek): {név: szöveg}"""
+    # A cache szöveg jellemzően a KSH cp1250 bájtjainak latin1 dekódolása (õ, û, \x96)
+    try:
+        raw = text.encode('latin1')
+    except UnicodeEncodeError:
+        raw = ksh_vs_ecb.normalize_ksh_text(text).encode('cp1250', errors='replace')
+    fixed = raw.decode('cp1250', errors='replace')
+    lines = fixed.replace('\r\n', '\n').split('\n')
+    header_idx = next((i for i, line in enumerate(lines) if line.startswith('Év;')), None)
+    if header_idx is None:
+        return {}
+    n_fields = len(lines[header_idx].split(';'))
+    order = [0, 1] + list(2 + rng.permutation(n_fields - 2))
+    total_col = lines[header_idx].split(';').index(KSH_SERIES['cpi']['column'])
+
+    reordered, missing = [], []
+    for line in lines:
+        parts = line.split(';')
+        if len(parts) != n_fields:
+            reordered.append(line)
+            missing.append(line)
+            continue
+        reordered.append(';'.join(parts[i] for i in order))
+        if parts[1] and rng.random() < FUZZ_MISSING_SHARE:
+            parts[total_col] = ''
+        missing.append(';'.join(parts))
+
+    return {
+        'cp1250': fixed,
+        # A KSH cp1250 bájtjai latin1-ként dekódolva: ő -> õ, ű -> û
+        'latin1': raw.decode('latin1'),
+        'oszlopsorrend': '\n'.join(reordered),
+        'hiányzó_értékek': '\n'.join(missing),
+        'fejléc_sor': FUZZ_TITLE_LINE + ';' * (n_fields - 1) + '\n' + text,
+        'crlf': '\r\n'.join(lines),
+    }
+
+def variants_for(kind, text, seed):
+    rng = np.random.default_rng(seed)
+    if kind.startswith('ksh_'):
+        return ksh_variants(text, rng)
+    return sdmx_variants(text, rng)
+
+# --- FUTTATÁS ---
+
+def check_text(kind, text):
+    """Egy szöveg: minden új parser egyezik-e minden (érintett) régivel és egymással
+
+    Visszatérés: (hibák listája, az első új parser kimenete).
+    """
+    issues = []
+    new_outputs = {name: to_arrays(run_parser(func, text)) for name, func in NEW_PARSERS[kind].items()}
+    reference_name, reference = next(iter(new_outputs.items()))
+    for name, output in new_outputs.items():
+        if not same_output(reference, output):
+            issues.append(f"{name} ≠ {reference_name}: {describe_difference(reference, output)}")
+    return issues, new_outputs
+
+def check_file(cache_file, kind, fuzz=True, seed=FUZZ_SEED):
+    """Egy cache fájl és változatai
+
+    Visszatérés: {'issues': hibák, 'variants': változatok száma,
+    'new'/'legacy': {parser: (futásidő ms, memória csúcs bájt)}}.
+    """
+    text = read_cache_text(cache_file)
+    if not text:
+        return {'issues': ["A cache fájl nem olvasható"], 'variants': 0, 'new': {}, 'legacy': {}}
+    texts = {'eredeti': text}
+    if fuzz:
+        texts.update(variants_for(kind, text, seed + zlib.crc32(cache_file.encode('utf-8'))))
+
+    issues = []
+    for variant, variant_text in texts.items():
+        variant_issues, new_outputs = check_text(kind, variant_text)
+        issues += [f"[{variant}] {issue}" for issue in variant_issues]
+        for legacy_name, (func, known_divergent) in LEGACY_PARSERS.get(kind, {}).items():
+            if variant in known_divergent:
+                continue
+            expected = to_arrays(run_parser(func, variant_text))
+            for new_name, output in new_outputs.items():
+                if not same_output(expected, output):
+                    issues.append(f"[{variant}] {new_name} ≠ {legacy_name}: "
+                                  f"{describe_difference(expected, output)}")
+        if variant == 'eredeti' and len(new_outputs) and len(next(iter(new_outputs.values()))[0]) == 0:
+            issues.append("[eredeti] az új parser üres eredményt adott")
+
+    new_timings, legacy_timings = {}, {}
+    budget = memory_budget(text)
+    for name, func in NEW_PARSERS[kind].items():
+        elapsed_ms, peak = measure(func, text)
+        new_timings[name] = (elapsed_ms, peak)
+        if elapsed_ms > TIME_BUDGET_MS:
+            issues.append(f"{name}: {elapsed_ms:.0f} ms > {TIME_BUDGET_MS} ms időkorlát")
+        if peak > budget:
+            issues.append(f"{name}: {peak / 1024 ** 2:.1f} MB > {budget / 1024 ** 2:.1f} MB memóriakorlát")
+    for name, (func, _) in LEGACY_PARSERS.get(kind, {}).items():
+        legacy_timings[name] = measure(func, text, repeats=1)
+    return {'issues': issues, 'variants': len(texts), 'new': new_timings, 'legacy': legacy_timings}
+
+def run_harness(pattern=None, fuzz=True, seed=FUZZ_SEED):
+    """Minden (illeszkedő) cache fájl ellenőrzése; visszatérés: {cache fájl: eredmény}"""
+    results = {}
+    for cache_file in collect_caches():
+        kind = classify_cache(cache_file)
+        if kind is None or (pattern and pattern not in cache_file):
+            continue
+        results[cache_file] = check_file(cache_file, kind, fuzz=fuzz, seed=seed)
+    return results
+
+def main():
+    options = dict(a[2:].split('=', 1) for a in sys.argv[1:] if a.startswith('--') and '=' in a)
+    print("=== Parser egyenértékűség és teljesítmény ===")
+    results = run_harness(options.get('only'), fuzz='--no-fuzz' not in sys.argv,
+                          seed=int(options.get('seed', FUZZ_SEED)))
+    failed = 0
+    for cache_file, result in results.items():
+        new_ms = max((ms for ms, _ in result['new'].values()), default=0)
+        peak = max((peak for _, peak in result['new'].values()), default=0)
+        summary = f"{result['variants']} változat, új {new_ms:.0f} ms, {peak / 1024 ** 2:.1f} MB"
+        if result['legacy']:
+            legacy_ms = max(ms for ms, _ in result['legacy'].values())
+            legacy_peak = max(peak for _, peak in result['legacy'].values())
+            summary += f" (régi {legacy_ms:.0f} ms, {legacy_peak / 1024 ** 2:.1f} MB)"
+        if result['issues']:
+            failed += 1
+            print(f"✗ {cache_file}: {summary}")
+            for issue in result['issues']:
+                print(f"    {issue}")
+        else:
+            print(f"✓ {cache_file}: {summary}")
+    print(f"{'✓' if not failed else '✗'} {len(results) - failed}/{len(results)} fájl rendben")
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
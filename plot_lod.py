@@ -0,0 +1,96 @@
+import os
+
+import numpy as np
+import matplotlib.dates as mdates
+from matplotlib.collections import LineCollection
+
+# --- RÉSZLETESSÉGI SZINTEK ---
+FULL_DPI = 150
+PREVIEW_DPI = 60
+POINTS_PER_PIXEL = 2     # ennyi pont jut egy vízszintes pixelre downsampling után
+MARKER_POINT_LIMIT = 400  # ennyi pont felett nem rajzolunk markert
+
+def lttb_downsample(x, y, threshold):
+    """Largest-Triangle-Three-Buckets downsampling
+
+    Megtartja az első és utolsó pontot, a köztes vödrökből azt a pontot választja,
+    ami az előző kiválasztott ponttal és a következő vödör átlagával a legnagyobb
+    háromszöget alkotja. Visszatérés: a megtartott pontok indexei.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        areas = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) -
+                       (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(areas.argmax())
+        selected[i + 1] = a
+    return selected
+
+def max_points_for_axes(ax):
+    """Megjeleníthető pontok száma a tengely pixelszélessége alapján"""
+    fig = ax.get_figure()
+    width_px = ax.get_position().width * fig.get_figwidth() * fig.dpi
+    return max(int(width_px * POINTS_PER_PIXEL), 3)
+
+def plot_series_collection(ax, country_data, linewidth=2, alpha=1.0,
+                           max_points=None, markers=False, rasterized=True):
+    """Több ország sorozata egyetlen (raszterizált) LineCollection-ként
+
+    country_data: {'HU': {'data': pd.Series, 'name': ..., 'color': ...}}.
+    A sűrű sorozatokat LTTB-vel a tengely felbontására ritkítjuk; markert csak
+    kevés pont esetén rajzolunk. A jelmagyarázathoz üres proxy vonalakat adunk.
+    """
+    max_points = max_points or max_points_for_axes(ax)
+    segments = []
+    colors = []
+    marker_points = []
+
+    for country_code, info in country_data.items():
+        series = info['data'].dropna()
+        if len(series) == 0:
+            continue
+        x = mdates.date2num(series.index.to_pydatetime())
+        y = series.to_numpy(dtype=float)
+        keep = lttb_downsample(x, y, max_points)
+        segments.append(np.column_stack([x[keep], y[keep]]))
+        colors.append(info['color'])
+        if markers and len(keep) <= MARKER_POINT_LIMIT:
+            marker_points.append((x[keep], y[keep], info['color']))
+        ax.plot([], [], color=info['color'], linewidth=linewidth, label=info['name'])
+
+    collection = LineCollection(segments, colors=colors, linewidths=linewidth, alpha=alpha)
+    collection.set_rasterized(rasterized)
+    ax.add_collection(collection)
+
+    for x, y, color in marker_points:
+        ax.scatter(x, y, s=16, color=color, zorder=collection.get_zorder() + 1, rasterized=rasterized)
+
+    ax.xaxis_date()
+    ax.autoscale_view()
+    return collection
+
+def save_figure(fig, path, preview=False):
+    """Mentés: előnézeti módban alacsony dpi-vel, atomikus fájlcserével
+
+    Félbeszakadt mentés nem hagy csonka képet a végleges néven (a feladatsor
+    újrapróbáláskor egyszerűen felülírja).
+    """
+    tmp_path = path + '.tmp'
+    fig.savefig(tmp_path, format=os.path.splitext(path)[1][1:] or None,
+                dpi=PREVIEW_DPI if preview else FULL_DPI, bbox_inches='tight')
+    os.replace(tmp_path, path)
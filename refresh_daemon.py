@@ -0,0 +1,248 @@
+import io
+import json
+import os
+import sys
+import time
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from cache_io import REFRESH_STATE_FILE, read_cache_text
+from checkpoints import Checkpoints
+from series_registry import SERIES, read_sdmx_csv
+from sources import SOURCES
+from ksh_vs_ecb import read_ksh_cpi_categories
+from ECBGD_EU import COUNTRIES
+from parallel_parse import load_country_series
+from ts_store import open_store
+from vintage_store import record_vintage
+from cross_country import CROSS_SERIES, update_from_store
+from revisions import (diff_vintages, read_sdmx_observations, store_revisions,
+                       summarize_delta, validate_observations)
+
+# --- ÜTEMEZÉS ---
+# Az állapotfájl (REFRESH_STATE_FILE) feladatonként a cache fájlt és azt is rögzíti,
+# meddig naprakész (fresh_until); az olvasók ezt elfogadják a 24 órás élettartam helyett.
+DAEMON_SERIES = ['debt', 'hicp']
+MAX_WORKERS = 4
+# Az időszak végétől a várható publikálásig eltelt napok gyakoriság szerint
+RELEASE_LAG_DAYS = {'M': 47, 'Q': 100, 'A': 300}
+PERIOD_DAYS = {'M': 31, 'Q': 92, 'A': 366}
+KSH_RELEASE_DAY = 10             # a KSH havi CPI közlése nagyjából a hónap 10. napja körül
+POLL_INTERVAL = 6 * 3600         # esedékes, de még meg nem jelent adatnál ennyi időnként nézzük
+MAX_AGE = 7 * 24 * 3600          # revíziók miatt ennyi időnként mindenképp frissítünk
+MAX_SLEEP = 15 * 60
+
+def read_state(path=REFRESH_STATE_FILE):
+    """Ütemező állapot beolvasása"""
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+def write_state(state, path=REFRESH_STATE_FILE):
+    """Ütemező állapot mentése"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+
+def read_last_update(csv_text):
+    """Az ECB LAST_UPDATE attribútum legkésőbbi értéke (None, ha nincs kitöltve)"""
+    try:
+        df = pd.read_csv(io.StringIO(csv_text), usecols=lambda c: c == 'LAST_UPDATE')
+    except Exception:
+        return None
+    if 'LAST_UPDATE' not in df.columns:
+        return None
+    last_update = pd.to_datetime(df['LAST_UPDATE'], errors='coerce', utc=True).max()
+    return None if pd.isna(last_update) else last_update.tz_convert(None).to_pydatetime()
+
+def expected_ecb_release(series, freq, last_update=None):
+    """Következő várható ECB publikálás a legutolsó megfigyelés és a LAST_UPDATE alapján"""
+    next_period_end = series.index.max() + timedelta(days=PERIOD_DAYS[freq])
+    expected = next_period_end + timedelta(days=RELEASE_LAG_DAYS[freq])
+    if last_update is not None:
+        expected = max(expected, last_update + timedelta(days=PERIOD_DAYS[freq]))
+    return pd.Timestamp(expected).to_pydatetime()
+
+def expected_ksh_release(cpi):
+    """Következő várható KSH CPI közlés: a legutolsó hónapot követő második hónap 10-e"""
+    last_month = cpi.dropna(how='all').index.max()
+    return (last_month + pd.DateOffset(months=2)).replace(day=KSH_RELEASE_DAY).to_pydatetime()
+
+def next_due(job_state, now):
+    """Következő frissítés időpontja a várható publikálás, a pollozás és a max. kor alapján"""
+    last_fetch = datetime.fromisoformat(job_state['last_fetch'])
+    expected = datetime.fromisoformat(job_state['expected_release'])
+    if expected > now:
+        due = expected
+    else:
+        due = last_fetch + timedelta(seconds=POLL_INTERVAL)
+    return min(due, last_fetch + timedelta(seconds=MAX_AGE))
+
+def build_jobs(series_ids=DAEMON_SERIES, countries=COUNTRIES):
+    """Az összes (sorozat, ország) letöltési feladat és a KSH CPI"""
+    jobs = {}
+    for series_id in series_ids:
+        for country_code in countries:
+            jobs[f"{series_id}/{country_code}"] = {
+                'kind': 'ecb', 'series_id': series_id, 'country': country_code,
+                'source_series': series_id,
+                'cache_file': SOURCES['ecb'].cache_file(series_id, country_code),
+            }
+    jobs['ksh_cpi/HU'] = {'kind': 'ksh', 'series_id': 'ksh_cpi', 'country': 'HU',
+                          'source_series': 'cpi',
+                          'cache_file': SOURCES['ksh'].cache_file('cpi', 'HU')}
+    return jobs
+
+def download_job(job):
+    """Kényszerített letöltés a cache-be (szálban fut, a közös session-nel)"""
+    return SOURCES[job['kind']].get_text(job['source_series'], job['country'], max_age=0)
+
+def parse_job(job, csv_text):
+    """Előfeldolgozás: (pd.Series, gyakoriság, várható következő publikálás)"""
+    if job['kind'] == 'ksh':
+        cpi = read_ksh_cpi_categories(csv_text)
+        if len(cpi) == 0 or 'Összesen' not in cpi.columns:
+            return None, 'M', None
+        return cpi['Összesen'].dropna(), 'M', expected_ksh_release(cpi)
+
+    spec = SERIES[job['series_id']]
+    df = read_sdmx_csv(csv_text, spec['value_name'], spec['freq'])
+    if len(df) == 0:
+        return None, spec['freq'], None
+    series = df.set_index('period').sort_index()[spec['value_name']]
+    expected = expected_ecb_release(series, spec['freq'], read_last_update(csv_text))
+    return series, spec['freq'], expected
+
+def read_cached_text(job):
+    """A frissítés előtti cache tartalom (előző vintage); olvashatatlan cache esetén None"""
+    try:
+        return read_cache_text(job['cache_file'])
+    except Exception as e:
+        print(f"✗ {job['cache_file']}: a cache nem olvasható ({e})")
+        return None
+
+def validate_job(job, csv_text, series, freq):
+    """Validálás a frissítés után (ECB: nyers megfigyelések OBS_STATUS-szal)"""
+    if job['kind'] == 'ksh':
+        obs = pd.DataFrame({'period': series.index, 'value': series.values})
+        return validate_observations(obs, freq)
+    try:
+        obs = read_sdmx_observations(csv_text, freq)
+    except Exception as e:
+        return [f"SDMX megfigyelések nem olvashatók: {e}"]
+    return validate_observations(obs, freq, SERIES[job['series_id']].get('valid_range'))
+
+def process_job(name, job, csv_text, previous_text, job_state, store, now, checkpoints=None):
+    """Egy letöltött feladat: feldolgozás, validálás, revíziók, tár, vintage és checkpoint írás
+
+    ECB sorozatnál a feldolgozott tömbök a checkpoint tárba is bekerülnek (ugyanazzal a
+    feldolgozóval, mint a parallel_parse), így a load_country_series melegen indul.
+
+    Visszatérés: (várható következő publikálás vagy None, a tárba írt megfigyelések száma).
+    """
+    series, freq, release = parse_job(job, csv_text)
+    if series is None:
+        print(f"✗ {name}: üres vagy feldolgozhatatlan adat")
+        return None, 0
+    issues = validate_job(job, csv_text, series, freq)
+    for issue in issues:
+        print(f"  ! {name}: {issue}")
+    old_series = parse_job(job, previous_text)[0] if previous_text else None
+    delta = diff_vintages(old_series, series)
+    store_revisions(name, delta, now)
+    job_state['issues'] = issues
+    if len(delta) > 0:
+        job_state['last_revision'] = now.isoformat(timespec='seconds')
+
+    written = store.write_series(job['series_id'], job['country'], series, freq=freq)
+    record_vintage(job['series_id'], job['country'], series, vintage=now)
+    if job['kind'] == 'ecb' and checkpoints is not None:
+        load_country_series([job['series_id']], [job['country']], max_workers=1, download=False,
+                            checkpoints=checkpoints)
+    print(f"✓ {name}: {summarize_delta(delta)} ({written} megfigyelés írva a tárba)")
+    return release, written
+
+def run_once(jobs, state, store, max_workers=MAX_WORKERS, now=None):
+    """Esedékes feladatok letöltése korlátozott párhuzamossággal, majd előfeldolgozás a tárba"""
+    now = now or datetime.now()
+    due = [name for name in jobs
+           if name not in state or next_due(state[name], now) <= now]
+    if len(due) == 0:
+        return 0
+
+    print(f"[{now:%Y-%m-%d %H:%M}] Esedékes frissítések: {len(due)}")
+    updated = set()
+    previous = {name: read_cached_text(jobs[name]) for name in due}
+    # Minden körben újraolvasva, hogy az ECBGD_EU közben rögzített lépéseit ne írjuk felül
+    checkpoints = Checkpoints()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        downloads = dict(zip(due, pool.map(lambda name: download_job(jobs[name]), due)))
+
+    # Feldolgozás és tár írás a fő szálban (a tárnak egy írója van). Egy feladat hibája
+    # nem állítja le a kört: naplózzuk, és a feladat a pollozási idő után újra sorra kerül.
+    for name, csv_text in downloads.items():
+        job_state = state.setdefault(name, {})
+        job_state['last_fetch'] = now.isoformat(timespec='seconds')
+        expected = now + timedelta(seconds=POLL_INTERVAL)
+        if csv_text:
+            try:
+                release, written = process_job(name, jobs[name], csv_text, previous[name], job_state, store, now,
+                                               checkpoints)
+                job_state.pop('error', None)
+                expected = release or expected
+                if written > 0:
+                    updated.add(jobs[name]['series_id'])
+            except Exception as e:
+                job_state['error'] = f"{type(e).__name__}: {e}"
+                print(f"✗ {name}: feldolgozási hiba ({job_state['error']}), "
+                      f"újrapróbálás {POLL_INTERVAL // 3600} óra múlva")
+        else:
+            print(f"✗ {name}: letöltés sikertelen, újrapróbálás {POLL_INTERVAL // 3600} óra múlva")
+        job_state['expected_release'] = expected.isoformat(timespec='seconds')
+        # Sikeres frissítés után a cache a következő esedékes ellenőrzésig naprakész
+        job_state['cache_file'] = jobs[name]['cache_file']
+        if csv_text and 'error' not in job_state:
+            job_state['fresh_until'] = next_due(job_state, now).isoformat(timespec='seconds')
+        else:
+            job_state.pop('fresh_until', None)
+
+    # Országok közötti korreláció: csak a változott országok sora/oszlopa számolódik újra
+    try:
+        update_from_store(store, [sid for sid in CROSS_SERIES if sid in updated])
+    except Exception as e:
+        print(f"✗ Korreláció frissítése sikertelen: {type(e).__name__}: {e}")
+    write_state(state)
+    return len(due)
+
+def seconds_until_next(jobs, state, now=None):
+    """Alvási idő a következő esedékes feladatig (MAX_SLEEP-pel korlátozva)"""
+    now = now or datetime.now()
+    upcoming = [next_due(state[name], now) for name in jobs if name in state]
+    if len(upcoming) < len(jobs):
+        return 0
+    return max(0, min(MAX_SLEEP, (min(upcoming) - now).total_seconds()))
+
+def main(once=False):
+    print("=== Háttérfrissítő szolgáltatás ===")
+    jobs = build_jobs()
+    state = read_state()
+    store = open_store(mode='r+')
+    while True:
+        try:
+            run_once(jobs, state, store)
+        except Exception as e:
+            # Utolsó védővonal: a szolgáltatás nem állhat le egy kör hibája miatt
+            print(f"✗ Frissítési kör sikertelen: {type(e).__name__}: {e}")
+            if once:
+                raise
+            time.sleep(MAX_SLEEP)
+            continue
+        if once:
+            break
+        time.sleep(seconds_until_next(jobs, state))
+
+if __name__ == '__main__':
+    main(once='--once' in sys.argv)
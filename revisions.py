@@ -0,0 +1,131 @@
+import io
+import os
+import numpy as np
+import pandas as pd
+
+from series_registry import parse_periods
+
+# --- REVÍZIÓS NAPLÓ ---
+# Sorozatonként egy CSV a revisions/ könyvtárban; csak a változások (delták)
+# kerülnek bele: vintage, period, old_value, new_value, kind.
+REVISIONS_DIR = "revisions"
+REVISION_COLUMNS = ['vintage', 'period', 'old_value', 'new_value', 'kind']
+# Normál megfigyelés státusz (SDMX OBS_STATUS), minden más jelzésre kerül
+NORMAL_OBS_STATUS = {'A'}
+PERIOD_FREQ = {'M': 'MS', 'Q': 'QE', 'A': 'YE'}  # negyedév/év vége (pandas >= 2.2 álnevek)
+
+def read_sdmx_observations(csv_text, freq):
+    """SDMX CSV megfigyelései státusszal, eldobás nélkül (period, value, status)"""
+    df = pd.read_csv(io.StringIO(csv_text), dtype=str)
+    status = df['OBS_STATUS'] if 'OBS_STATUS' in df.columns else pd.Series(np.nan, index=df.index)
+    return pd.DataFrame({
+        'raw_period': df['TIME_PERIOD'].values,
+        'period': parse_periods(df['TIME_PERIOD'].values, freq).values,
+        'value': pd.to_numeric(df['OBS_VALUE'], errors='coerce').values,
+        'status': status.values,
+    })
+
+def validate_observations(obs, freq, valid_range=None):
+    """Megfigyelések ellenőrzése: feldolgozhatóság, folytonosság, értéktartomány, OBS_STATUS
+
+    Visszatérés: a talált problémák listája (szöveges leírások).
+    """
+    issues = []
+
+    unparsed = obs['period'].isna() | obs['value'].isna()
+    if unparsed.any():
+        examples = ', '.join(obs.loc[unparsed, 'raw_period'].astype(str).head(5)) \
+            if 'raw_period' in obs.columns else ''
+        issues.append(f"{int(unparsed.sum())} feldolgozhatatlan sor ({examples})")
+
+    valid = obs[~unparsed]
+    if len(valid) == 0:
+        issues.append("Nincs érvényes megfigyelés")
+        return issues
+
+    duplicated = valid['period'].duplicated()
+    if duplicated.any():
+        issues.append(f"{int(duplicated.sum())} ismétlődő időszak")
+
+    periods = pd.DatetimeIndex(valid['period']).sort_values().unique()
+    expected = pd.date_range(periods[0], periods[-1], freq=PERIOD_FREQ[freq])
+    missing = expected.difference(periods)
+    if len(missing) > 0:
+        issues.append(f"{len(missing)} hiányzó időszak (első: {missing[0]:%Y-%m-%d})")
+
+    if valid_range is not None:
+        low, high = valid_range
+        out_of_range = (valid['value'] < low) | (valid['value'] > high)
+        if out_of_range.any():
+            issues.append(f"{int(out_of_range.sum())} érték a [{low}, {high}] tartományon kívül")
+
+    if 'status' in valid.columns:
+        flagged = valid['status'].notna() & ~valid['status'].isin(NORMAL_OBS_STATUS)
+        if flagged.any():
+            counts = valid.loc[flagged, 'status'].value_counts()
+            issues.append("OBS_STATUS jelzések: " +
+                          ', '.join(f"{code}={n}" for code, n in counts.items()))
+    return issues
+
+def diff_vintages(old, new, tol=1e-9):
+    """Két vintage vektorizált összevetése; csak a változott megfigyeléseket adja vissza
+
+    kind: 'added' (új időszak), 'removed' (eltűnt időszak), 'revised' (módosult érték).
+    """
+    old = old[~old.index.duplicated(keep='last')] if old is not None else pd.Series(dtype=float)
+    new = new[~new.index.duplicated(keep='last')]
+    old_aligned, new_aligned = old.align(new, join='outer')
+    old_values = old_aligned.to_numpy(dtype=float)
+    new_values = new_aligned.to_numpy(dtype=float)
+
+    old_missing = np.isnan(old_values)
+    new_missing = np.isnan(new_values)
+    with np.errstate(invalid='ignore'):
+        revised = ~old_missing & ~new_missing & (np.abs(new_values - old_values) > tol)
+    added = old_missing & ~new_missing
+    removed = ~old_missing & new_missing
+
+    kind = np.select([added, removed, revised], ['added', 'removed', 'revised'], default='')
+    changed = kind != ''
+    return pd.DataFrame({
+        'period': new_aligned.index[changed],
+        'old_value': old_values[changed],
+        'new_value': new_values[changed],
+        'kind': kind[changed],
+    })
+
+def revision_file(name, directory=REVISIONS_DIR):
+    """Revíziós napló fájl egy sorozathoz ('debt/HU' -> revisions/debt_hu.csv)"""
+    return os.path.join(directory, name.replace('/', '_').lower() + '.csv')
+
+def store_revisions(name, delta, vintage, directory=REVISIONS_DIR):
+    """Delták hozzáfűzése a sorozat revíziós naplójához"""
+    if len(delta) == 0:
+        return
+    os.makedirs(directory, exist_ok=True)
+    path = revision_file(name, directory)
+    records = delta.assign(vintage=pd.Timestamp(vintage).isoformat(timespec='seconds'))
+    records[REVISION_COLUMNS].to_csv(path, mode='a', header=not os.path.exists(path),
+                                     index=False, date_format='%Y-%m-%d')
+
+def read_revisions(name, directory=REVISIONS_DIR):
+    """Egy sorozat revíziós naplója"""
+    path = revision_file(name, directory)
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=REVISION_COLUMNS)
+    return pd.read_csv(path, parse_dates=['vintage', 'period'])
+
+def changed_since(names, since, directory=REVISIONS_DIR):
+    """Azok a sorozatok, amelyek `since` óta változtak (ezekre kell újraszámolni)"""
+    since = pd.Timestamp(since)
+    return [name for name in names
+            if (read_revisions(name, directory)['vintage'] > since).any()]
+
+def summarize_delta(delta):
+    """Rövid összefoglaló a deltáról"""
+    if len(delta) == 0:
+        return "nincs változás"
+    counts = delta['kind'].value_counts()
+    parts = [f"{counts.get(kind, 0)} {label}" for kind, label in
+             (('added', 'új'), ('revised', 'revideált'), ('removed', 'törölt')) if counts.get(kind, 0)]
+    return ', '.join(parts)
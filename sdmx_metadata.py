@@ -0,0 +1,186 @@
+import os
+import sys
+import xml.etree.ElementTree as ET
+from functools import lru_cache
+
+from cache_io import cache_age, find_cache, open_cache, read_cache_text, write_cache_text
+from series_registry import ECB_SDMX_BASE_URL, SERIES
+from sources import HTTP_TIMEOUT, SESSION
+
+# --- SDMX STRUKTÚRA ÉS KÓDLISTA CACHE ---
+# Adatfolyamonként (GFS, ICP, ...) egyszer töltjük le a dataflow-t a DSD-vel és a
+# kódlistákkal (references=all), hosszú élettartamú cache-be. Ebből offline
+# ellenőrizzük és bontjuk ki a sorozat kulcsokat, mielőtt adatot kérnénk.
+ECB_SDMX_STRUCTURE_URL = ECB_SDMX_BASE_URL.replace('/data/', '/dataflow/ECB/')
+METADATA_TTL = 30 * 24 * 3600
+EU27 = ['AT', 'BE', 'BG', 'CY', 'CZ', 'DE', 'DK', 'EE', 'ES', 'FI', 'FR', 'GR', 'HR', 'HU',
+        'IE', 'IT', 'LT', 'LU', 'LV', 'MT', 'NL', 'PL', 'PT', 'RO', 'SE', 'SI', 'SK']
+AREA_GROUPS = {'EU27': EU27}
+
+def structure_url(flow):
+    return f"{ECB_SDMX_STRUCTURE_URL}{flow}?references=all"
+
+def metadata_cache_file(flow):
+    return f"sdmx_structure_{flow.lower()}.xml"
+
+def _local(tag):
+    """XML tag névtér nélkül ('{ns}Codelist' -> 'Codelist')"""
+    return tag.rsplit('}', 1)[-1]
+
+def _name(element, lang='en'):
+    """Az elem angol (vagy első) com:Name szövege"""
+    names = [child for child in element if _local(child.tag) == 'Name']
+    for child in names:
+        if child.get('{http://www.w3.org/XML/1998/namespace}lang') == lang:
+            return child.text
+    return names[0].text if names else None
+
+def parse_structure(xml_text):
+    """SDMX-ML 2.1 struktúra üzenet: dimenziók sorrendben és a kódlisták
+
+    Visszatérés: {'dimensions': [(dimenzió, kódlista), ...], 'codelists': {kódlista: {kód: név}}}.
+    """
+    root = ET.fromstring(xml_text)
+    codelists = {}
+    for codelist in root.iter():
+        if _local(codelist.tag) != 'Codelist':
+            continue
+        codes = {code.get('id'): _name(code) for code in codelist if _local(code.tag) == 'Code'}
+        codelists[codelist.get('id')] = codes
+
+    structures = {ds.get('id'): ds for ds in root.iter() if _local(ds.tag) == 'DataStructure'}
+    flow_ref = next((ref for flow in root.iter() if _local(flow.tag) == 'Dataflow'
+                     for ref in flow.iter('{*}Ref') if ref.get('class') == 'DataStructure'), None)
+    dsd = structures.get(flow_ref.get('id')) if flow_ref is not None else None
+    if dsd is None and structures:
+        dsd = next(iter(structures.values()))
+
+    dimensions = []
+    if dsd is not None:
+        for dimension in dsd.iter():
+            if _local(dimension.tag) != 'Dimension':
+                continue
+            enumeration = next((e for e in dimension.iter() if _local(e.tag) == 'Enumeration'), None)
+            ref = enumeration.find('{*}Ref') if enumeration is not None else None
+            dimensions.append((int(dimension.get('position', len(dimensions) + 1)),
+                               dimension.get('id'), ref.get('id') if ref is not None else None))
+    dimensions.sort()
+    return {'dimensions': [(dim_id, cl_id) for _, dim_id, cl_id in dimensions], 'codelists': codelists}
+
+def fetch_structure(flow, max_age=METADATA_TTL):
+    """Struktúra XML letöltése a cache-be, ha nincs vagy régebbi max_age másodpercnél"""
+    cache_file = metadata_cache_file(flow)
+    age = cache_age(cache_file)
+    if age is not None and age < max_age:
+        return True
+    url = structure_url(flow)
+    print(f"Letöltés: {url}")
+    try:
+        r = SESSION.get(url, timeout=HTTP_TIMEOUT,
+                        headers={'Accept': 'application/vnd.sdmx.structure+xml;version=2.1'})
+        r.raise_for_status()
+        write_cache_text(cache_file, r.content.decode('utf-8'))
+        print(f"Cache mentve: {cache_file}")
+        return True
+    except Exception as e:
+        # Elavult cache még mindig jobb a semminél
+        print(f"Struktúra letöltés sikertelen ({flow}): {e}")
+        return age is not None
+
+@lru_cache(maxsize=None)
+def _load_structure(path, mtime):
+    """Feldolgozott struktúra fájlonként és módosítási időnként memoizálva"""
+    with open_cache(path) as f:
+        return parse_structure(f.read())
+
+def get_structure(flow, download=True):
+    """Adatfolyam struktúra (dimenziók, kódlisták); None, ha nem elérhető
+
+    download=False esetén csak a helyi cache-t használja (hálózati kérés nélkül).
+    """
+    if download and not fetch_structure(flow):
+        return None
+    path = find_cache(metadata_cache_file(flow))
+    if path is None:
+        # Helyben olvasott cache csomagból (ha be van állítva)
+        text = read_cache_text(metadata_cache_file(flow))
+        return parse_structure(text) if text else None
+    return _load_structure(path, os.path.getmtime(path))
+
+def validate_key(flow, key, structure=None):
+    """Sorozat kulcs ellenőrzése a DSD alapján, hálózat nélkül
+
+    Üres dimenzió (joker) és '+'-szal elválasztott kódlista megengedett.
+    Visszatérés: a talált problémák listája (üres, ha a kulcs érvényes).
+    """
+    structure = structure or get_structure(flow)
+    if structure is None:
+        return []
+    dimensions = structure['dimensions']
+    parts = key.split('.')
+    if len(parts) != len(dimensions):
+        return [f"{flow}: {len(parts)} kulcs elem, a DSD {len(dimensions)} dimenziót vár "
+                f"({'.'.join(dim for dim, _ in dimensions)})"]
+
+    issues = []
+    for part, (dimension, codelist_id) in zip(parts, dimensions):
+        codes = structure['codelists'].get(codelist_id)
+        if part == '' or codes is None:
+            continue
+        unknown = [code for code in part.split('+') if code not in codes]
+        if unknown:
+            issues.append(f"{flow}/{dimension}: ismeretlen kód(ok): {', '.join(unknown)}")
+    return issues
+
+def expand_codes(value):
+    """Kódcsoport kibontása ('EU27' -> a 27 tagállam), egyébként a kód(ok) listája"""
+    if isinstance(value, str):
+        return AREA_GROUPS.get(value.upper(), value.split('+'))
+    return list(value)
+
+def expand_series(series_id, country, **params):
+    """Registry sorozat kulcsai kibontott országkörre, az érvényteleneket kiszűrve
+
+    Pl. expand_series('hicp', 'EU27') -> [('AT', kulcs), ('BE', kulcs), ...]
+    """
+    spec = SERIES[series_id]
+    structure = get_structure(spec['dataset'])
+    valid = []
+    for country_code in expand_codes(country):
+        key = spec['key'].format(country=country_code, **params)
+        issues = validate_key(spec['dataset'], key, structure)
+        if issues:
+            for issue in issues:
+                print(f"✗ {series_id} ({country_code}): {issue}")
+            continue
+        valid.append((country_code, key))
+    return valid
+
+def code_name(flow, dimension, code):
+    """Kód megnevezése a kódlistából (pl. REF_AREA HU -> 'Hungary')"""
+    structure = get_structure(flow, download=False)
+    if structure is None:
+        return None
+    codelist_id = dict(structure['dimensions']).get(dimension)
+    return structure['codelists'].get(codelist_id, {}).get(code)
+
+def main():
+    flows = [a.upper() for a in sys.argv[1:]] or sorted({spec['dataset'] for spec in SERIES.values()})
+    print("=== SDMX struktúra cache ===")
+    for flow in flows:
+        structure = get_structure(flow)
+        if structure is None:
+            print(f"✗ {flow}: struktúra nem elérhető")
+            continue
+        dims = '.'.join(dim for dim, _ in structure['dimensions'])
+        print(f"✓ {flow}: {dims} ({len(structure['codelists'])} kódlista)")
+
+    for series_id, spec in SERIES.items():
+        structure = get_structure(spec['dataset'], download=False)
+        if '{item}' in spec['key'] or structure is None:
+            continue
+        issues = validate_key(spec['dataset'], spec['key'].format(country='HU'), structure)
+        print(f"{'✓' if not issues else '✗'} {series_id}: {'; '.join(issues) or 'érvényes kulcs'}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+import io
+import string
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+
+# --- ECB SDMX VÉGPONT ---
+ECB_SDMX_BASE_URL = "https://sdw-wsrest.ecb.europa.eu/service/data/"
+
+# --- SOROZATOK KONFIGURÁCIÓJA ---
+# Minden sorozat deklaratív leírása: adatkészlet, kulcs sablon ({country} és
+# opcionális további paraméterek), gyakoriság, értékoszlop neve, érvényes
+# értéktartomány (validáláshoz) és cache élettartam.
+SERIES = {
+    'debt': {
+        'dataset': 'GFS',
+        'key': 'Q.N.{country}.W0.S13.S1.C.L.LE.GD.T._Z.XDC_R_B1GQ_CY._T.F.V.N._T',
+        'freq': 'Q',
+        'value_name': 'debt_pct_gdp',
+        'label': 'Államadósság (% GDP)',
+        'valid_range': (0, 400),
+        'cache_ttl': 24 * 3600,
+    },
+    'deficit': {
+        'dataset': 'GFS',
+        'key': 'Q.N.{country}.W0.S13.S1._Z.B.B9._Z._Z._Z.XDC_R_B1GQ_CY._Z.S.V.N._T',
+        'freq': 'Q',
+        'value_name': 'deficit_pct_gdp',
+        'label': 'Költségvetési egyenleg (% GDP)',
+        'valid_range': (-60, 60),
+        'cache_ttl': 24 * 3600,
+    },
+    'hicp': {
+        'dataset': 'ICP',
+        'key': 'M.{country}.N.000000.4.ANR',
+        'freq': 'M',
+        'value_name': 'inflation_rate',
+        'label': 'HICP infláció (%)',
+        'valid_range': (-30, 100),
+        'cache_ttl': 24 * 3600,
+    },
+    'hicp_item': {
+        'dataset': 'ICP',
+        'key': 'M.{country}.N.{item}.4.ANR',
+        'freq': 'M',
+        'value_name': 'inflation_rate',
+        'label': 'HICP részindex infláció (%)',
+        'valid_range': (-80, 400),
+        'cache_ttl': 24 * 3600,
+    },
+    'hicp_index': {
+        'dataset': 'ICP',
+        'key': 'M.{country}.N.{item}.4.INX',
+        'freq': 'M',
+        'value_name': 'hicp_index',
+        'label': 'HICP index (2015 = 100)',
+        'valid_range': (0, 1000),
+        'cache_ttl': 24 * 3600,
+    },
+    'gdp_growth': {
+        'dataset': 'MNA',
+        'key': 'Q.Y.{country}.W2.S1.S1.B.B1GQ._Z._Z._Z.EUR.LR.GY',
+        'freq': 'Q',
+        'value_name': 'gdp_growth',
+        'label': 'GDP növekedés (%)',
+        'valid_range': (-40, 40),
+        'cache_ttl': 24 * 3600,
+    },
+    'unemployment': {
+        'dataset': 'LFSI',
+        'key': 'M.{country}.S.UNEHRT.TOTAL0.15_74.T',
+        'freq': 'M',
+        'value_name': 'unemployment_rate',
+        'label': 'Munkanélküliségi ráta (%)',
+        'valid_range': (0, 60),
+        'cache_ttl': 24 * 3600,
+    },
+}
+
+# Negyedév utolsó napja: Q1=03-31, Q2=06-30, Q3=09-30, Q4=12-31
+QUARTER_END_MONTH_DAY = {'1': '03-31', '2': '06-30', '3': '09-30', '4': '12-31'}
+
+def get_series_key(series_id, country_code, **params):
+    """Sorozat kulcs kitöltése a sablonból"""
+    spec = SERIES[series_id]
+    return spec['key'].format(country=country_code, **params)
+
+def series_params(series_id):
+    """A kulcs sablon {country}-n kívüli paraméterei (pl. ['item'] a hicp_item sorozatnál)"""
+    return [name for _, name, _, _ in string.Formatter().parse(SERIES[series_id]['key'])
+            if name and name != 'country']
+
+def build_series_url(series_id, country_code, **params):
+    """ECB SDMX URL generálás a regiszter alapján"""
+    spec = SERIES[series_id]
+    key = get_series_key(series_id, country_code, **params)
+    return f"{ECB_SDMX_BASE_URL}{spec['dataset']}/{key}?format=csv"
+
+def get_series_cache_file(series_id, country_code, **params):
+    """Cache fájl név sorozat, országkód és paraméterek alapján"""
+    parts = [series_id] + [str(params[name]).lower() for name in sorted(params)]
+    return f"ecb_{'_'.join(parts)}_{country_code.lower()}_cache.csv"
+
+def parse_periods(periods, freq):
+    """SDMX TIME_PERIOD értékek vektorizált konvertálása dátummá
+
+    Negyedéves és éves adatnál az időszak utolsó napja (1999-Q1 -> 1999-03-31),
+    havi adatnál a hónap első napja (1999-01 -> 1999-01-01).
+    """
+    periods = pd.Series(periods, dtype=str).str.strip()
+    if freq == 'M':
+        return pd.to_datetime(periods + '-01', format='%Y-%m-%d', errors='coerce')
+    if freq == 'Q':
+        quarter_ends = periods.str.extract(r'^(\d{4})-Q([1-4])$')
+        month_day = quarter_ends[1].map(QUARTER_END_MONTH_DAY)
+        return pd.to_datetime(quarter_ends[0] + '-' + month_day, format='%Y-%m-%d', errors='coerce')
+    if freq == 'A':
+        return pd.to_datetime(periods + '-12-31', format='%Y-%m-%d', errors='coerce')
+    raise ValueError(f"Ismeretlen gyakoriság: {freq}")
+
+def read_sdmx_csv(csv_text, value_name, freq):
+    """Általános ECB SDMX CSV beolvasás: period + értékoszlop"""
+    try:
+        df = pd.read_csv(io.StringIO(csv_text))
+        if len(df) == 0:
+            raise ValueError("Üres DataFrame")
+    except Exception:
+        try:
+            df = pd.read_csv(io.StringIO(csv_text), skiprows=1)
+        except Exception as e:
+            print(f"SDMX CSV olvasási hiba: {e}")
+            return pd.DataFrame()
+
+    time_col = None
+    value_col = None
+    for col in df.columns:
+        if 'TIME_PERIOD' in col.upper():
+            time_col = col
+        elif 'OBS_VALUE' in col.upper():
+            value_col = col
+
+    if time_col is None or value_col is None:
+        print("Nem található TIME_PERIOD vagy OBS_VALUE oszlop!")
+        return pd.DataFrame()
+
+    result = pd.DataFrame({
+        'period': parse_periods(df[time_col].values, freq).values,
+        value_name: pd.to_numeric(df[value_col], errors='coerce').values,
+    })
+    return result.dropna()
+
+def load_series(series_id, country_code, **params):
+    """Egy sorozat betöltése (cache vagy letöltés) és feldolgozása pd.Series formában"""
+    # Helyi import: a sources maga is ezt a modult használja. A letöltés így a közös
+    # session-nel (kapcsolat pool, újrapróbálás) és a közös cache kezeléssel történik.
+    from sources import SOURCES
+    spec = SERIES[series_id]
+    csv_text = SOURCES['ecb'].get_text(series_id, country_code, **params)
+    if not csv_text:
+        return None
+
+    df = read_sdmx_csv(csv_text, spec['value_name'], spec['freq'])
+    if len(df) == 0:
+        print(f"✗ {series_id} ({country_code}): Üres vagy hibás adat")
+        return None
+
+    series = df.set_index('period').sort_index()[spec['value_name']].astype(float)
+    print(f"✓ {series_id} ({country_code}): {len(series)} rekord")
+    return series
+
+def load_series_panel(series_id, country_codes, max_workers=4, **params):
+    """Egy sorozat betöltése több országra párhuzamosan: {országkód: pd.Series}"""
+    country_codes = list(country_codes)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = pool.map(lambda cc: load_series(series_id, cc, **params), country_codes)
+        return {cc: s for cc, s in zip(country_codes, results) if s is not None}
+
+def load_panels(series_ids, country_codes, max_workers=4):
+    """Több sorozat betöltése az összes országra: {sorozat: {országkód: pd.Series}}
+
+    A további paramétert igénylő sablonos sorozatok (pl. hicp_item) kimaradnak;
+    ezeket a load_series_panel(series_id, ..., item=...) hívással kell betölteni.
+    """
+    panels = {}
+    for series_id in series_ids:
+        params = series_params(series_id)
+        if params:
+            print(f"✗ {series_id}: paraméteres sorozat ({', '.join(params)}), kihagyva")
+            continue
+        panels[series_id] = load_series_panel(series_id, country_codes, max_workers=max_workers)
+    return panels
@@ -0,0 +1,253 @@
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+
+from cache_io import cache_age, confirmed_fresh, read_cache_text, write_cache_text
+from series_registry import (SERIES, build_series_url, get_series_cache_file, get_series_key,
+                             read_sdmx_csv)
+
+# --- KÖZÖS HTTP KAPCSOLAT ---
+HTTP_TIMEOUT = 30
+POOL_SIZE = 16
+MAX_WORKERS = 8
+RETRY_POLICY = Retry(total=3, backoff_factor=1.0,
+                     status_forcelist=(429, 500, 502, 503, 504),
+                     allowed_methods=('GET',))
+
+def create_session():
+    """Egy közös requests.Session kapcsolat pool-lal és újrapróbálási szabállyal"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=RETRY_POLICY)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    # Tömörített átvitel: gzip/deflate, valamint br/zstd, ha a brotli/zstandard telepítve van
+    session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+    return session
+
+SESSION = create_session()
+
+# --- EUROSTAT ÉS KSH SOROZATOK ---
+EUROSTAT_BASE_URL = "https://ec.europa.eu/eurostat/api/dissemination/sdmx/2.1/data/"
+EUROSTAT_SERIES = {
+    'hicp': {
+        'dataflow': 'prc_hicp_manr',
+        'key': 'M.RCH_A.CP00.{country}',
+        'freq': 'M',
+        'value_name': 'inflation_rate',
+    },
+    'debt': {
+        'dataflow': 'gov_10q_ggdebt',
+        'key': 'Q.GD.S13.PC_GDP.{country}',
+        'freq': 'Q',
+        'value_name': 'debt_pct_gdp',
+    },
+    'unemployment': {
+        'dataflow': 'une_rt_m',
+        'key': 'M.SA.TOTAL.PC_ACT.T.{country}',
+        'freq': 'M',
+        'value_name': 'unemployment_rate',
+    },
+}
+# Eurostat országkód eltérések az ECB kódokhoz képest
+EUROSTAT_COUNTRY_CODES = {'GR': 'EL'}
+
+KSH_BASE_URL = "https://www.ksh.hu/stadat_files/"
+KSH_SERIES = {
+    'cpi': {
+        'table': 'ara/hu/ara0040',
+        'cache_file': 'ksh_cpi_cache.csv',
+        'column': 'Összesen',
+    },
+}
+
+class SourceAdapter:
+    """Adatforrás interfész: URL, cache fájl, dekódolás és feldolgozás forrásonként,
+    a letöltés, cache-elés, újrapróbálás és ütemezés közös"""
+
+    name = None
+    encoding = 'utf-8'
+    headers = {}
+
+    def __init__(self, session=SESSION):
+        self.session = session
+
+    def build_url(self, series_id, country_code, **params):
+        raise NotImplementedError
+
+    def cache_file(self, series_id, country_code, **params):
+        parts = [series_id] + [str(params[name]).lower() for name in sorted(params)]
+        return f"{self.name}_{'_'.join(parts)}_{country_code.lower()}_cache.csv"
+
+    def cache_ttl(self, series_id):
+        return 24 * 3600
+
+    def parse(self, text, series_id):
+        """Nyers szöveg -> pd.Series (period index)"""
+        raise NotImplementedError
+
+    def validate(self, series_id, country_code, **params):
+        """Kulcs ellenőrzés letöltés előtt (hálózat nélkül); problémák listája"""
+        return []
+
+    def download(self, url):
+        """Letöltés a közös session-nel, forrás szerinti dekódolással"""
+        r = self.session.get(url, timeout=HTTP_TIMEOUT, headers=self.headers)
+        r.raise_for_status()
+        return r.content.decode(self.encoding)
+
+    def read_cache(self, cache_file, max_age, trust_daemon=False):
+        """Cache tartalma, ha létezik és frissebb max_age másodpercnél (egyébként None)
+
+        trust_daemon: a régebbi cache is jó, ha a háttérfrissítő naprakésznek jelölte.
+        """
+        file_age = cache_age(cache_file)
+        if file_age is not None and (file_age < max_age or (trust_daemon and confirmed_fresh(cache_file))):
+            try:
+                print(f"Használom a cache-t: {cache_file}")
+                return read_cache_text(cache_file)
+            except Exception:
+                print(f"Cache olvasási hiba: {cache_file}")
+        return None
+
+    def write_cache(self, cache_file, text):
+        """Letöltött adat mentése a cache-be (UTF-8, tömörítve)"""
+        write_cache_text(cache_file, text)
+        print(f"Cache mentve: {cache_file}")
+
+    def get_text(self, series_id, country_code, max_age=None, **params):
+        """Nyers adat a cache-ből, vagy ha nincs/régi, letöltéssel
+
+        Alapértelmezett élettartamnál (max_age=None) a háttérfrissítő által naprakésznek
+        jelölt cache-t is elfogadjuk; kifejezett max_age (pl. 0) mindig szigorú.
+        """
+        cache_file = self.cache_file(series_id, country_code, **params)
+        trust_daemon = max_age is None
+        max_age = self.cache_ttl(series_id) if max_age is None else max_age
+        cached = self.read_cache(cache_file, max_age, trust_daemon)
+        if cached is not None:
+            return cached
+
+        issues = self.validate(series_id, country_code, **params)
+        if issues:
+            print(f"✗ {self.name}:{series_id} ({country_code}): érvénytelen kulcs, nem töltjük le: "
+                  f"{'; '.join(issues)}")
+            return None
+
+        url = self.build_url(series_id, country_code, **params)
+        print(f"Letöltés: {url}")
+        try:
+            text = self.download(url)
+            self.write_cache(cache_file, text)
+            return text
+        except Exception as e:
+            print(f"Letöltés sikertelen ({cache_file}): {e}")
+            return None
+
+    def load(self, series_id, country_code, max_age=None, **params):
+        """Sorozat betöltése és feldolgozása (None, ha nem sikerült)"""
+        text = self.get_text(series_id, country_code, max_age=max_age, **params)
+        return self.parse_checked(text, series_id, country_code)
+
+    def parse_checked(self, text, series_id, country_code):
+        """Feldolgozás; üres vagy hibás adatnál None"""
+        if not text:
+            return None
+        series = self.parse(text, series_id)
+        if series is None or len(series) == 0:
+            print(f"✗ {self.name}:{series_id} ({country_code}): Üres vagy hibás adat")
+            return None
+        return series
+
+class EcbSdmxSource(SourceAdapter):
+    """ECB SDMX adatforrás a series_registry alapján"""
+
+    name = 'ecb'
+    headers = {'Accept': 'text/csv'}
+
+    def build_url(self, series_id, country_code, **params):
+        return build_series_url(series_id, country_code, **params)
+
+    def cache_file(self, series_id, country_code, **params):
+        return get_series_cache_file(series_id, country_code, **params)
+
+    def cache_ttl(self, series_id):
+        return SERIES[series_id]['cache_ttl']
+
+    def validate(self, series_id, country_code, **params):
+        # Helyi import: az sdmx_metadata maga is ezt a modult használja.
+        # Csak a már cache-elt struktúrával ellenőrzünk, letöltést itt nem indítunk.
+        from sdmx_metadata import get_structure, validate_key
+        spec = SERIES[series_id]
+        structure = get_structure(spec['dataset'], download=False)
+        if structure is None:
+            return []
+        return validate_key(spec['dataset'], get_series_key(series_id, country_code, **params), structure)
+
+    def parse(self, text, series_id):
+        spec = SERIES[series_id]
+        df = read_sdmx_csv(text, spec['value_name'], spec['freq'])
+        if len(df) == 0:
+            return None
+        return df.set_index('period').sort_index()[spec['value_name']].astype(float)
+
+class EurostatSdmxSource(SourceAdapter):
+    """Eurostat SDMX 2.1 adatforrás (SDMX-CSV formátum)"""
+
+    name = 'eurostat'
+
+    def build_url(self, series_id, country_code, **params):
+        spec = EUROSTAT_SERIES[series_id]
+        geo = EUROSTAT_COUNTRY_CODES.get(country_code, country_code)
+        key = spec['key'].format(country=geo, **params)
+        return f"{EUROSTAT_BASE_URL}{spec['dataflow']}/{key}?format=SDMX-CSV"
+
+    def parse(self, text, series_id):
+        spec = EUROSTAT_SERIES[series_id]
+        df = read_sdmx_csv(text, spec['value_name'], spec['freq'])
+        if len(df) == 0:
+            return None
+        return df.set_index('period').sort_index()[spec['value_name']].astype(float)
+
+class KshStadatSource(SourceAdapter):
+    """KSH STADAT táblák (pontosvesszős CSV, közép-európai kódolás)"""
+
+    name = 'ksh'
+    # A KSH windows-1250 kódolással szolgál ki; latin1-gyel az ő/ű betűkből õ/û lesz
+    encoding = 'cp1250'
+
+    def build_url(self, series_id, country_code, **params):
+        return f"{KSH_BASE_URL}{KSH_SERIES[series_id]['table']}.csv"
+
+    def cache_file(self, series_id, country_code, **params):
+        return KSH_SERIES[series_id]['cache_file']
+
+    def parse(self, text, series_id):
+        # Helyi import: a ksh_vs_ecb maga is ezt a modult használja
+        from ksh_vs_ecb import read_ksh_cpi_categories
+        categories = read_ksh_cpi_categories(text)
+        column = KSH_SERIES[series_id]['column']
+        if column not in categories.columns:
+            return None
+        return categories[column].dropna()
+
+SOURCES = {
+    'ecb': EcbSdmxSource(),
+    'eurostat': EurostatSdmxSource(),
+    'ksh': KshStadatSource(),
+}
+
+def load_many(jobs, max_workers=MAX_WORKERS, max_age=None):
+    """Több (forrás, sorozat, ország[, paraméterek]) feladat párhuzamos betöltése
+
+    Minden forrás ugyanazt a session-t, cache-t és újrapróbálási szabályt használja.
+    Visszatérés: a feladatokkal azonos sorrendű lista (pd.Series vagy None).
+    """
+    def run(job):
+        source_name, series_id, country_code = job[:3]
+        params = job[3] if len(job) > 3 else {}
+        return SOURCES[source_name].load(series_id, country_code, max_age=max_age, **params)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(run, jobs))
@@ -0,0 +1,185 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+
+from series_registry import SERIES, load_series_panel
+from ECBGD_EU import COUNTRIES
+
+# --- IDŐSOR TÁR ---
+# Közös havi időtengely, oszloponként egy (adatkészlet, ország) sorozat.
+# values.f64: float64 C-sorrendű (periódusok × oszlop kapacitás) mátrix, amit
+# np.memmap-pel nyitunk meg; új periódus hozzáadása csak a fájl végére ír.
+TS_STORE_DIR = "ts_store"
+META_FILE = "meta.json"
+VALUES_FILE = "values.f64"
+COLUMN_BLOCK = 64  # ennyi oszloponként bővítjük a kapacitást
+
+def period_to_ordinal(dates):
+    """Dátumok havi sorszámmá (év * 12 + hónap - 1)"""
+    dates = pd.DatetimeIndex(dates)
+    return (dates.year * 12 + dates.month - 1).to_numpy(dtype=np.int64)
+
+def ordinal_to_period(ordinals, freq):
+    """Havi sorszámok vissza dátummá: havi adatnál hónap eleje, egyébként hónap vége"""
+    ordinals = np.asarray(ordinals, dtype=np.int64)
+    dates = pd.to_datetime(pd.DataFrame({'year': ordinals // 12, 'month': ordinals % 12 + 1, 'day': 1}))
+    if freq == 'M':
+        return pd.DatetimeIndex(dates)
+    return pd.DatetimeIndex(dates + pd.offsets.MonthEnd(0))
+
+def column_name(dataset, country_code):
+    """Oszlopnév (adatkészlet, országkód) párból"""
+    return f"{dataset}/{country_code}"
+
+class TimeSeriesStore:
+    """Memory-mapped helyi idősor tár (egy író, tetszőleges számú olvasó)"""
+
+    def __init__(self, path=TS_STORE_DIR, mode='r'):
+        self.path = path
+        self.mode = mode
+        self.meta = self._read_meta()
+        self.values = self._map_values()
+
+    # --- Belső segédfüggvények ---
+    def _read_meta(self):
+        meta_path = os.path.join(self.path, META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {'start': None, 'n_periods': 0, 'capacity': 0, 'columns': [], 'freqs': {}}
+
+    def _write_meta(self):
+        os.makedirs(self.path, exist_ok=True)
+        meta_path = os.path.join(self.path, META_FILE)
+        tmp_path = meta_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, meta_path)
+
+    def _map_values(self):
+        shape = (self.meta['n_periods'], self.meta['capacity'])
+        if shape[0] == 0 or shape[1] == 0:
+            return np.full(shape, np.nan)
+        mode = 'r' if self.mode == 'r' else 'r+'
+        return np.memmap(os.path.join(self.path, VALUES_FILE), dtype=np.float64, mode=mode, shape=shape)
+
+    def _rewrite(self, start, n_periods, capacity):
+        """Teljes újraírás (csak korábbi kezdőperiódus vagy oszlopkapacitás bővítés esetén)"""
+        new_values = np.full((n_periods, capacity), np.nan)
+        if self.meta['n_periods'] > 0:
+            offset = self.meta['start'] - start
+            old = np.asarray(self.values)
+            new_values[offset:offset + old.shape[0], :old.shape[1]] = old
+        del self.values
+        os.makedirs(self.path, exist_ok=True)
+        new_values.tofile(os.path.join(self.path, VALUES_FILE))
+        self.meta.update({'start': int(start), 'n_periods': int(n_periods), 'capacity': int(capacity)})
+        self._write_meta()
+        self.values = self._map_values()
+
+    def _append_periods(self, n_new):
+        """Új periódusok (sorok) hozzáfűzése a fájl végére, a meglévő adatok érintése nélkül"""
+        del self.values
+        with open(os.path.join(self.path, VALUES_FILE), 'ab') as f:
+            np.full((n_new, self.meta['capacity']), np.nan).tofile(f)
+        self.meta['n_periods'] += int(n_new)
+        self._write_meta()
+        self.values = self._map_values()
+
+    def _ensure(self, column, ordinals):
+        """Oszlop és periódus tartomány biztosítása; visszaadja az oszlop indexét"""
+        lo, hi = int(ordinals.min()), int(ordinals.max())
+        start = self.meta['start']
+        n_columns = len(self.meta['columns']) + (column not in self.meta['columns'])
+        capacity = max(self.meta['capacity'], -(-n_columns // COLUMN_BLOCK) * COLUMN_BLOCK)
+
+        if start is None:
+            self._rewrite(lo, hi - lo + 1, capacity)
+        elif lo < start or capacity > self.meta['capacity']:
+            new_start = min(lo, start)
+            new_end = max(hi, start + self.meta['n_periods'] - 1)
+            self._rewrite(new_start, new_end - new_start + 1, capacity)
+        elif hi >= start + self.meta['n_periods']:
+            self._append_periods(hi - (start + self.meta['n_periods']) + 1)
+
+        if column not in self.meta['columns']:
+            self.meta['columns'].append(column)
+            self._write_meta()
+        return self.meta['columns'].index(column)
+
+    # --- Írás ---
+    def write_series(self, dataset, country_code, series, freq=None):
+        """Sorozat írása; csak az új vagy megváltozott periódusokat írja
+
+        Visszatérés: a ténylegesen írt megfigyelések száma.
+        """
+        if self.mode == 'r':
+            raise ValueError("A tár csak olvasásra van megnyitva")
+        series = series.dropna()
+        if len(series) == 0:
+            return 0
+        column = column_name(dataset, country_code)
+        freq = freq or SERIES.get(dataset, {}).get('freq', 'M')
+        ordinals = period_to_ordinal(series.index)
+        col_idx = self._ensure(column, ordinals)
+        self.meta['freqs'][column] = freq
+
+        rows = ordinals - self.meta['start']
+        new_values = series.to_numpy(dtype=float)
+        current = self.values[rows, col_idx]
+        changed = ~((current == new_values) | (np.isnan(current) & np.isnan(new_values)))
+        if changed.any():
+            self.values[rows[changed], col_idx] = new_values[changed]
+            self.values.flush()
+        self._write_meta()
+        return int(changed.sum())
+
+    # --- Olvasás ---
+    @property
+    def columns(self):
+        return list(self.meta['columns'])
+
+    def column_values(self, dataset, country_code):
+        """Egy oszlop nyers értékei (memmap nézet, másolás nélkül)"""
+        col_idx = self.meta['columns'].index(column_name(dataset, country_code))
+        return self.values[:, col_idx]
+
+    def read_series(self, dataset, country_code):
+        """Egy sorozat pd.Series formában, a saját gyakoriságú dátumindexszel"""
+        column = column_name(dataset, country_code)
+        if column not in self.meta['columns']:
+            return None
+        values = self.column_values(dataset, country_code)
+        valid = ~np.isnan(values)
+        ordinals = self.meta['start'] + np.flatnonzero(valid)
+        index = ordinal_to_period(ordinals, self.meta['freqs'].get(column, 'M'))
+        return pd.Series(np.asarray(values[valid]), index=index, name=column)
+
+    def read_panel(self, dataset):
+        """Egy adatkészlet összes országa: {országkód: pd.Series}"""
+        prefix = f"{dataset}/"
+        return {column[len(prefix):]: self.read_series(dataset, column[len(prefix):])
+                for column in self.meta['columns'] if column.startswith(prefix)}
+
+def open_store(path=TS_STORE_DIR, mode='r'):
+    """Tár megnyitása (mode='r': csak olvasás, 'r+': írás)"""
+    return TimeSeriesStore(path, mode)
+
+def refresh_store(series_ids, country_codes, path=TS_STORE_DIR):
+    """Sorozatok betöltése a regiszterből és inkrementális írása a tárba"""
+    store = open_store(path, mode='r+')
+    for series_id in series_ids:
+        panel = load_series_panel(series_id, country_codes)
+        for country_code, series in panel.items():
+            written = store.write_series(series_id, country_code, series)
+            print(f"{series_id}/{country_code}: {written} új vagy módosított megfigyelés")
+    return store
+
+def main():
+    print("=== Idősor tár frissítése ===")
+    store = refresh_store(['debt', 'hicp'], COUNTRIES)
+    print(f"✓ {len(store.columns)} sorozat, {store.meta['n_periods']} periódus: {TS_STORE_DIR}/")
+
+if __name__ == '__main__':
+    main()
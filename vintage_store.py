@@ -0,0 +1,106 @@
+import sqlite3
+import sys
+from contextlib import closing
+from datetime import datetime
+
+import pandas as pd
+
+from revisions import diff_vintages
+
+# --- VINTAGE (POINT-IN-TIME) TÁR ---
+# Minden megfigyelésből csak a változásokat tároljuk: (dataset, country, period,
+# vintage, value); value NULL, ha a megfigyelés az adott vintage-ben eltűnt.
+# Az as-of lekérdezés az (dataset, country, period, vintage) indexen
+# időszakonként egyetlen keresés, nem kell végigjátszani a vintage-eket.
+VINTAGE_DB_FILE = "vintages.sqlite"
+
+def connect(path=VINTAGE_DB_FILE):
+    """Kapcsolat megnyitása, séma létrehozása szükség esetén"""
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS observations (
+            dataset TEXT NOT NULL,
+            country TEXT NOT NULL,
+            period TEXT NOT NULL,
+            vintage TEXT NOT NULL,
+            value REAL,
+            PRIMARY KEY (dataset, country, period, vintage)
+        ) WITHOUT ROWID""")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS vintages (
+            dataset TEXT NOT NULL,
+            country TEXT NOT NULL,
+            vintage TEXT NOT NULL,
+            n_changes INTEGER NOT NULL,
+            PRIMARY KEY (dataset, country, vintage)
+        )""")
+    return conn
+
+def _as_of_text(as_of):
+    """as_of dátum szöveges (ISO) formára; None = legfrissebb"""
+    if as_of is None:
+        return '9999-12-31T23:59:59'
+    return pd.Timestamp(as_of).isoformat(timespec='seconds')
+
+def get_series(dataset, country_code, as_of=None, path=VINTAGE_DB_FILE):
+    """A sorozat úgy, ahogy `as_of` időpontban ismert volt (None: legfrissebb)"""
+    with closing(connect(path)) as conn:
+        rows = conn.execute("""
+            SELECT o.period, o.value
+            FROM observations o
+            WHERE o.dataset = ? AND o.country = ?
+              AND o.vintage = (
+                  SELECT MAX(i.vintage) FROM observations i
+                  WHERE i.dataset = o.dataset AND i.country = o.country
+                    AND i.period = o.period AND i.vintage <= ?)
+              AND o.value IS NOT NULL
+            ORDER BY o.period""", (dataset, country_code, _as_of_text(as_of))).fetchall()
+    if len(rows) == 0:
+        return pd.Series(dtype=float, name=f"{dataset}/{country_code}")
+    periods, values = zip(*rows)
+    return pd.Series(values, index=pd.to_datetime(periods), name=f"{dataset}/{country_code}", dtype=float)
+
+def record_vintage(dataset, country_code, series, vintage=None, path=VINTAGE_DB_FILE):
+    """Új vintage rögzítése: csak az előzőhöz képest változott megfigyeléseket írja
+
+    Visszatérés: a rögzített változások száma.
+    """
+    vintage_text = _as_of_text(vintage or datetime.now())
+    latest = get_series(dataset, country_code, path=path)
+    delta = diff_vintages(latest if len(latest) > 0 else None, series.dropna())
+    if len(delta) == 0:
+        return 0
+
+    rows = [(dataset, country_code, period.strftime('%Y-%m-%d'), vintage_text,
+             None if pd.isna(value) else float(value))
+            for period, value in zip(delta['period'], delta['new_value'])]
+    with closing(connect(path)) as conn, conn:
+        conn.executemany("INSERT OR REPLACE INTO observations VALUES (?, ?, ?, ?, ?)", rows)
+        conn.execute("INSERT OR REPLACE INTO vintages VALUES (?, ?, ?, ?)",
+                     (dataset, country_code, vintage_text, len(rows)))
+    return len(rows)
+
+def list_vintages(dataset, country_code, path=VINTAGE_DB_FILE):
+    """Egy sorozat rögzített vintage-ei és a változások száma"""
+    with closing(connect(path)) as conn:
+        return pd.read_sql_query(
+            "SELECT vintage, n_changes FROM vintages WHERE dataset = ? AND country = ? ORDER BY vintage",
+            conn, params=(dataset, country_code), parse_dates=['vintage'])
+
+def main():
+    if len(sys.argv) < 3:
+        print("Használat: python3 vintage_store.py <dataset> <országkód> [as_of dátum]")
+        return
+    dataset, country_code = sys.argv[1], sys.argv[2].upper()
+    as_of = sys.argv[3] if len(sys.argv) > 3 else None
+
+    print(f"=== {dataset}/{country_code} vintage-ek ===")
+    print(list_vintages(dataset, country_code).to_string(index=False))
+    series = get_series(dataset, country_code, as_of=as_of)
+    label = as_of or 'legfrissebb'
+    print(f"\nÁllapot ({label}): {len(series)} megfigyelés")
+    if len(series) > 0:
+        print(series.tail(8).to_string())
+
+if __name__ == '__main__':
+    main()